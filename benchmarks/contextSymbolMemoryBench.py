@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import tracemalloc
+from typing import Callable
+
+import spimdisasm
+
+from syntheticCorpus import generateCorpus
+from pipelineBench import createSections
+
+
+@dataclasses.dataclass
+class LegacyContextSymbol:
+    "The previous `ContextSymbol` layout, with a per-instance `__dict__` and an eagerly allocated set of references. Kept here to compare against"
+
+    address: int
+    name: str|None = None
+    size: int|None = None
+    type: spimdisasm.common.SymbolSpecialType|str|None = None
+    vromAddress: int|None = None
+    sectionType: spimdisasm.common.FileSectionType = spimdisasm.common.FileSectionType.Unknown
+    isDefined: bool = False
+    isUserDeclared: bool = False
+    isAutogenerated: bool = False
+    isMaybeString: bool = False
+    referenceCounter: int = 0
+    referenceFunctions: set[LegacyContextSymbol] = dataclasses.field(default_factory=set)
+    overlayCategory: str|None = None
+    nameGetCallback: Callable[[LegacyContextSymbol], str]|None = None
+    unknownSegment: bool = False
+    isGot: bool = False
+    isGotGlobal: bool = False
+    config: spimdisasm.common.DisasmConfig|None = None
+
+    def __hash__(self):
+        return hash((self.address, self.vromAddress))
+
+
+def collectSymbols(functionsCount: int, overlaysCount: int, compiler: str, seed: int) -> list[spimdisasm.common.ContextSymbol]:
+    "Analyzes a synthetic rom and returns every symbol of its context"
+    rom, segments = generateCorpus(seed, functionsCount, overlaysCount, compiler)
+    context = spimdisasm.common.Context()
+    for sectionsList in createSections(context, rom, segments).values():
+        for section in sectionsList:
+            section.analyze()
+    return [contextSym for segment in context.getAllSegments() for contextSym in segment.symbols.values()]
+
+
+def measureLegacy(symbols: list[spimdisasm.common.ContextSymbol]) -> int:
+    tracemalloc.start()
+    copies: dict[int, LegacyContextSymbol] = dict()
+    for contextSym in symbols:
+        copies[id(contextSym)] = LegacyContextSymbol(contextSym.address, contextSym.name, contextSym.size, contextSym.type, contextSym.vromAddress, contextSym.sectionType, contextSym.isDefined, contextSym.isUserDeclared, contextSym.isAutogenerated, contextSym.isMaybeString, contextSym.referenceCounter)
+    for contextSym in symbols:
+        for funcSym in contextSym.referenceFunctions:
+            funcCopy = copies.get(id(funcSym))
+            if funcCopy is not None:
+                copies[id(contextSym)].referenceFunctions.add(funcCopy)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+def measureCurrent(symbols: list[spimdisasm.common.ContextSymbol]) -> int:
+    tracemalloc.start()
+    copies: dict[int, spimdisasm.common.ContextSymbol] = dict()
+    for contextSym in symbols:
+        copies[id(contextSym)] = spimdisasm.common.ContextSymbol(contextSym.address, contextSym.name, contextSym.size, contextSym.type, contextSym.vromAddress, contextSym.sectionType, contextSym.isDefined, contextSym.isUserDeclared, contextSym.isAutogenerated, contextSym.isMaybeString, contextSym.referenceCounter)
+    for contextSym in symbols:
+        for funcSym in contextSym.referenceFunctions:
+            funcCopy = copies.get(id(funcSym))
+            if funcCopy is not None:
+                copies[id(contextSym)].addReferenceFunction(funcCopy)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def contextSymbolMemoryBenchMain() -> None:
+    parser = argparse.ArgumentParser(description="Measures the memory used by each symbol of a large context, comparing the current ContextSymbol against the previous layout")
+    parser.add_argument("-n", "--functions", help="Amount of functions of the main segment. Defaults to 4000", type=int, default=4000)
+    parser.add_argument("--overlays", help="Amount of overlays, each one with a quarter of the functions of the main segment. Defaults to 4", type=int, default=4)
+    parser.add_argument("--compiler", help="Compiler style of the generated functions. Defaults to IDO", choices=["IDO", "GCC"], default="IDO")
+    parser.add_argument("--seed", help="Seed used to generate the rom. Defaults to 0", type=int, default=0)
+    args = parser.parse_args()
+
+    spimdisasm.common.GlobalConfig.QUIET = True
+    spimdisasm.common.GlobalConfig.COMPILER = spimdisasm.common.Compiler.fromStr(args.compiler)
+
+    symbols = collectSymbols(args.functions, args.overlays, args.compiler, args.seed)
+    singleReferenced = sum(1 for contextSym in symbols if contextSym.getReferenceFunctionsCount() == 1)
+    multiReferenced = sum(1 for contextSym in symbols if contextSym.getReferenceFunctionsCount() > 1)
+
+    # Both measurements include the dictionary used to link the copies, which has the same size on both
+    legacySize = measureLegacy(symbols)
+    currentSize = measureCurrent(symbols)
+
+    print(f"{len(symbols)} symbols, {singleReferenced} referenced by a single function, {multiReferenced} by many")
+    print(f"{'layout':<10} {'total':>12} {'bytes/symbol':>14}")
+    print(f"{'previous':<10} {legacySize:>12} {legacySize / len(symbols):>14.1f}")
+    print(f"{'current':<10} {currentSize:>12} {currentSize / len(symbols):>14.1f}")
+    print(f"{(1 - currentSize / legacySize):.1%} less memory")
+
+
+if __name__ == "__main__":
+    contextSymbolMemoryBenchMain()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import rabbitizer
+import spimdisasm
+
+from syntheticCorpus import SyntheticRomBuilder
+
+
+class LegacySymbolFunction(spimdisasm.mips.symbols.SymbolFunction):
+    "Looks ahead every branch by walking from its target until the end of the function, like before. Kept here to compare against"
+
+    def _lookAheadSymbolFinder(self, instrsList: list[rabbitizer.Instruction], blockStates: spimdisasm.mips.symbols.analysis.BlockStates, instr: rabbitizer.Instruction, prevInstr: rabbitizer.Instruction, instructionOffset: int, trackedRegistersOriginal: rabbitizer.RegistersTracker):
+        if not prevInstr.isBranch() and not prevInstr.isUnconditionalBranch():
+            return
+
+        currentVram = self.getVramOffset(instructionOffset)
+
+        prevInstrOffset = instructionOffset - 4
+        prevVram = self.getVramOffset(prevInstrOffset)
+        branchOffset = prevInstr.getGenericBranchOffset(prevVram)
+        branch = prevInstrOffset + branchOffset
+
+        if branch < 0:
+            return
+
+        regsTracker = rabbitizer.RegistersTracker(trackedRegistersOriginal)
+
+        self.instrAnalyzer.processInstr(regsTracker, instr, instructionOffset, currentVram, None, self.context.got)
+
+        if instructionOffset in self.branchesTaken:
+            return
+        self.branchesTaken.add(instructionOffset)
+
+        sizew = len(instrsList)*4
+        while branch < sizew:
+            prevTargetInstr = instrsList[branch//4 - 1]
+            targetInstr = instrsList[branch//4]
+
+            self.instrAnalyzer.processInstr(regsTracker, targetInstr, branch, self.getVramOffset(branch), prevTargetInstr, self.context.got)
+
+            if prevTargetInstr.isUnconditionalBranch():
+                return
+            if prevTargetInstr.isJump() and not prevTargetInstr.doesLink():
+                return
+
+            self.instrAnalyzer.processPrevFuncCall(regsTracker, targetInstr, prevTargetInstr)
+            branch += 4
+
+
+def generateFunctions(seed: int, functionsCount: int, functionSize: int, jumpTablesPerFunction: int, compiler: str) -> list[tuple[int, list[int]]]:
+    "Returns the vram and words of each generated function"
+    builder = SyntheticRomBuilder(seed, compiler)
+    segment = builder.addSegment("main", 0x80000400, None, functionsCount, [], functionSize=functionSize, jumpTablesPerFunction=jumpTablesPerFunction)
+    builder.build()
+
+    functions: list[tuple[int, list[int]]] = list()
+    offsets = segment.functionOffsets + [len(segment.text)*4]
+    for start, end in zip(offsets, offsets[1:]):
+        functions.append((segment.textVram + start, segment.text[start//4:end//4]))
+    return functions
+
+def getAnalysisResults(func: spimdisasm.mips.symbols.SymbolFunction) -> dict[str, object]:
+    "Returns every result gathered by analyzing the instructions of the function, in a comparable form"
+    results: dict[str, object] = dict()
+    for name, value in vars(func.instrAnalyzer).items():
+        if name in {"config", "changesLog"}:
+            continue
+        if isinstance(value, dict):
+            results[name] = {key: element.getRaw() if isinstance(element, rabbitizer.Instruction) else element for key, element in value.items()}
+        elif isinstance(value, list):
+            results[name] = [repr(element) for element in value]
+        else:
+            results[name] = value
+    results["branchesTaken"] = func.branchesTaken
+    return results
+
+def analyzeFunctions(functionClass: type[spimdisasm.mips.symbols.SymbolFunction], functions: list[tuple[int, list[int]]], context: spimdisasm.common.Context) -> tuple[float, int, list[dict[str, object]]]:
+    "Returns the time spent analyzing the instructions of every function, the amount of processed instructions and the results"
+    elapsed = 0.0
+    processedCount = 0
+    results: list[dict[str, object]] = list()
+
+    originalProcessInstr = spimdisasm.mips.symbols.analysis.InstrAnalyzer.processInstr
+    def countedProcessInstr(self, *args) -> None:
+        nonlocal processedCount
+        processedCount += 1
+        originalProcessInstr(self, *args)
+
+    for countInstructions in (False, True):
+        if countInstructions:
+            setattr(spimdisasm.mips.symbols.analysis.InstrAnalyzer, "processInstr", countedProcessInstr)
+        try:
+            for vram, words in functions:
+                instrsList = [rabbitizer.Instruction(word, vram=vram + i*4) for i, word in enumerate(words)]
+                func = functionClass(context, 0, len(words)*4, 0, vram, instrsList, 0, None)
+                start = time.perf_counter()
+                func.analyzeInstructions()
+                if not countInstructions:
+                    elapsed += time.perf_counter() - start
+                    results.append(getAnalysisResults(func))
+        finally:
+            setattr(spimdisasm.mips.symbols.analysis.InstrAnalyzer, "processInstr", originalProcessInstr)
+    return elapsed, processedCount, results
+
+
+def functionAnalysisBenchMain() -> None:
+    parser = argparse.ArgumentParser(description="Times the instruction analysis of long synthetic functions with many branches and switches, comparing the pruned look-ahead, which stops walking a branch target once it can't change the results, against the previous look-ahead of every branch until the end of the function")
+    parser.add_argument("-n", "--functions", help="Amount of functions of each size. Defaults to 4", type=int, default=4)
+    parser.add_argument("--sizes", help="Comma separated list of the sizes of the functions, in instructions. Defaults to 250,1000,4000", default="250,1000,4000")
+    parser.add_argument("--switch-every", help="Place a switch every this amount of instructions. Defaults to 150", type=int, default=150)
+    parser.add_argument("--compiler", help="Compiler style of the generated functions. Defaults to IDO", choices=["IDO", "GCC"], default="IDO")
+    parser.add_argument("--seed", help="Seed used to generate the functions. Defaults to 0", type=int, default=0)
+    args = parser.parse_args()
+
+    spimdisasm.common.GlobalConfig.QUIET = True
+    spimdisasm.common.GlobalConfig.COMPILER = spimdisasm.common.Compiler.fromStr(args.compiler)
+    context = spimdisasm.common.Context()
+
+    print(f"{'size':>6} {'previous':>10} {'current':>10} {'speedup':>8} {'processed before':>17} {'processed now':>14}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        functions = generateFunctions(args.seed, args.functions, size, max(size // args.switch_every, 1), args.compiler)
+        legacyTime, legacyProcessed, legacyResults = analyzeFunctions(LegacySymbolFunction, functions, context)
+        currentTime, currentProcessed, currentResults = analyzeFunctions(spimdisasm.mips.symbols.SymbolFunction, functions, context)
+
+        for (vram, _), legacyResult, currentResult in zip(functions, legacyResults, currentResults):
+            if legacyResult != currentResult:
+                print(f"Error: the results of the function at 0x{vram:08X} differ")
+                differences = [name for name in legacyResult if legacyResult[name] != currentResult.get(name)]
+                print(f"    {', '.join(differences)}")
+                exit(1)
+
+        print(f"{size:>6} {legacyTime:>9.3f}s {currentTime:>9.3f}s {legacyTime / currentTime:>7.2f}x {legacyProcessed:>17} {currentProcessed:>14}")
+
+
+if __name__ == "__main__":
+    functionAnalysisBenchMain()
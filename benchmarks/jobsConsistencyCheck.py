@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+from pathlib import Path
+import struct
+import subprocess
+import sys
+import tempfile
+
+from syntheticCorpus import T0, GP, RA, NOP, lw, jr
+
+
+GpValue: int = 0x200000
+
+
+def generateGpRom(sectionsCount: int, functionsPerSection: int) -> tuple[bytes, str]:
+    """Generates a rom with many text sections of small functions which load a variable relative to $gp.
+
+    Returns the rom and its file splits.
+    """
+    words: list[int] = list()
+    lines: list[str] = ["offset,vram,.text"]
+    for i in range(sectionsCount):
+        lines.append(f"{len(words)*4:X},{0x80000000 + len(words)*4:X},text_{i}")
+        for j in range(functionsPerSection):
+            words += [lw(T0, 0x10 + 4*(i*functionsPerSection + j), GP), jr(RA), NOP]
+    lines.append(f"{len(words)*4:X},{0x80000000 + len(words)*4:X},.end")
+    return struct.pack(f">{len(words)}I", *words), "\n".join(lines) + "\n"
+
+
+def runDisassembler(romPath: Path, splitsPath: Path, outputPath: Path, extraArgs: list[str]) -> None:
+    subprocess.run([sys.executable, "-m", "spimdisasm.singleFileDisasm", str(romPath), str(outputPath), "--file-splits", str(splitsPath), "--gp", f"0x{GpValue:X}", "-q", *extraArgs], check=True)
+
+def getDifferences(comparison: filecmp.dircmp) -> list[str]:
+    differences = [str(Path(comparison.left) / name) for name in comparison.diff_files + comparison.left_only + comparison.right_only]
+    for subComparison in comparison.subdirs.values():
+        differences += getDifferences(subComparison)
+    return differences
+
+
+def jobsConsistencyCheckMain() -> None:
+    parser = argparse.ArgumentParser(description="Checks the output of singleFileDisasm is the same when analyzing serially, with --jobs and with the analysis restored from --analysis-cache, using $gp relative accesses since those are modified while the analysis is added to the context")
+    parser.add_argument("--sections", help="Amount of text sections. Defaults to 8", type=int, default=8)
+    parser.add_argument("--functions", help="Amount of functions of each section. Defaults to 16", type=int, default=16)
+    parser.add_argument("-j", "--jobs", help="Amount of processes used for the parallel run. Defaults to 2", type=int, default=2)
+    args = parser.parse_args()
+
+    rom, splits = generateGpRom(args.sections, args.functions)
+    with tempfile.TemporaryDirectory() as tempDir:
+        tempPath = Path(tempDir)
+        romPath = tempPath / "rom.bin"
+        splitsPath = tempPath / "splits.csv"
+        romPath.write_bytes(rom)
+        splitsPath.write_text(splits)
+
+        cachePath = tempPath / "cache"
+        # The first run with the cache fills it, so the following ones restore the analysis from it
+        runs: dict[str, list[str]] = {
+            "serial": [],
+            f"jobs {args.jobs}": ["-j", str(args.jobs)],
+            "filling the cache": ["--analysis-cache", str(cachePath)],
+            "cached": ["--analysis-cache", str(cachePath)],
+            f"cached with jobs {args.jobs}": ["--analysis-cache", str(cachePath), "-j", str(args.jobs)],
+        }
+
+        for name, extraArgs in runs.items():
+            runDisassembler(romPath, splitsPath, tempPath / name, extraArgs + ["--save-context", str(tempPath / name / "context.csv")])
+
+        failed = False
+        for name in list(runs)[1:]:
+            differences = getDifferences(filecmp.dircmp(tempPath / "serial", tempPath / name))
+            if len(differences) > 0:
+                print(f"Error: the output of the '{name}' run differs from the serial one:")
+                for path in differences:
+                    print(f"    {Path(path).relative_to(tempPath / 'serial')}")
+                failed = True
+            else:
+                print(f"'{name}' run: same output as the serial one")
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    jobsConsistencyCheckMain()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import rabbitizer
+import spimdisasm
+
+from syntheticCorpus import SyntheticSegment, generateCorpus
+
+
+Stages: list[str] = [
+    "word decoding",
+    "section creation",
+    "SectionText.analyze",
+    "function boundaries",
+    "SymbolFunction.analyze",
+    "data analysis",
+    "rodata analysis",
+    "bss analysis",
+    "rendering",
+    "context save",
+]
+"Every timed stage of the pipeline, in the order they are reported"
+
+MinimumComparedTime: float = 0.005
+"Stages faster than this on the baseline are too noisy to be reported as regressions"
+
+
+class StageTimer:
+    "Accumulates the time spent on each stage of the pipeline"
+
+    def __init__(self) -> None:
+        self.times: dict[str, float] = dict()
+
+    def run(self, stage: str, callback: Callable[[], None]) -> None:
+        start = time.perf_counter()
+        callback()
+        self.times[stage] = self.times.get(stage, 0.0) + time.perf_counter() - start
+
+
+def createSections(context: spimdisasm.common.Context, rom: bytearray, segments: list[SyntheticSegment]) -> dict[spimdisasm.common.FileSectionType, list[spimdisasm.mips.sections.SectionBase]]:
+    "Creates the sections of every segment, sorted by section type like `singleFileDisasm` does"
+    sectionsPerType: dict[spimdisasm.common.FileSectionType, list[spimdisasm.mips.sections.SectionBase]] = {
+        spimdisasm.common.FileSectionType.Text: [],
+        spimdisasm.common.FileSectionType.Data: [],
+        spimdisasm.common.FileSectionType.Rodata: [],
+        spimdisasm.common.FileSectionType.Bss: [],
+    }
+
+    mainSegment = segments[0]
+    context.globalSegment.changeRanges(0, len(rom), mainSegment.vram, mainSegment.vramEnd)
+
+    for segment in segments:
+        segmentVromStart = 0
+        if segment.overlayCategory is not None:
+            context.addOverlaySegment(segment.overlayCategory, segment.vromStart, segment.vromEnd, segment.vram, segment.vramEnd)
+            segmentVromStart = segment.vromStart
+
+        for sectionName, vromStart, vromEnd, vram in segment.getSectionRanges():
+            name = f"{segment.name}_{sectionName}"
+            section: spimdisasm.mips.sections.SectionBase
+            if sectionName == "text":
+                section = spimdisasm.mips.sections.SectionText(context, vromStart, vromEnd, vram, name, rom, segmentVromStart, segment.overlayCategory)
+            elif sectionName == "data":
+                section = spimdisasm.mips.sections.SectionData(context, vromStart, vromEnd, vram, name, rom, segmentVromStart, segment.overlayCategory)
+            elif sectionName == "rodata":
+                section = spimdisasm.mips.sections.SectionRodata(context, vromStart, vromEnd, vram, name, rom, segmentVromStart, segment.overlayCategory)
+            else:
+                section = spimdisasm.mips.sections.SectionBss(context, vromStart, vromEnd, vram, vram + segment.bssSize, name, segmentVromStart, segment.overlayCategory)
+            sectionsPerType[section.sectionType].append(section)
+    return sectionsPerType
+
+
+def runPipeline(rom: bytearray, segments: list[SyntheticSegment], contextPath: Path) -> tuple[dict[str, float], int]:
+    "Runs every stage of the disassembly pipeline once. Returns the time spent on each stage and the amount of disassembled instructions"
+    timer = StageTimer()
+    context = spimdisasm.common.Context()
+
+    textRanges = [(vromStart, vromEnd, vram) for segment in segments for sectionName, vromStart, vromEnd, vram in segment.getSectionRanges() if sectionName == "text"]
+    instructionsCount = sum((vromEnd - vromStart) // 4 for vromStart, vromEnd, _ in textRanges)
+
+    def decodeWords():
+        for vromStart, vromEnd, vram in textRanges:
+            words = spimdisasm.common.Utils.bytesToWordArray(rom, vromStart, vromEnd)
+            spimdisasm.mips.sections.SectionText.wordListToInstructions(words, vram, rabbitizer.InstrCategory.CPU)
+    timer.run("word decoding", decodeWords)
+
+    sections: dict[spimdisasm.common.FileSectionType, list[spimdisasm.mips.sections.SectionBase]] = dict()
+    def create():
+        sections.update(createSections(context, rom, segments))
+    timer.run("section creation", create)
+
+    # Time spent on SymbolFunction.analyze is measured separately from the function boundary detection of SectionText.analyze
+    originalFunctionAnalyze = spimdisasm.mips.symbols.SymbolFunction.analyze
+    def timedFunctionAnalyze(func: spimdisasm.mips.symbols.SymbolFunction):
+        start = time.perf_counter()
+        originalFunctionAnalyze(func)
+        timer.times["SymbolFunction.analyze"] = timer.times.get("SymbolFunction.analyze", 0.0) + time.perf_counter() - start
+
+    def analyzeText():
+        for section in sections[spimdisasm.common.FileSectionType.Text]:
+            section.analyze()
+    spimdisasm.mips.symbols.SymbolFunction.analyze = timedFunctionAnalyze # type: ignore[method-assign]
+    try:
+        timer.run("SectionText.analyze", analyzeText)
+    finally:
+        spimdisasm.mips.symbols.SymbolFunction.analyze = originalFunctionAnalyze # type: ignore[method-assign]
+
+    for sectionType, stage in [(spimdisasm.common.FileSectionType.Data, "data analysis"), (spimdisasm.common.FileSectionType.Rodata, "rodata analysis"), (spimdisasm.common.FileSectionType.Bss, "bss analysis")]:
+        def analyzeSections():
+            for section in sections[sectionType]:
+                section.analyze()
+        timer.run(stage, analyzeSections)
+
+    def render():
+        for sectionsList in sections.values():
+            for section in sectionsList:
+                section.disassembleToStream(io.StringIO())
+    timer.run("rendering", render)
+
+    timer.run("context save", lambda: context.saveContextToFile(contextPath))
+
+    # The function boundaries are the rest of the time spent on SectionText.analyze
+    timer.times["function boundaries"] = timer.times["SectionText.analyze"] - timer.times.get("SymbolFunction.analyze", 0.0)
+    return {stage: timer.times.get(stage, 0.0) for stage in Stages}, instructionsCount
+
+
+def pipelineBenchMain() -> None:
+    parser = argparse.ArgumentParser(description="Times each stage of the disassembly pipeline over a synthetic rom")
+    parser.add_argument("-n", "--functions", help="Amount of functions of the main segment. Defaults to 2000", type=int, default=2000)
+    parser.add_argument("--overlays", help="Amount of overlays, each one with a quarter of the functions of the main segment. Defaults to 4", type=int, default=4)
+    parser.add_argument("--compiler", help="Compiler style of the generated functions. Defaults to IDO", choices=["IDO", "GCC"], default="IDO")
+    parser.add_argument("--seed", help="Seed used to generate the rom. Defaults to 0", type=int, default=0)
+    parser.add_argument("-r", "--repeat", help="Amount of times the whole pipeline is run. The fastest time of each stage is reported. Defaults to 3", type=int, default=3)
+    parser.add_argument("--json", help="Write the results to this json file", metavar="PATH")
+    parser.add_argument("--baseline", help="Compare against a json file written by a previous run, exiting with an error if any stage got slower than the tolerance", metavar="PATH")
+    parser.add_argument("--tolerance", help="Allowed slowdown relative to the baseline. Defaults to 0.15 (15%%)", type=float, default=0.15)
+    args = parser.parse_args()
+
+    spimdisasm.common.GlobalConfig.QUIET = True
+    spimdisasm.common.GlobalConfig.COMPILER = spimdisasm.common.Compiler.fromStr(args.compiler)
+
+    rom, segments = generateCorpus(args.seed, args.functions, args.overlays, args.compiler)
+
+    bestTimes: dict[str, float] = dict()
+    instructionsCount = 0
+    with tempfile.TemporaryDirectory() as tempDir:
+        for _ in range(args.repeat):
+            times, instructionsCount = runPipeline(rom, segments, Path(tempDir) / "context.csv")
+            for stage, stageTime in times.items():
+                bestTimes[stage] = min(stageTime, bestTimes.get(stage, stageTime))
+
+    # Stages which process every instruction also report their throughput
+    throughputStages = {"word decoding", "SectionText.analyze", "function boundaries", "SymbolFunction.analyze", "rendering"}
+
+    print(f"{len(rom)} bytes, {instructionsCount} instructions, {len(segments)} segments ({args.compiler})")
+    print(f"{'stage':<24} {'time':>10} {'instr/s':>12}")
+    for stage, stageTime in bestTimes.items():
+        throughput = f"{instructionsCount / stageTime:>12.0f}" if stage in throughputStages and stageTime > 0 else f"{'':>12}"
+        print(f"{stage:<24} {stageTime:>9.4f}s {throughput}")
+
+    results = {
+        "functions": args.functions,
+        "overlays": args.overlays,
+        "compiler": args.compiler,
+        "seed": args.seed,
+        "instructions": instructionsCount,
+        "times": bestTimes,
+    }
+    if args.json is not None:
+        Path(args.json).write_text(json.dumps(results, indent=4) + "\n")
+
+    if args.baseline is not None:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = 0
+        print()
+        print(f"{'stage':<24} {'baseline':>10} {'current':>10} {'change':>8}")
+        for stage, baselineTime in baseline["times"].items():
+            currentTime = bestTimes.get(stage)
+            if currentTime is None or baselineTime <= 0:
+                continue
+            change = currentTime / baselineTime - 1
+            marker = ""
+            if change > args.tolerance and baselineTime >= MinimumComparedTime:
+                marker = " <- regression"
+                regressions += 1
+            print(f"{stage:<24} {baselineTime:>9.4f}s {currentTime:>9.4f}s {change:>+7.1%}{marker}")
+        if regressions > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    pipelineBenchMain()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import random
+import time
+from typing import Callable
+
+import spimdisasm
+
+
+class BisectSortedDict:
+    "The previous `SortedDict` implementation, a single sorted list of keys. Kept here to compare against"
+
+    def __init__(self) -> None:
+        self.map: dict[int, int] = dict()
+        self.sortedKeys: list[int] = list()
+
+    def add(self, key: int, value: int) -> None:
+        if key not in self.map:
+            bisect.insort(self.sortedKeys, key)
+        self.map[key] = value
+
+    def remove(self, key: int) -> None:
+        del self.map[key]
+        self.sortedKeys.remove(key)
+
+    def updateMany(self, pairs: list[tuple[int, int]]) -> None:
+        # There was no bulk insertion, every pair was added individually
+        for key, value in pairs:
+            self.add(key, value)
+
+    def getKeyRight(self, key: int, inclusive: bool=True) -> tuple[int, int]|None:
+        if inclusive:
+            index = bisect.bisect_right(self.sortedKeys, key)
+        else:
+            index = bisect.bisect_left(self.sortedKeys, key)
+        if index == 0:
+            return None
+        currentKey = self.sortedKeys[index - 1]
+        return currentKey, self.map[currentKey]
+
+    def getRangeAndPop(self, startKey: int, endKey: int):
+        keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
+        keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
+        for index in range(keyIndexEnd-1, keyIndexStart-1, -1):
+            key = self.sortedKeys[index]
+            value = self.map[key]
+            self.remove(key)
+            yield (key, value)
+
+
+def timeIt(callback: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    callback()
+    return time.perf_counter() - start
+
+
+def runBenchmarks(factory: Callable[[], BisectSortedDict|spimdisasm.common.SortedDict[int]], keys: list[int], queries: list[int]) -> dict[str, float]:
+    results: dict[str, float] = dict()
+    sortedDict = factory()
+
+    def insertAll():
+        for key in keys:
+            sortedDict.add(key, key)
+    results["insert (random order)"] = timeIt(insertAll)
+
+    def queryAll():
+        for key in queries:
+            sortedDict.getKeyRight(key)
+    results["getKeyRight"] = timeIt(queryAll)
+
+    def popRanges():
+        step = (max(keys) - min(keys)) // 64
+        for low in range(min(keys), max(keys), step*2):
+            for _ in sortedDict.getRangeAndPop(low, low + step):
+                pass
+    results["getRangeAndPop (half the keys)"] = timeIt(popRanges)
+
+    remaining = [key for key in keys if key in sortedDict.map]
+    toRemove = remaining[:len(remaining)//2]
+    def removeAll():
+        for key in toRemove:
+            sortedDict.remove(key)
+    results["remove"] = timeIt(removeAll)
+
+    sequential = factory()
+    def insertSequential():
+        for key in sorted(keys):
+            sequential.add(key, key)
+    results["insert (ascending order)"] = timeIt(insertSequential)
+
+    bulk = factory()
+    pairs = [(key, key) for key in keys]
+    def insertBulk():
+        bulk.updateMany(pairs)
+    results["updateMany (random order)"] = timeIt(insertBulk)
+
+    return results
+
+
+def sortedDictBenchMain():
+    parser = argparse.ArgumentParser(description="Compares the chunked SortedDict against the previous single-list implementation")
+    parser.add_argument("-n", "--count", help="Amount of keys to insert. Defaults to 50000", type=int, default=50000)
+    parser.add_argument("--seed", help="Seed used to generate the keys. Defaults to 0", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Word aligned addresses, similar to the autogenerated symbols of a big ROM
+    keys = rng.sample(range(0x80000000, 0x80000000 + args.count * 16, 4), args.count)
+    queries = [rng.randrange(0x80000000, 0x80000000 + args.count * 16) for _ in range(args.count)]
+
+    old = runBenchmarks(BisectSortedDict, keys, queries)
+    new = runBenchmarks(spimdisasm.common.SortedDict, keys, queries)
+
+    print(f"{args.count} keys")
+    print(f"{'benchmark':<32} {'bisect list':>12} {'SortedDict':>12} {'speedup':>8}")
+    for name, oldTime in old.items():
+        newTime = new[name]
+        print(f"{name:<32} {oldTime:>11.4f}s {newTime:>11.4f}s {oldTime/newTime:>7.2f}x")
+
+
+if __name__ == "__main__":
+    sortedDictBenchMain()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Deterministic generator of synthetic MIPS roms, shaped like the output of the IDO and GCC compilers.
+
+Each rom has a main segment and optionally a few overlays which share the same vram. Every segment has its own .text, .data, .rodata and
+.bss sections. The functions reference the other sections using %hi/%lo pairs, call other functions, have branches and loops, and some of
+them use jump tables. The rodata contains strings (some of them EUC-JP encoded), floats, doubles and the jump tables.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import struct
+
+
+ZERO, AT, V0, V1, A0, A1, A2, A3 = range(8)
+T0, T1, T2, T3, T4, T5, T6, T7 = range(8, 16)
+S0, S1 = 16, 17
+GP, SP, RA = 28, 29, 31
+F4 = 4
+
+def encodeR(rs: int, rt: int, rd: int, sa: int, funct: int) -> int:
+    return (rs << 21) | (rt << 16) | (rd << 11) | (sa << 6) | funct
+
+def encodeI(opcode: int, rs: int, rt: int, imm: int) -> int:
+    return (opcode << 26) | (rs << 21) | (rt << 16) | (imm & 0xFFFF)
+
+def encodeJ(opcode: int, target: int) -> int:
+    return (opcode << 26) | ((target >> 2) & 0x3FFFFFF)
+
+def addiu(rt: int, rs: int, imm: int) -> int:
+    return encodeI(0x09, rs, rt, imm)
+
+def lui(rt: int, imm: int=0) -> int:
+    return encodeI(0x0F, 0, rt, imm)
+
+def lw(rt: int, offset: int, base: int) -> int:
+    return encodeI(0x23, base, rt, offset)
+
+def sw(rt: int, offset: int, base: int) -> int:
+    return encodeI(0x2B, base, rt, offset)
+
+def addu(rd: int, rs: int, rt: int) -> int:
+    return encodeR(rs, rt, rd, 0, 0x21)
+
+def sll(rd: int, rt: int, sa: int) -> int:
+    return encodeR(0, rt, rd, sa, 0x00)
+
+def jr(rs: int) -> int:
+    return encodeR(rs, 0, 0, 0, 0x08)
+
+def beq(rs: int, rt: int, offset: int) -> int:
+    return encodeI(0x04, rs, rt, offset)
+
+def bne(rs: int, rt: int, offset: int) -> int:
+    return encodeI(0x05, rs, rt, offset)
+
+NOP = 0
+
+def hiHalf(address: int) -> int:
+    return ((address >> 16) + ((address >> 15) & 1)) & 0xFFFF
+
+def loHalf(address: int) -> int:
+    return address & 0xFFFF
+
+
+class SyntheticSegment:
+    """A segment with its .text, .data and .rodata placed contiguously in the rom, followed by its .bss.
+
+    References to addresses are stored as relocations, which are resolved once every segment has been placed.
+    """
+
+    def __init__(self, name: str, vram: int, overlayCategory: str|None, functionsCount: int):
+        self.name: str = name
+        self.vram: int = vram
+        self.overlayCategory: str|None = overlayCategory
+        self.functionsCount: int = functionsCount
+        self.vromStart: int = 0
+
+        self.text: list[int] = list()
+        self.data: list[int] = list()
+        self.rodata: list[int] = list()
+        self.bssSize: int = 0
+
+        self.functionOffsets: list[int] = list()
+        "Offset of each function, relative to the start of .text"
+
+        self.relocs: list[tuple[str, int, str, SyntheticSegment, str, int]] = list()
+        "(section, word index, kind, target segment, target section, target offset). `function` sections use the function index as the offset"
+
+    @property
+    def textVram(self) -> int:
+        return self.vram
+
+    @property
+    def dataVram(self) -> int:
+        return self.textVram + len(self.text)*4
+
+    @property
+    def rodataVram(self) -> int:
+        return self.dataVram + len(self.data)*4
+
+    @property
+    def bssVram(self) -> int:
+        return self.rodataVram + len(self.rodata)*4
+
+    @property
+    def vramEnd(self) -> int:
+        return self.bssVram + self.bssSize
+
+    @property
+    def vromEnd(self) -> int:
+        return self.vromStart + (len(self.text) + len(self.data) + len(self.rodata))*4
+
+    def getSectionRanges(self) -> list[tuple[str, int, int, int]]:
+        "Returns the (section name, vrom start, vrom end, vram) of each section"
+        textVrom = self.vromStart
+        dataVrom = textVrom + len(self.text)*4
+        rodataVrom = dataVrom + len(self.data)*4
+        bssVrom = rodataVrom + len(self.rodata)*4
+        return [
+            ("text", textVrom, dataVrom, self.textVram),
+            ("data", dataVrom, rodataVrom, self.dataVram),
+            ("rodata", rodataVrom, bssVrom, self.rodataVram),
+            ("bss", bssVrom, bssVrom, self.bssVram),
+        ]
+
+    def getAddress(self, section: str, offset: int) -> int:
+        if section == "function":
+            return self.textVram + self.functionOffsets[offset]
+        return {"text": self.textVram, "data": self.dataVram, "rodata": self.rodataVram, "bss": self.bssVram}[section] + offset
+
+
+    def resolveRelocs(self) -> None:
+        for section, index, kind, targetSegment, targetSection, targetOffset in self.relocs:
+            words = {"text": self.text, "data": self.data, "rodata": self.rodata}[section]
+            address = targetSegment.getAddress(targetSection, targetOffset)
+            if kind == "hi":
+                words[index] |= hiHalf(address)
+            elif kind == "lo":
+                words[index] |= loHalf(address)
+            elif kind == "jal":
+                words[index] = encodeJ(0x03, address)
+            else:
+                words[index] = address
+
+    def toBytes(self) -> bytes:
+        words = self.text + self.data + self.rodata
+        return struct.pack(f">{len(words)}I", *words)
+
+
+class SyntheticRomBuilder:
+    def __init__(self, seed: int, compiler: str):
+        self.rng = random.Random(seed)
+        self.compiler: str = compiler
+        self.segments: list[SyntheticSegment] = list()
+
+    def _fillRodata(self, segment: SyntheticSegment) -> tuple[list[int], list[int], list[int]]:
+        "Returns the offsets of the strings, floats and doubles"
+        rng = self.rng
+        strings: list[int] = list()
+        for i in range(max(segment.functionsCount, 8)):
+            if i % 16 == 0:
+                encoded = f"テキスト{i}\n".encode("EUC-JP")
+            else:
+                encoded = (f"str{i} " + "".join(rng.choice("abcdefghijklmnop %d\n") for _ in range(rng.randint(0, 40)))).encode()
+            encoded += b"\0" * (4 - len(encoded) % 4)
+            strings.append(len(segment.rodata)*4)
+            segment.rodata += struct.unpack(f">{len(encoded)//4}I", encoded)
+
+        floats: list[int] = list()
+        for _ in range(len(strings) // 2):
+            floats.append(len(segment.rodata)*4)
+            segment.rodata += struct.unpack(">I", struct.pack(">f", rng.uniform(-1000, 1000)))
+
+        if len(segment.rodata) % 2 != 0:
+            segment.rodata.append(0)
+        doubles: list[int] = list()
+        for _ in range(len(strings) // 4):
+            doubles.append(len(segment.rodata)*4)
+            segment.rodata += struct.unpack(">2I", struct.pack(">d", rng.uniform(-1e6, 1e6)))
+        return strings, floats, doubles
+
+    def _emitRelocated(self, segment: SyntheticSegment, instr: int, kind: str, targetSegment: SyntheticSegment, targetSection: str, targetOffset: int) -> None:
+        segment.relocs.append(("text", len(segment.text), kind, targetSegment, targetSection, targetOffset))
+        segment.text.append(instr)
+
+    def _emitHiLo(self, segment: SyntheticSegment, hiInstr: int, loInstr: int, targetSection: str, targetOffset: int) -> None:
+        self._emitRelocated(segment, hiInstr, "hi", segment, targetSection, targetOffset)
+        self._emitRelocated(segment, loInstr, "lo", segment, targetSection, targetOffset)
+
+    def _emitJumpTable(self, segment: SyntheticSegment, casesCount: int) -> None:
+        "Emits a switch with `casesCount` cases, and its jump table at the end of the rodata"
+        text = segment.text
+        jumpTableOffset = len(segment.rodata)*4
+        segment.rodata += [0] * casesCount
+
+        text.append(encodeI(0x0B, A0, AT, casesCount)) # sltiu at, a0, casesCount
+        branchIndex = len(text)
+        text.append(beq(AT, ZERO, 0))
+        text.append(NOP)
+        if self.compiler == "IDO":
+            text.append(sll(T6, A0, 2))
+            self._emitRelocated(segment, lui(AT), "hi", segment, "rodata", jumpTableOffset)
+            text.append(addu(AT, AT, T6))
+            self._emitRelocated(segment, lw(T6, 0, AT), "lo", segment, "rodata", jumpTableOffset)
+            text.append(jr(T6))
+        else:
+            text.append(sll(V0, A0, 2))
+            self._emitHiLo(segment, lui(V1), addiu(V1, V1, 0), "rodata", jumpTableOffset)
+            text.append(addu(V0, V0, V1))
+            text.append(lw(V0, 0, V0))
+            text.append(jr(V0))
+        text.append(NOP)
+
+        caseBranches: list[int] = list()
+        for case in range(casesCount):
+            segment.relocs.append(("rodata", jumpTableOffset//4 + case, "word", segment, "text", len(text)*4))
+            text.append(addiu(V0, ZERO, case))
+            caseBranches.append(len(text))
+            text.append(beq(ZERO, ZERO, 0))
+            text.append(NOP)
+
+        end = len(text)
+        text[branchIndex] |= (end - branchIndex - 1) & 0xFFFF
+        for index in caseBranches:
+            text[index] |= (end - index - 1) & 0xFFFF
+
+    def _emitBody(self, segment: SyntheticSegment, instructionsCount: int, strings: list[int], floats: list[int], doubles: list[int], dataSymbols: list[tuple[str, int]], callableSegments: list[SyntheticSegment]) -> None:
+        rng = self.rng
+        text = segment.text
+
+        bodyStart = len(text)
+        while len(text) - bodyStart < instructionsCount:
+            choice = rng.random()
+            if choice < 0.15:
+                # Address of a variable
+                section, offset = rng.choice(dataSymbols)
+                reg = rng.choice([T0, T1, A0, V0])
+                self._emitHiLo(segment, lui(reg), addiu(reg, reg, 0), section, offset)
+            elif choice < 0.28:
+                # Load from a variable
+                section, offset = rng.choice(dataSymbols)
+                reg = rng.choice([T0, T1, T2, V0])
+                if self.compiler == "IDO":
+                    self._emitHiLo(segment, lui(AT), lw(reg, 0, AT), section, offset)
+                else:
+                    self._emitHiLo(segment, lui(reg), lw(reg, 0, reg), section, offset)
+            elif choice < 0.33:
+                self._emitHiLo(segment, lui(AT), encodeI(0x31, AT, F4, 0), "rodata", rng.choice(floats)) # lwc1
+            elif choice < 0.36:
+                self._emitHiLo(segment, lui(AT), encodeI(0x35, AT, F4, 0), "rodata", rng.choice(doubles)) # ldc1
+            elif choice < 0.42:
+                self._emitHiLo(segment, lui(A0), addiu(A0, A0, 0), "rodata", rng.choice(strings))
+            elif choice < 0.52:
+                targetSegment = rng.choice(callableSegments)
+                self._emitRelocated(segment, 0, "jal", targetSegment, "function", rng.randrange(targetSegment.functionsCount))
+                text.append(NOP)
+            elif choice < 0.62:
+                skipped = rng.randint(1, 4)
+                text.append(bne(T0, ZERO, skipped + 1))
+                text.append(NOP)
+                text += [addu(T2, T0, T1)] * skipped
+            elif choice < 0.66 and len(text) - bodyStart > 6:
+                text.append(bne(T1, ZERO, -rng.randint(2, 5)))
+                text.append(NOP)
+            else:
+                text.append(addu(rng.choice([T3, V0]), rng.choice([T0, T1, A0]), rng.choice([T2, A1])))
+
+    def _emitFunction(self, segment: SyntheticSegment, instructionsCount: int, strings: list[int], floats: list[int], doubles: list[int], dataSymbols: list[tuple[str, int]], callableSegments: list[SyntheticSegment], jumpTablesCount: int) -> None:
+        rng = self.rng
+        text = segment.text
+        segment.functionOffsets.append(len(text)*4)
+
+        frameSize = 0x18 + 8*rng.randint(0, 6)
+        text.append(addiu(SP, SP, -frameSize))
+        if self.compiler == "IDO":
+            text.append(sw(RA, 0x14, SP))
+        else:
+            text.append(sw(RA, frameSize - 4, SP))
+            text.append(sw(S0, frameSize - 8, SP))
+
+        # The jump tables are spread through the body, the last one is placed at its end
+        chunksCount = max(jumpTablesCount, 1)
+        for chunk in range(chunksCount):
+            chunkSize = instructionsCount * (chunk + 1) // chunksCount - instructionsCount * chunk // chunksCount
+            self._emitBody(segment, chunkSize, strings, floats, doubles, dataSymbols, callableSegments)
+            if chunk < jumpTablesCount:
+                self._emitJumpTable(segment, rng.randint(3, 10))
+
+        if self.compiler == "IDO":
+            text.append(lw(RA, 0x14, SP))
+        else:
+            text.append(lw(RA, frameSize - 4, SP))
+            text.append(lw(S0, frameSize - 8, SP))
+        text.append(jr(RA))
+        text.append(addiu(SP, SP, frameSize))
+
+        # Alignment padding between functions
+        while rng.random() < 0.3 or (self.compiler == "GCC" and len(text) % 4 != 0):
+            text.append(NOP)
+
+    def addSegment(self, name: str, vram: int, overlayCategory: str|None, functionsCount: int, callableSegments: list[SyntheticSegment], functionSize: int|None=None, jumpTablesPerFunction: int|None=None) -> SyntheticSegment:
+        """Adds a segment with `functionsCount` functions which may call the functions of `callableSegments`.
+
+        Unless `functionSize` and `jumpTablesPerFunction` are passed, the size of each function is random and one out of six functions have a
+        jump table.
+        """
+        rng = self.rng
+        segment = SyntheticSegment(name, vram, overlayCategory, functionsCount)
+        strings, floats, doubles = self._fillRodata(segment)
+
+        dataWordsCount = 16 * functionsCount
+        segment.bssSize = 0x40 * functionsCount
+        dataSymbols: list[tuple[str, int]] = [("data", 4*rng.randrange(dataWordsCount)) for _ in range(functionsCount)]
+        dataSymbols += [("bss", 4*rng.randrange(segment.bssSize//4)) for _ in range(functionsCount // 2)]
+
+        for i in range(functionsCount):
+            instructionsCount = rng.randint(8, 120) if functionSize is None else functionSize
+            jumpTablesCount = (1 if i % 6 == 0 else 0) if jumpTablesPerFunction is None else jumpTablesPerFunction
+            self._emitFunction(segment, instructionsCount, strings, floats, doubles, dataSymbols, callableSegments + [segment], jumpTablesCount)
+        while len(segment.text) % 4 != 0:
+            segment.text.append(NOP)
+
+        for i in range(dataWordsCount):
+            choice = rng.random()
+            if choice < 0.15:
+                segment.relocs.append(("data", i, "word", segment, "function", rng.randrange(functionsCount)))
+                segment.data.append(0)
+            elif choice < 0.25:
+                section, offset = rng.choice(dataSymbols + [("rodata", stringOffset) for stringOffset in strings])
+                segment.relocs.append(("data", i, "word", segment, section, offset))
+                segment.data.append(0)
+            elif choice < 0.6:
+                segment.data.append(0)
+            else:
+                segment.data.append(rng.getrandbits(31))
+        while len(segment.rodata) % 4 != 0:
+            segment.rodata.append(0)
+
+        self.segments.append(segment)
+        return segment
+
+    def build(self) -> bytearray:
+        "Places every segment on the rom, after a 0x1000 bytes header, and resolves the relocations"
+        rom = bytearray(0x1000)
+        for segment in self.segments:
+            segment.vromStart = len(rom)
+            rom += bytes(4*(len(segment.text) + len(segment.data) + len(segment.rodata)))
+        for segment in self.segments:
+            segment.resolveRelocs()
+            rom[segment.vromStart:segment.vromEnd] = segment.toBytes()
+        return rom
+
+
+def generateCorpus(seed: int=0, functionsCount: int=500, overlaysCount: int=4, compiler: str="IDO") -> tuple[bytearray, list[SyntheticSegment]]:
+    """Generates a rom with a main segment of `functionsCount` functions and `overlaysCount` overlays, each one with a quarter of those functions.
+
+    The same arguments always produce the same rom.
+    """
+    builder = SyntheticRomBuilder(seed, compiler)
+    mainSegment = builder.addSegment("main", 0x80000400, None, functionsCount, [])
+    for i in range(overlaysCount):
+        builder.addSegment(f"ovl_{i}", 0x80400000, "ovl", max(functionsCount // 4, 1), [mainSegment])
+    return builder.build(), builder.segments
+
+
+def writeSplitsCsv(path: Path, segment: SyntheticSegment) -> None:
+    "Writes a file splits csv of the passed segment, usable with `singleFileDisasm`"
+    lines: list[str] = list()
+    for sectionName, vromStart, vromEnd, vram in segment.getSectionRanges():
+        lines.append(f"offset,vram,.{sectionName}")
+        lines.append(f"{vromStart:X},{vram:X},{segment.name}")
+    lines.append(f"{segment.getSectionRanges()[-1][1] + segment.bssSize:X},{segment.vramEnd:X},.end")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def syntheticCorpusMain():
+    parser = argparse.ArgumentParser(description="Writes a synthetic rom and the file splits of its main segment, which can be used with singleFileDisasm")
+    parser.add_argument("output", help="Directory where the rom.bin and splits.csv files will be written")
+    parser.add_argument("-n", "--functions", help="Amount of functions of the main segment. Defaults to 500", type=int, default=500)
+    parser.add_argument("--overlays", help="Amount of overlays appended after the main segment. Defaults to 0", type=int, default=0)
+    parser.add_argument("--compiler", help="Compiler style of the generated functions. Defaults to IDO", choices=["IDO", "GCC"], default="IDO")
+    parser.add_argument("--seed", help="Seed used to generate the rom. Defaults to 0", type=int, default=0)
+    args = parser.parse_args()
+
+    rom, segments = generateCorpus(args.seed, args.functions, args.overlays, args.compiler)
+    outputPath = Path(args.output)
+    outputPath.mkdir(parents=True, exist_ok=True)
+    (outputPath / "rom.bin").write_bytes(rom)
+    writeSplitsCsv(outputPath / "splits.csv", segments[0])
+
+
+if __name__ == "__main__":
+    syntheticCorpusMain()
@@ -7,10 +7,15 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Generator
 
 from . import Utils
+from .GlobalConfig import DisasmConfig, GlobalConfig
 from .FileSectionType import FileSectionType
+from .IntervalIndex import IntervalIndex
 from .ContextSymbols import SymbolSpecialType, ContextOffsetSymbol, ContextRelocSymbol
+from .ContextSnapshot import SnapshotWriter, SnapshotReader
+from .SortedDict import SortedDict
 from .SymbolsSegment import SymbolsSegment
 from .GlobalOffsetTable import GlobalOffsetTable
 
@@ -24,15 +29,23 @@ class Context:
         0x80000020,
     }
 
-    def __init__(self):
+    def __init__(self, config: DisasmConfig|None=None):
+        self.config: DisasmConfig = config if config is not None else GlobalConfig.copy()
+        "The settings used to disassemble the sections which use this context. Defaults to a copy of `GlobalConfig`"
+
         # Arbitrary initial range
-        self.globalSegment = SymbolsSegment(0x0, 0x1000, 0x80000000, 0x80001000, overlayCategory=None)
+        self.globalSegment = SymbolsSegment(0x0, 0x1000, 0x80000000, 0x80001000, overlayCategory=None, config=self.config)
         # For symbols that we don't know where they come from
-        self.unknownSegment = SymbolsSegment(None, None, 0x00000000, 0xFFFFFFFF, overlayCategory=None)
+        self.unknownSegment = SymbolsSegment(None, None, 0x00000000, 0xFFFFFFFF, overlayCategory=None, config=self.config)
 
         self.overlaySegments: dict[str, dict[int, SymbolsSegment]] = dict()
         "Outer key is overlay type, inner key is the vrom of the overlay's segment"
 
+        self._overlaySegmentsByVram: IntervalIndex[SymbolsSegment]|None = None
+        "Built from `overlaySegments` the first time it is needed. Discarded each time a new overlay segment is added"
+        self._overlaySegmentsByVrom: IntervalIndex[SymbolsSegment]|None = None
+        "Built from `overlaySegments` the first time it is needed. Discarded each time a new overlay segment is added"
+
         # Stuff that looks like pointers, but the disassembler shouldn't count it as a pointer
         self.bannedSymbols: set[int] = set()
 
@@ -58,14 +71,65 @@ class Context:
 
         self.got: GlobalOffsetTable = GlobalOffsetTable()
 
+        self.countLookups: bool = False
+        "Makes every segment of this context count how many times a symbol is searched on it. Set with `setLookupsCounting`"
+
 
     def addOverlaySegment(self, overlayCategory: str, segmentVromStart: int, segmentVromEnd: int, segmentVramStart: int, segmentVramEnd: int) -> SymbolsSegment:
         if overlayCategory not in self.overlaySegments:
             self.overlaySegments[overlayCategory] = dict()
-        segment = SymbolsSegment(segmentVromStart, segmentVromEnd, segmentVramStart, segmentVramEnd, overlayCategory=overlayCategory)
+        segment = SymbolsSegment(segmentVromStart, segmentVromEnd, segmentVramStart, segmentVramEnd, overlayCategory=overlayCategory, config=self.config)
+        segment.countLookups = self.countLookups
         self.overlaySegments[overlayCategory][segmentVromStart] = segment
+
+        self._overlaySegmentsByVram = None
+        self._overlaySegmentsByVrom = None
         return segment
 
+    def getAllSegments(self) -> Generator[SymbolsSegment, None, None]:
+        "Iterates the global segment, the unknown segment and every overlay segment"
+        yield self.globalSegment
+        yield self.unknownSegment
+        for segmentsPerVrom in self.overlaySegments.values():
+            yield from segmentsPerVrom.values()
+
+    def setLookupsCounting(self, enabled: bool) -> None:
+        """Enables counting on the `lookupsCount` of each segment how many times a symbol is searched on it, including the segments added later.
+
+        Disabled by default, since searching symbols is done many times while disassembling.
+        """
+        self.countLookups = enabled
+        for segment in self.getAllSegments():
+            segment.countLookups = enabled
+
+    def _getOverlaySegmentsByVram(self) -> IntervalIndex[SymbolsSegment]:
+        if self._overlaySegmentsByVram is None:
+            intervals: list[tuple[int, int, SymbolsSegment]] = list()
+            for segmentsPerVrom in self.overlaySegments.values():
+                for overlaySegment in segmentsPerVrom.values():
+                    intervals.append((overlaySegment.vramStart, overlaySegment.vramEnd, overlaySegment))
+            self._overlaySegmentsByVram = IntervalIndex(intervals)
+        return self._overlaySegmentsByVram
+
+    def getOverlaySegmentsForVram(self, vram: int) -> list[SymbolsSegment]:
+        "Returns every overlay segment which contains the passed vram, in the same order they are iterated on `overlaySegments`"
+        return self._getOverlaySegmentsByVram().getValues(vram)
+
+    def getOverlaySegmentsForVramRange(self, vramStart: int, vramEnd: int) -> list[SymbolsSegment]:
+        "Returns every overlay segment which overlaps the [`vramStart`, `vramEnd`) range"
+        return self._getOverlaySegmentsByVram().getValuesInRange(vramStart, vramEnd)
+
+    def getOverlaySegmentsForVrom(self, vrom: int) -> list[SymbolsSegment]:
+        "Returns every overlay segment which contains the passed vrom, in the same order they are iterated on `overlaySegments`"
+        if self._overlaySegmentsByVrom is None:
+            intervals: list[tuple[int, int, SymbolsSegment]] = list()
+            for segmentsPerVrom in self.overlaySegments.values():
+                for overlaySegment in segmentsPerVrom.values():
+                    if overlaySegment.vromStart is not None and overlaySegment.vromEnd is not None:
+                        intervals.append((overlaySegment.vromStart, overlaySegment.vromEnd, overlaySegment))
+            self._overlaySegmentsByVrom = IntervalIndex(intervals)
+        return self._overlaySegmentsByVrom.getValues(vrom)
+
 
     def getOffsetSymbol(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol|None:
         if sectionType in self.offsetSymbols:
@@ -100,7 +164,7 @@ class Context:
 
     def addOffsetJumpTable(self, offset: int, sectionType: FileSectionType) -> ContextOffsetSymbol:
         if offset not in self.offsetJumpTables:
-            contextOffsetSym = ContextOffsetSymbol(offset, f"jtbl_{offset:06X}", sectionType)
+            contextOffsetSym = ContextOffsetSymbol(offset, f"jtbl_{offset:06X}", sectionType, config=self.config)
             contextOffsetSym.type = SymbolSpecialType.jumptable
             self.offsetJumpTables[offset] = contextOffsetSym
             return contextOffsetSym
@@ -108,7 +172,7 @@ class Context:
 
     def addOffsetJumpTableLabel(self, offset: int, name: str, sectionType: FileSectionType) -> ContextOffsetSymbol:
         if offset not in self.offsetJumpTablesLabels:
-            contextOffsetSym = ContextOffsetSymbol(offset, name, sectionType)
+            contextOffsetSym = ContextOffsetSymbol(offset, name, sectionType, config=self.config)
             contextOffsetSym.type = SymbolSpecialType.jumptablelabel
             self.offsetJumpTablesLabels[offset] = contextOffsetSym
             return contextOffsetSym
@@ -137,11 +201,119 @@ class Context:
                     overlaySegment.saveContextToFile(f)
 
 
+    @staticmethod
+    def _writeSegmentSnapshot(writer: SnapshotWriter, segment: SymbolsSegment) -> None:
+        writer.writeOptionalInt(segment.vromStart)
+        writer.writeOptionalInt(segment.vromEnd)
+        writer.writeInts((segment.vramStart, segment.vramEnd))
+        writer.writeString(segment.overlayCategory)
+
+        writer.writeSymbols(segment.symbols.values())
+        writer.writeSymbols(segment.constants.values())
+        writer.writeInts(segment.newPointersInData.keys())
+        writer.writeInts(value for pair in segment.loPatches.items() for value in pair)
+        writer.writeInts(sorted(segment.dataSymbolsWithReferencesWithAddends))
+        writer.writeInts(sorted(segment.dataReferencingConstants))
+
+    def _readSegmentSnapshot(self, reader: SnapshotReader) -> SymbolsSegment:
+        vromStart = reader.readOptionalInt()
+        vromEnd = reader.readOptionalInt()
+        vramStart, vramEnd = reader.readInts()
+        overlayCategory = reader.readString()
+        segment = SymbolsSegment(vromStart, vromEnd, vramStart, vramEnd, overlayCategory=overlayCategory, config=self.config)
+        segment.countLookups = self.countLookups
+
+        segment.symbols = SortedDict({contextSym.address: contextSym for contextSym in reader.readSymbols()})
+        segment.constants = {contextSym.address: contextSym for contextSym in reader.readSymbols()}
+        segment.newPointersInData = SortedDict({pointer: pointer for pointer in reader.readInts()})
+        loPatches = reader.readInts()
+        segment.loPatches = {loPatches[i]: loPatches[i+1] for i in range(0, len(loPatches), 2)}
+        segment.dataSymbolsWithReferencesWithAddends = set(reader.readInts())
+        segment.dataReferencingConstants = set(reader.readInts())
+        return segment
+
+    def saveSnapshot(self, snapshotPath: Path) -> None:
+        """Saves every symbol and table of the context to a binary snapshot, which can be restored with `loadSnapshot`.
+
+        Unlike `saveContextToFile` the snapshot is not meant to be read by humans, but it keeps everything the context knows about.
+        """
+        writer = SnapshotWriter()
+
+        self._writeSegmentSnapshot(writer, self.globalSegment)
+        self._writeSegmentSnapshot(writer, self.unknownSegment)
+        writer.writeCount(len(self.overlaySegments))
+        for overlayCategory, segmentsPerVrom in self.overlaySegments.items():
+            writer.writeString(overlayCategory)
+            writer.writeInts(segmentsPerVrom.keys())
+            for overlaySegment in segmentsPerVrom.values():
+                self._writeSegmentSnapshot(writer, overlaySegment)
+
+        writer.writeInts(sorted(self.bannedSymbols))
+
+        writer.writeCount(len(self.offsetSymbols))
+        for sectionType, offsetSymbols in self.offsetSymbols.items():
+            writer.writeInts((sectionType.value,))
+            writer.writeSymbols(offsetSymbols.values())
+        writer.writeCount(len(self.relocSymbols))
+        for sectionType, relocSymbols in self.relocSymbols.items():
+            writer.writeInts((sectionType.value,))
+            writer.writeSymbols(relocSymbols.values(), isReloc=True)
+        writer.writeSymbols(self.offsetJumpTables.values())
+        writer.writeSymbols(self.offsetJumpTablesLabels.values())
+
+        writer.writeOptionalInt(self.got.tableStart)
+        writer.writeInts(self.got.localsTable)
+        writer.writeInts(self.got.globalsTable)
+
+        snapshotPath.parent.mkdir(parents=True, exist_ok=True)
+        snapshotPath.write_bytes(writer.toBytes())
+
+    def loadSnapshot(self, snapshotPath: Path) -> None:
+        """Replaces the contents of this context with the ones of a snapshot written by `saveSnapshot`.
+
+        The configuration of this context is kept and given to every loaded symbol.
+        """
+        reader = SnapshotReader(snapshotPath.read_bytes(), config=self.config)
+
+        self.globalSegment = self._readSegmentSnapshot(reader)
+        self.unknownSegment = self._readSegmentSnapshot(reader)
+        self.overlaySegments = dict()
+        for _ in range(reader.readCount()):
+            overlayCategory = reader.readString()
+            assert overlayCategory is not None
+            segmentsVroms = reader.readInts()
+            self.overlaySegments[overlayCategory] = {segmentVrom: self._readSegmentSnapshot(reader) for segmentVrom in segmentsVroms}
+        self._overlaySegmentsByVram = None
+        self._overlaySegmentsByVrom = None
+
+        self.bannedSymbols = set(reader.readInts())
+
+        self.offsetSymbols = dict()
+        for _ in range(reader.readCount()):
+            sectionType = FileSectionType(reader.readInts()[0])
+            self.offsetSymbols[sectionType] = {contextSym.address: contextSym for contextSym in reader.readOffsetSymbols()}
+        self.relocSymbols = dict()
+        for _ in range(reader.readCount()):
+            sectionType = FileSectionType(reader.readInts()[0])
+            self.relocSymbols[sectionType] = {contextSym.address: contextSym for contextSym in reader.readRelocSymbols()}
+        self.offsetJumpTables = {contextSym.address: contextSym for contextSym in reader.readOffsetSymbols()}
+        self.offsetJumpTablesLabels = {contextSym.address: contextSym for contextSym in reader.readOffsetSymbols()}
+
+        self.got = GlobalOffsetTable()
+        self.got.tableStart = reader.readOptionalInt()
+        self.got.localsTable = list(reader.readInts())
+        self.got.globalsTable = list(reader.readInts())
+
+        reader.readReferences()
+
+
     @staticmethod
     def addParametersToArgParse(parser: argparse.ArgumentParser):
         contextParser = parser.add_argument_group("Context configuration")
 
         contextParser.add_argument("--save-context", help="Saves the context to a file", metavar="FILENAME")
+        contextParser.add_argument("--save-context-snapshot", help="Saves the whole context to a binary snapshot, which can be loaded with --load-context-snapshot", metavar="FILENAME")
+        contextParser.add_argument("--load-context-snapshot", help="Starts from the context saved on a binary snapshot instead of an empty one", metavar="FILENAME")
 
 
         csvConfig = parser.add_argument_group("Context .csv input files")
@@ -160,6 +332,9 @@ class Context:
 
 
     def parseArgs(self, args: argparse.Namespace):
+        if args.load_context_snapshot is not None:
+            self.loadSnapshot(Path(args.load_context_snapshot))
+
         if args.default_banned != False:
             self.fillDefaultBannedSymbols()
         if args.libultra_syms != False:
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import array
+import struct
+import sys
+from typing import Callable, Iterable
+
+from .GlobalConfig import DisasmConfig
+from .FileSectionType import FileSectionType
+from .ContextSymbols import SymbolSpecialType, ContextSymbol, ContextOffsetSymbol, ContextRelocSymbol
+
+
+class SnapshotFormatError(Exception):
+    "The file is not a context snapshot or it was written by an incompatible version"
+
+
+_NoneIndex = 0xFFFFFFFF
+"Used in place of the index of a string which is `None`"
+
+_TypeNone = 0
+_TypeSpecial = 1
+_TypeString = 2
+
+_FlagHasSize = 1 << 0
+_FlagHasVrom = 1 << 1
+_FlagIsDefined = 1 << 2
+_FlagIsUserDeclared = 1 << 3
+_FlagIsAutogenerated = 1 << 4
+_FlagIsMaybeString = 1 << 5
+_FlagUnknownSegment = 1 << 6
+_FlagIsGot = 1 << 7
+_FlagIsGotGlobal = 1 << 8
+
+_SpecialTypes: list[SymbolSpecialType] = list(SymbolSpecialType)
+
+# address, name, size, vromAddress, type value, type kind, section type, flags, reference counter, overlay category
+_SymbolStruct = struct.Struct("<qIIIIBbHII")
+# reloc section, reloc type
+_RelocStruct = struct.Struct("<bi")
+_CountStruct = struct.Struct("<I")
+
+
+def _arrayToBytes(values: array.array[int]) -> bytes:
+    if sys.byteorder != "little":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class SnapshotWriter:
+    """Serializes the pieces of a context into the snapshot format.
+
+    The snapshot consists of a header, a string table, the body and a table of references between symbols. Every string is stored once on
+    the string table and referenced by index, and every list of numbers or symbols is stored as a count followed by its packed values.
+    """
+
+    Magic: bytes = b"SPIMCTX\x00"
+    FormatVersion: int = 1
+    "Bumped each time the layout of the snapshot changes in an incompatible way"
+
+    def __init__(self):
+        self._strings: dict[str, int] = dict()
+        self._body: list[bytes] = list()
+
+        self._symbolIndices: dict[int, int] = dict()
+        "Maps the `id` of every written symbol to its index, in the order they were written"
+        self._writtenSymbols: list[ContextSymbol] = list()
+
+
+    def _getStringIndex(self, string: str|None) -> int:
+        if string is None:
+            return _NoneIndex
+        index = self._strings.get(string)
+        if index is None:
+            index = len(self._strings)
+            self._strings[string] = index
+        return index
+
+    def writeString(self, string: str|None) -> None:
+        self.writeCount(self._getStringIndex(string))
+
+    def writeCount(self, count: int) -> None:
+        self._body.append(_CountStruct.pack(count))
+
+    def writeOptionalInt(self, value: int|None) -> None:
+        if value is None:
+            self._body.append(struct.pack("<Bq", 0, 0))
+        else:
+            self._body.append(struct.pack("<Bq", 1, value))
+
+    def writeInts(self, values: Iterable[int]) -> None:
+        "Writes a list of signed integers of up to 64 bits"
+        packed = array.array("q", values)
+        self.writeCount(len(packed))
+        self._body.append(_arrayToBytes(packed))
+
+    def writeSymbols(self, symbols: Iterable[ContextSymbol], isReloc: bool=False) -> None:
+        symbolsList = list(symbols)
+        self.writeCount(len(symbolsList))
+        for contextSym in symbolsList:
+            self._symbolIndices[id(contextSym)] = len(self._writtenSymbols)
+            self._writtenSymbols.append(contextSym)
+
+            if contextSym.type is None:
+                typeKind = _TypeNone
+                typeValue = 0
+            elif isinstance(contextSym.type, SymbolSpecialType):
+                typeKind = _TypeSpecial
+                typeValue = _SpecialTypes.index(contextSym.type)
+            else:
+                typeKind = _TypeString
+                typeValue = self._getStringIndex(contextSym.type)
+
+            flags = 0
+            if contextSym.size is not None:
+                flags |= _FlagHasSize
+            if contextSym.vromAddress is not None:
+                flags |= _FlagHasVrom
+            if contextSym.isDefined:
+                flags |= _FlagIsDefined
+            if contextSym.isUserDeclared:
+                flags |= _FlagIsUserDeclared
+            if contextSym.isAutogenerated:
+                flags |= _FlagIsAutogenerated
+            if contextSym.isMaybeString:
+                flags |= _FlagIsMaybeString
+            if contextSym.unknownSegment:
+                flags |= _FlagUnknownSegment
+            if contextSym.isGot:
+                flags |= _FlagIsGot
+            if contextSym.isGotGlobal:
+                flags |= _FlagIsGotGlobal
+
+            self._body.append(_SymbolStruct.pack(
+                contextSym.address,
+                self._getStringIndex(contextSym.name),
+                contextSym.size if contextSym.size is not None else 0,
+                contextSym.vromAddress if contextSym.vromAddress is not None else 0,
+                typeValue,
+                typeKind,
+                contextSym.sectionType.value,
+                flags,
+                contextSym.referenceCounter,
+                self._getStringIndex(contextSym.overlayCategory),
+            ))
+            if isReloc:
+                assert isinstance(contextSym, ContextRelocSymbol)
+                self._body.append(_RelocStruct.pack(contextSym.relocSection.value, contextSym.relocType))
+
+
+    def toBytes(self) -> bytes:
+        encodedStrings = [string.encode("utf-8") for string in self._strings]
+        stringLengths = array.array("I", (len(encoded) for encoded in encodedStrings))
+
+        # Which functions reference each symbol, as pairs of indices of written symbols. Symbols which were not written are dropped
+        references = array.array("I")
+        for symbolIndex, contextSym in enumerate(self._writtenSymbols):
+            functionIndices = (self._symbolIndices.get(id(referenceFunction)) for referenceFunction in contextSym.referenceFunctions)
+            for functionIndex in sorted(index for index in functionIndices if index is not None):
+                references.append(symbolIndex)
+                references.append(functionIndex)
+
+        chunks: list[bytes] = [
+            self.Magic,
+            _CountStruct.pack(self.FormatVersion),
+            _CountStruct.pack(len(stringLengths)),
+            _arrayToBytes(stringLengths),
+            b"".join(encodedStrings),
+        ]
+        chunks += self._body
+        chunks.append(_CountStruct.pack(len(references) // 2))
+        chunks.append(_arrayToBytes(references))
+        return b"".join(chunks)
+
+
+class SnapshotReader:
+    "Reads back, in the same order, the pieces written by a `SnapshotWriter`"
+
+    def __init__(self, data: bytes|bytearray|memoryview, config: DisasmConfig|None=None):
+        self._data = memoryview(data)
+        self._offset = 0
+
+        self.config: DisasmConfig|None = config
+        "Given to every restored symbol"
+
+        self._readSymbols: list[ContextSymbol] = list()
+
+        magic = bytes(self._data[:len(SnapshotWriter.Magic)])
+        if magic != SnapshotWriter.Magic:
+            raise SnapshotFormatError("Not a context snapshot")
+        self._offset = len(SnapshotWriter.Magic)
+        version = self.readCount()
+        if version != SnapshotWriter.FormatVersion:
+            raise SnapshotFormatError(f"Unsupported context snapshot version {version}, expected {SnapshotWriter.FormatVersion}")
+
+        stringsCount = self.readCount()
+        stringLengths = self._readArray("I", stringsCount)
+        self._strings: list[str] = list()
+        for length in stringLengths:
+            self._strings.append(str(self._data[self._offset:self._offset+length], "utf-8"))
+            self._offset += length
+
+
+    def _readArray(self, typecode: str, count: int) -> array.array[int]:
+        values = array.array(typecode)
+        size = count * values.itemsize
+        values.frombytes(self._data[self._offset:self._offset+size])
+        if sys.byteorder != "little":
+            values.byteswap()
+        self._offset += size
+        return values
+
+    def _getString(self, index: int) -> str|None:
+        if index == _NoneIndex:
+            return None
+        return self._strings[index]
+
+    def readString(self) -> str|None:
+        return self._getString(self.readCount())
+
+    def readCount(self) -> int:
+        count: int = _CountStruct.unpack_from(self._data, self._offset)[0]
+        self._offset += _CountStruct.size
+        return count
+
+    def readOptionalInt(self) -> int|None:
+        isPresent, value = struct.unpack_from("<Bq", self._data, self._offset)
+        self._offset += struct.calcsize("<Bq")
+        if not isPresent:
+            return None
+        return value
+
+    def readInts(self) -> array.array[int]:
+        return self._readArray("q", self.readCount())
+
+    def _readSymbolsImpl(self, factory: Callable[..., ContextSymbol], isReloc: bool) -> list[ContextSymbol]:
+        count = self.readCount()
+        symbols: list[ContextSymbol] = list()
+        for _ in range(count):
+            address, nameIndex, size, vromAddress, typeValue, typeKind, sectionTypeValue, flags, referenceCounter, categoryIndex = _SymbolStruct.unpack_from(self._data, self._offset)
+            self._offset += _SymbolStruct.size
+
+            symType: SymbolSpecialType|str|None = None
+            if typeKind == _TypeSpecial:
+                symType = _SpecialTypes[typeValue]
+            elif typeKind == _TypeString:
+                symType = self._strings[typeValue]
+
+            contextSym = factory(
+                address,
+                name=self._getString(nameIndex),
+                size=size if flags & _FlagHasSize else None,
+                type=symType,
+                vromAddress=vromAddress if flags & _FlagHasVrom else None,
+                sectionType=FileSectionType(sectionTypeValue),
+                isDefined=bool(flags & _FlagIsDefined),
+                isUserDeclared=bool(flags & _FlagIsUserDeclared),
+                isAutogenerated=bool(flags & _FlagIsAutogenerated),
+                isMaybeString=bool(flags & _FlagIsMaybeString),
+                referenceCounter=referenceCounter,
+                overlayCategory=self._getString(categoryIndex),
+                unknownSegment=bool(flags & _FlagUnknownSegment),
+                isGot=bool(flags & _FlagIsGot),
+                isGotGlobal=bool(flags & _FlagIsGotGlobal),
+                config=self.config,
+            )
+            if isReloc:
+                relocSectionValue, relocType = _RelocStruct.unpack_from(self._data, self._offset)
+                self._offset += _RelocStruct.size
+                assert isinstance(contextSym, ContextRelocSymbol)
+                contextSym.relocSection = FileSectionType(relocSectionValue)
+                contextSym.relocType = relocType
+
+            symbols.append(contextSym)
+        self._readSymbols += symbols
+        return symbols
+
+    def readSymbols(self) -> list[ContextSymbol]:
+        return self._readSymbolsImpl(ContextSymbol, False)
+
+    def readOffsetSymbols(self) -> list[ContextOffsetSymbol]:
+        def factory(offset: int, name: str|None, sectionType: FileSectionType, **kwargs) -> ContextOffsetSymbol:
+            contextSym = ContextOffsetSymbol(offset, "", sectionType, **kwargs)
+            contextSym.name = name
+            return contextSym
+        symbols: list[ContextOffsetSymbol] = list()
+        for contextSym in self._readSymbolsImpl(factory, False):
+            assert isinstance(contextSym, ContextOffsetSymbol)
+            symbols.append(contextSym)
+        return symbols
+
+    def readRelocSymbols(self) -> list[ContextRelocSymbol]:
+        def factory(offset: int, name: str|None, sectionType: FileSectionType, **kwargs) -> ContextRelocSymbol:
+            contextSym = ContextRelocSymbol(offset, name, FileSectionType.Unknown, sectionType=sectionType, **kwargs)
+            return contextSym
+        symbols: list[ContextRelocSymbol] = list()
+        for contextSym in self._readSymbolsImpl(factory, True):
+            assert isinstance(contextSym, ContextRelocSymbol)
+            symbols.append(contextSym)
+        return symbols
+
+    def readReferences(self) -> None:
+        "Restores the `referenceFunctions` of every read symbol. Must be called after reading everything else"
+        count = self.readCount()
+        references = self._readArray("I", count * 2)
+        for i in range(0, len(references), 2):
+            self._readSymbols[references[i]].addReferenceFunction(self._readSymbols[references[i+1]])
@@ -7,9 +7,9 @@ from __future__ import annotations
 
 import dataclasses
 import enum
-from typing import Callable
+from typing import Callable, FrozenSet, TypeVar
 
-from .GlobalConfig import GlobalConfig
+from .GlobalConfig import DisasmConfig, GlobalConfig
 from .FileSectionType import FileSectionType
 
 
@@ -42,6 +42,27 @@ class SymbolSpecialType(enum.Enum):
         return None
 
 
+_ClassType = TypeVar("_ClassType", bound=type)
+
+def _slottedDataclass(cls: _ClassType) -> _ClassType:
+    """Recreates the passed dataclass using `__slots__` instead of a per-instance `__dict__`, since `dataclass(slots=True)` needs Python 3.10.
+
+    The defaults of the fields are kept by the generated `__init__`, so they are removed from the class to not collide with the slots.
+    Fields with `init=False` must use a `default_factory`, otherwise they are never set. Methods of the class can't use the argumentless
+    `super()`.
+    """
+    fieldNames = tuple(field.name for field in dataclasses.fields(cls))
+    classDict = dict(cls.__dict__)
+    classDict["__slots__"] = fieldNames
+    for fieldName in fieldNames:
+        classDict.pop(fieldName, None)
+    classDict.pop("__dict__", None)
+    classDict.pop("__weakref__", None)
+    newClass: _ClassType = type(cls)(cls.__name__, cls.__bases__, classDict)
+    return newClass
+
+
+@_slottedDataclass
 @dataclasses.dataclass
 class ContextSymbol:
     address: int
@@ -65,8 +86,12 @@ class ContextSymbol:
     referenceCounter: int = 0
     "How much this symbol is referenced by something else"
 
-    referenceFunctions: set[ContextSymbol] = dataclasses.field(default_factory=set)
-    "Which functions reference this symbol"
+    _referenceFunctions: ContextSymbol|set[ContextSymbol]|None = dataclasses.field(default_factory=lambda: None, init=False, repr=False)
+    """Which functions reference this symbol.
+
+    Most symbols are referenced by a single function, so the set is only allocated once a second function references this symbol. Use
+    `addReferenceFunction` and `referenceFunctions` instead of accessing this directly.
+    """
 
     overlayCategory: str|None = None
 
@@ -83,11 +108,43 @@ class ContextSymbol:
     isGot: bool = False
     isGotGlobal: bool = False
 
+    config: DisasmConfig|None = dataclasses.field(default=None, repr=False)
+    "The configuration of the context this symbol belongs to. `GlobalConfig` is used if `None`"
+
 
     @property
     def vram(self) -> int:
         return self.address
 
+    def getConfig(self) -> DisasmConfig:
+        if self.config is None:
+            return GlobalConfig
+        return self.config
+
+    @property
+    def referenceFunctions(self) -> FrozenSet[ContextSymbol]:
+        "Which functions reference this symbol"
+        if self._referenceFunctions is None:
+            return frozenset()
+        if isinstance(self._referenceFunctions, set):
+            return frozenset(self._referenceFunctions)
+        return frozenset((self._referenceFunctions,))
+
+    def addReferenceFunction(self, funcSym: ContextSymbol) -> None:
+        if self._referenceFunctions is None:
+            self._referenceFunctions = funcSym
+        elif isinstance(self._referenceFunctions, set):
+            self._referenceFunctions.add(funcSym)
+        elif self._referenceFunctions != funcSym:
+            self._referenceFunctions = {self._referenceFunctions, funcSym}
+
+    def getReferenceFunctionsCount(self) -> int:
+        if self._referenceFunctions is None:
+            return 0
+        if isinstance(self._referenceFunctions, set):
+            return len(self._referenceFunctions)
+        return 1
+
     def hasNoType(self) -> bool:
         return self.type is None or self.type == ""
 
@@ -97,12 +154,13 @@ class ContextSymbol:
         if self.unknownSegment:
             return False
 
-        if GlobalConfig.TRUST_USER_FUNCTIONS and self.isUserDeclared:
+        config = self.getConfig()
+        if config.TRUST_USER_FUNCTIONS and self.isUserDeclared:
             if self.type == SymbolSpecialType.branchlabel:
                 return False
             return True
 
-        if GlobalConfig.TRUST_JAL_FUNCTIONS and self.isAutogenerated and self.type == SymbolSpecialType.function:
+        if config.TRUST_JAL_FUNCTIONS and self.isAutogenerated and self.type == SymbolSpecialType.function:
             return True
 
         if rsp:
@@ -112,12 +170,12 @@ class ContextSymbol:
 
 
     def isByte(self) -> bool:
-        if not GlobalConfig.USE_DOT_BYTE:
+        if not self.getConfig().USE_DOT_BYTE:
             return False
         return self.type in ("u8", "s8")
 
     def isShort(self) -> bool:
-        if not GlobalConfig.USE_DOT_SHORT:
+        if not self.getConfig().USE_DOT_SHORT:
             return False
         return self.type in ("u16", "s16")
 
@@ -126,7 +184,7 @@ class ContextSymbol:
         if self.type == "char" or self.type == "char*":
             return True
         elif self.hasNoType(): # no type information, let's try to guess
-            if GlobalConfig.STRING_GUESSER and self.isMaybeString:
+            if self.getConfig().STRING_GUESSER and self.isMaybeString:
                 return True
         return False
 
@@ -180,7 +238,7 @@ class ContextSymbol:
             if self.type == SymbolSpecialType.jumptablelabel:
                 return f"L{self.address:08X}{suffix}"
 
-        if GlobalConfig.AUTOGENERATED_NAMES_BASED_ON_SECTION_TYPE:
+        if self.getConfig().AUTOGENERATED_NAMES_BASED_ON_SECTION_TYPE:
             if self.sectionType == FileSectionType.Rodata:
                 return f"RO_{self.address:06X}{suffix}"
             if self.sectionType == FileSectionType.Bss:
@@ -258,15 +316,16 @@ class ContextSymbol:
         return f"{self.getName()} + 0x{address - self.address:X}"
 
     def getSymbolLabel(self) -> str:
-        if not GlobalConfig.ASM_USE_SYMBOL_LABEL:
+        config = self.getConfig()
+        if not config.ASM_USE_SYMBOL_LABEL:
             return ""
         label = ""
         if self.isStatic():
-            label += "# static variable" + GlobalConfig.LINE_ENDS
+            label += "# static variable" + config.LINE_ENDS
         if self.sectionType == FileSectionType.Text:
-            label += GlobalConfig.ASM_TEXT_LABEL
+            label += config.ASM_TEXT_LABEL
         else:
-            label += GlobalConfig.ASM_DATA_LABEL
+            label += config.ASM_DATA_LABEL
         label += " " + self.getName()
         return label
 
@@ -304,6 +363,8 @@ class ContextSymbol:
         return hash((self.address, self.vromAddress))
 
 class ContextOffsetSymbol(ContextSymbol):
+    __slots__ = ()
+
     def __init__(self, offset: int, name: str, sectionType: FileSectionType, *args, **kwargs):
         super().__init__(offset, *args, **kwargs)
         self.name = name
@@ -323,13 +384,16 @@ class ContextOffsetSymbol(ContextSymbol):
 
 
 class ContextRelocSymbol(ContextSymbol):
+    __slots__ = ("relocSection", "relocType")
+
     relocSection: FileSectionType
-    relocType: int = -1 # Same number as the .elf specification
+    relocType: int # Same number as the .elf specification
 
     def __init__(self, offset: int, name: str|None, relocSection: FileSectionType, *args, **kwargs):
         super().__init__(offset, *args, **kwargs)
         self.name = name
         self.relocSection = relocSection
+        self.relocType = -1
 
     # Relative to the start of the section
     @property
@@ -5,9 +5,10 @@
 
 from __future__ import annotations
 
-from typing import Generator
+import array
+from typing import Generator, TextIO
 
-from .GlobalConfig import GlobalConfig
+from .GlobalConfig import DisasmConfig
 from .ContextSymbols import ContextSymbol
 from .SymbolsSegment import SymbolsSegment
 from .Context import Context
@@ -18,7 +19,7 @@ class ElementBase:
     """Represents the base class used for most file sections and symbols.
     """
 
-    def __init__(self, context: Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, name: str, words: list[int], sectionType: FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, name: str, words: list[int]|array.array[int], sectionType: FileSectionType, segmentVromStart: int, overlayCategory: str|None):
         """Constructor
 
         Args:
@@ -28,17 +29,18 @@ class ElementBase:
             inFileOffset (int): The offset of this element relative to the start of its file. It is also used to generate the first column of the disassembled line comment
             vram (int): The VRAM address of this element
             name (str): The name of this element
-            words (list[int]): A list of words (4 bytes) corresponding to this element
+            words (list[int]|array.array[int]): The words (4 bytes) corresponding to this element. Those are stored as an `array.array` of 4 bytes per word
             sectionType (FileSectionType): The section type this element corresponds to
         """
 
         self.context: Context = context
+        self.config: DisasmConfig = context.config
         self.vromStart: int = vromStart
         self.vromEnd: int = vromEnd
         self.inFileOffset: int = inFileOffset
         self.vram: int = vram
         self.name: str = name
-        self.words: list[int] = words
+        self.words: array.array[int] = words if isinstance(words, array.array) else array.array("I", words)
         self.sectionType: FileSectionType = sectionType
 
         self.commentOffset: int = 0
@@ -88,15 +90,15 @@ class ElementBase:
 
 
     def getLabelFromSymbol(self, sym: ContextSymbol|None) -> str:
-        "Generates a glabel for the passed symbol, including an optional index value if it was set and it is enabled in the GlobalConfig"
+        "Generates a glabel for the passed symbol, including an optional index value if it was set and it is enabled in the configuration"
         if sym is not None:
             label = sym.getSymbolLabel()
             if not label:
                 return ""
-            if GlobalConfig.GLABEL_ASM_COUNT:
+            if self.config.GLABEL_ASM_COUNT:
                 if self.index is not None:
                     label += f" # {self.index}"
-            label +=  GlobalConfig.LINE_ENDS
+            label +=  self.config.LINE_ENDS
             return label
         return ""
 
@@ -118,6 +120,13 @@ class ElementBase:
         """
         return ""
 
+    def disassembleToStream(self, f: TextIO) -> None:
+        """Writes the disassembly of this element to the passed stream.
+
+        Produces the same output as `disassemble`, but without building the whole disassembly as a single string.
+        """
+        f.write(self.disassemble())
+
 
     def getSegment(self) -> SymbolsSegment:
         if self.overlayCategory is not None:
@@ -183,13 +192,9 @@ class ElementBase:
                         return overlaySegment
 
             # If the vrom was not part of that segment, then check for every other overlay category
-            for overlayCategory, segmentsPerVrom in self.context.overlaySegments.items():
-                if self.overlayCategory != overlayCategory:
-                    for segmentVrom, overlaySegment in segmentsPerVrom.items():
-                        if vrom < segmentVrom:
-                            continue
-                        if overlaySegment.isVromInRange(vrom):
-                            return overlaySegment
+            for overlaySegment in self.context.getOverlaySegmentsForVrom(vrom):
+                if self.overlayCategory != overlaySegment.overlayCategory:
+                    return overlaySegment
 
         return self.context.unknownSegment
 
@@ -216,14 +221,11 @@ class ElementBase:
                         return contextSym
 
             # If the vram was not part of that segment, then check for every other overlay category
-            for overlayCategory, segmentsPerVrom in self.context.overlaySegments.items():
-                if self.overlayCategory != overlayCategory:
-                    for overlaySegment in segmentsPerVrom.values():
-                        if not overlaySegment.isVramInRange(vramAddress):
-                            continue
-                        contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
-                        if contextSym is not None:
-                            return contextSym
+            for overlaySegment in self.context.getOverlaySegmentsForVram(vramAddress):
+                if self.overlayCategory != overlaySegment.overlayCategory:
+                    contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+                    if contextSym is not None:
+                        return contextSym
 
         if not checkGlobalSegment:
             return None
@@ -233,7 +235,7 @@ class ElementBase:
             if contextSym is not None and contextSym.vromAddress is not None:
                 if not self._ownSegmentReference.isVromInRange(contextSym.getVrom()):
                     return None
-        if not GlobalConfig.ALLOW_UNKSEGMENT:
+        if not self.config.ALLOW_UNKSEGMENT:
             return None
         return contextSym
 
@@ -248,6 +250,36 @@ class ElementBase:
         segment = self.getSegmentForVram(addressStart)
         return segment.getSymbolsRange(addressStart, addressEnd)
 
+    def _getSegmentsForVramRange(self, addressStart: int, addressEnd: int, checkOtherOverlays: bool) -> list[SymbolsSegment]:
+        """Returns every segment which may be searched for an address of the [`addressStart`, `addressEnd`) range.
+
+        The global and unknown segments and the overlay segment of this element are always returned. The overlay segments of other overlays
+        which overlap the range are only returned if `checkOtherOverlays` is True, like `getSymbol` does, while `getSegmentForVram` never
+        uses them.
+        """
+        segments = [self.context.globalSegment, self.context.unknownSegment]
+        if self.overlayCategory is not None:
+            segmentsPerVrom = self.context.overlaySegments.get(self.overlayCategory, None)
+            if segmentsPerVrom is not None:
+                overlaySegment = segmentsPerVrom.get(self.segmentVromStart, None)
+                if overlaySegment is not None:
+                    segments.append(overlaySegment)
+            if checkOtherOverlays:
+                segments += self.context.getOverlaySegmentsForVramRange(addressStart, addressEnd)
+        return segments
+
+    def getSymbolsVramsInRange(self, addressStart: int, addressEnd: int) -> set[int]:
+        """Returns the address of every symbol in the [`addressStart`, `addressEnd`) range which `getSymbol` may find when `tryPlusOffset` is
+        False.
+
+        `getSymbol` returns `None` for every address of the range missing from the result, so the lookups can be limited to these addresses.
+        """
+        vrams: set[int] = set()
+        for segment in self._getSegmentsForVramRange(addressStart, addressEnd, checkOtherOverlays=True):
+            for vram, _ in segment.getSymbolsRange(addressStart, addressEnd):
+                vrams.add(vram)
+        return vrams
+
 
     def getConstant(self, constantValue: int) -> ContextSymbol|None:
         segment = self.getSegment()
@@ -307,6 +339,16 @@ class ElementBase:
         segment = self.getSegmentForVram(low)
         return segment.getAndPopPointerInDataReferencesRange(low, high)
 
+    def getPointersInDataReferencesInRange(self, low: int, high: int) -> list[int]:
+        """Returns, sorted, every pointer in the [`low`, `high`) range which `popPointerInDataReference` may find, without popping them.
+
+        `popPointerInDataReference` returns `None` for every address of the range missing from the result.
+        """
+        pointers: set[int] = set()
+        for segment in self._getSegmentsForVramRange(low, high, checkOtherOverlays=False):
+            pointers.update(segment.getPointerInDataReferencesRange(low, high))
+        return sorted(pointers)
+
 
     def getLoPatch(self, loInstrVram: int|None) -> int|None:
         if loInstrVram is None:
@@ -316,7 +358,7 @@ class ElementBase:
 
     def canUseAddendsOnData(self) -> bool:
         segment = self.getSegmentForVram(self.vram)
-        return GlobalConfig.ALLOW_ALL_ADDENDS_ON_DATA or self.vram in segment.dataSymbolsWithReferencesWithAddends
+        return self.config.ALLOW_ALL_ADDENDS_ON_DATA or self.vram in segment.dataSymbolsWithReferencesWithAddends
 
     def canUseConstantsOnData(self) -> bool:
         segment = self.getSegmentForVram(self.vram)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import contextlib
+import io
+import locale
+import os
+from pathlib import Path
+from typing import Generator
+
+from .OutputManifest import OutputManifest
+
+
+class FileWriter:
+    """Writes the output files as soon as they are produced.
+
+    If a `manifest` is passed then each file is only written if its contents are different from the ones already on disk.
+    """
+
+    def __init__(self, manifest: OutputManifest|None=None):
+        self.manifest: OutputManifest|None = manifest
+
+
+    def _submit(self, path: Path, contents: str|bytes, mode: str) -> None:
+        self._writeFile(path, contents, mode)
+
+    def _writeFile(self, path: Path, contents: str|bytes, mode: str) -> None:
+        if self.manifest is None:
+            with path.open(mode) as f:
+                f.write(contents)
+            return
+
+        if isinstance(contents, str):
+            # Produce the same bytes `open(path, "w")` would write
+            if os.linesep != "\n":
+                contents = contents.replace("\n", os.linesep)
+            contents = contents.encode(locale.getpreferredencoding(False))
+        self.manifest.writeFile(path, contents)
+
+
+    def writeText(self, path: Path, contents: str) -> None:
+        self._submit(path, contents, "w")
+
+    def writeBytes(self, path: Path, contents: bytes|bytearray) -> None:
+        self._submit(path, bytes(contents), "wb")
+
+    @contextlib.contextmanager
+    def openText(self, path: Path) -> Generator[io.StringIO, None, None]:
+        "Works like `open(path, \"w\")`, but the file is written once the `with` block ends"
+        buffer = io.StringIO()
+        yield buffer
+        self.writeText(path, buffer.getvalue())
+
+
+    def wait(self) -> None:
+        "Waits until every pending file has been written"
+        pass
+
+    def close(self) -> None:
+        self.wait()
+
+    def __enter__(self) -> FileWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
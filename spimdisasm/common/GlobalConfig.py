@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import enum
 
 from . import Utils
@@ -40,7 +41,13 @@ class Compiler(enum.Enum):
         return Compiler(value)
 
 
-class GlobalConfig:
+class DisasmConfig:
+    """The settings used to disassemble a binary.
+
+    Each `Context` owns its own instance, so binaries with different settings can be disassembled at the same time in the same process.
+    `GlobalConfig` is the process-wide instance, which is copied by every `Context` created without an explicit configuration.
+    """
+
     DISASSEMBLE_UNKNOWN_INSTRUCTIONS: bool = False
     """Try to disassemble non implemented instructions and functions"""
 
@@ -130,12 +137,22 @@ class GlobalConfig:
     REMOVE_POINTERS: bool = False
     IGNORE_BRANCHES: bool = False
     """Ignores the address of every branch, jump and jal"""
-    IGNORE_WORD_LIST: set[int] = set()
+    IGNORE_WORD_LIST: set[int]
     """Ignores words that starts in 0xXX"""
     WRITE_BINARY: bool = False
     """write to files splitted binaries"""
 
 
+    def __init__(self):
+        self.IGNORE_WORD_LIST = set()
+
+    def copy(self) -> DisasmConfig:
+        "Returns an independent copy of this configuration"
+        config = copy.copy(self)
+        config.IGNORE_WORD_LIST = set(self.IGNORE_WORD_LIST)
+        return config
+
+
     @staticmethod
     def addParametersToArgParse(parser: argparse.ArgumentParser):
         backendConfig = parser.add_argument_group("Disassembler backend configuration")
@@ -198,92 +215,98 @@ class GlobalConfig:
         debugging.add_argument("--debug-unpaired-luis", help="Enables some debug info printing related to the unpaired LUI instructions)", action=Utils.BooleanOptionalAction)
 
 
-    @classmethod
-    def parseArgs(cls, args: argparse.Namespace):
+    def parseArgs(self, args: argparse.Namespace):
         if args.disasm_unknown is not None:
-            GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS = args.disasm_unknown
+            self.DISASSEMBLE_UNKNOWN_INSTRUCTIONS = args.disasm_unknown
 
         if args.string_guesser is not None:
-            GlobalConfig.STRING_GUESSER = args.string_guesser
+            self.STRING_GUESSER = args.string_guesser
 
         if args.name_vars_by_section is not None:
-            GlobalConfig.AUTOGENERATED_NAMES_BASED_ON_SECTION_TYPE = args.name_vars_by_section
+            self.AUTOGENERATED_NAMES_BASED_ON_SECTION_TYPE = args.name_vars_by_section
         if args.name_vars_by_type is not None:
-            GlobalConfig.AUTOGENERATED_NAMES_BASED_ON_DATA_TYPE = args.name_vars_by_type
+            self.AUTOGENERATED_NAMES_BASED_ON_DATA_TYPE = args.name_vars_by_type
 
         if args.compiler is not None:
-            GlobalConfig.COMPILER = Compiler.fromStr(args.compiler)
+            self.COMPILER = Compiler.fromStr(args.compiler)
 
         if args.endian == "little":
-            GlobalConfig.ENDIAN = InputEndian.LITTLE
+            self.ENDIAN = InputEndian.LITTLE
         elif args.endian == "middle":
-            GlobalConfig.ENDIAN = InputEndian.MIDDLE
+            self.ENDIAN = InputEndian.MIDDLE
         else:
-            GlobalConfig.ENDIAN = InputEndian.BIG
+            self.ENDIAN = InputEndian.BIG
 
         if args.gp is not None:
-            GlobalConfig.GP_VALUE = int(args.gp, 16)
+            self.GP_VALUE = int(args.gp, 16)
         if args.pic is not None:
-            GlobalConfig.PIC = args.pic
+            self.PIC = args.pic
 
         if args.filter_low_addresses is not None:
-            GlobalConfig.SYMBOL_FINDER_FILTER_LOW_ADDRESSES = args.filter_low_addresses
+            self.SYMBOL_FINDER_FILTER_LOW_ADDRESSES = args.filter_low_addresses
         if args.filter_high_addresses is not None:
-            GlobalConfig.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES = args.filter_high_addresses
+            self.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES = args.filter_high_addresses
         if args.filtered_addresses_as_constants is not None:
-            GlobalConfig.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_CONSTANTS = args.filtered_addresses_as_constants
+            self.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_CONSTANTS = args.filtered_addresses_as_constants
         if args.filtered_addresses_as_hilo is not None:
-            GlobalConfig.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_HILO = args.filtered_addresses_as_hilo
+            self.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_HILO = args.filtered_addresses_as_hilo
 
         if args.allow_unksegment is not None:
-            GlobalConfig.ALLOW_UNKSEGMENT = args.allow_unksegment
+            self.ALLOW_UNKSEGMENT = args.allow_unksegment
 
         if args.allow_all_addends_on_data is not None:
-            GlobalConfig.ALLOW_ALL_ADDENDS_ON_DATA = args.allow_all_addends_on_data
+            self.ALLOW_ALL_ADDENDS_ON_DATA = args.allow_all_addends_on_data
 
 
         if args.asm_comments is not None:
-            GlobalConfig.ASM_COMMENT = args.asm_comments
+            self.ASM_COMMENT = args.asm_comments
         if args.comment_offset_width is not None:
-            GlobalConfig.ASM_COMMENT_OFFSET_WIDTH = args.comment_offset_width
+            self.ASM_COMMENT_OFFSET_WIDTH = args.comment_offset_width
         if args.glabel_count is not None:
-            GlobalConfig.GLABEL_ASM_COUNT = args.glabel_count
+            self.GLABEL_ASM_COUNT = args.glabel_count
 
         if args.asm_text_label:
-            GlobalConfig.ASM_TEXT_LABEL = args.asm_text_label
+            self.ASM_TEXT_LABEL = args.asm_text_label
         if args.asm_data_label:
-            GlobalConfig.ASM_DATA_LABEL = args.asm_data_label
+            self.ASM_DATA_LABEL = args.asm_data_label
         if args.asm_use_symbol_label is not None:
-            GlobalConfig.ASM_USE_SYMBOL_LABEL = args.asm_use_symbol_label
+            self.ASM_USE_SYMBOL_LABEL = args.asm_use_symbol_label
         if args.asm_ent_label:
-            GlobalConfig.ASM_TEXT_ENT_LABEL = args.asm_ent_label
+            self.ASM_TEXT_ENT_LABEL = args.asm_ent_label
         if args.asm_end_label:
-            GlobalConfig.ASM_TEXT_END_LABEL = args.asm_end_label
+            self.ASM_TEXT_END_LABEL = args.asm_end_label
         if args.asm_func_as_label is not None:
-            GlobalConfig.ASM_TEXT_FUNC_AS_LABEL = args.asm_func_as_label
+            self.ASM_TEXT_FUNC_AS_LABEL = args.asm_func_as_label
         if args.asm_data_as_label is not None:
-            GlobalConfig.ASM_DATA_SYM_AS_LABEL = args.asm_data_as_label
+            self.ASM_DATA_SYM_AS_LABEL = args.asm_data_as_label
         if args.asm_use_prelude is not None:
-            GlobalConfig.ASM_USE_PRELUDE = args.asm_use_prelude
+            self.ASM_USE_PRELUDE = args.asm_use_prelude
 
         if args.print_new_file_boundaries is not None:
-            GlobalConfig.PRINT_NEW_FILE_BOUNDARIES = args.print_new_file_boundaries
+            self.PRINT_NEW_FILE_BOUNDARIES = args.print_new_file_boundaries
 
         if args.use_dot_byte is not None:
-            GlobalConfig.USE_DOT_BYTE = args.use_dot_byte
+            self.USE_DOT_BYTE = args.use_dot_byte
         if args.use_dot_short is not None:
-            GlobalConfig.USE_DOT_SHORT = args.use_dot_short
+            self.USE_DOT_SHORT = args.use_dot_short
 
 
         if args.verbose is not None:
-            GlobalConfig.VERBOSE = args.verbose
+            self.VERBOSE = args.verbose
         if args.quiet is not None:
-            GlobalConfig.QUIET = args.quiet
+            self.QUIET = args.quiet
 
 
         if args.debug_func_analysis is not None:
-            GlobalConfig.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO = args.debug_func_analysis
+            self.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO = args.debug_func_analysis
         if args.debug_symbol_finder is not None:
-            GlobalConfig.PRINT_SYMBOL_FINDER_DEBUG_INFO = args.debug_symbol_finder
+            self.PRINT_SYMBOL_FINDER_DEBUG_INFO = args.debug_symbol_finder
         if args.debug_unpaired_luis is not None:
-            GlobalConfig.PRINT_UNPAIRED_LUIS_DEBUG_INFO = args.debug_unpaired_luis
+            self.PRINT_UNPAIRED_LUIS_DEBUG_INFO = args.debug_unpaired_luis
+
+
+GlobalConfig: DisasmConfig = DisasmConfig()
+"""The process-wide configuration.
+
+Kept for compatibility with code which configures the disassembler globally. New contexts copy it when they are created, so changing it
+does not affect any already existing `Context`"""
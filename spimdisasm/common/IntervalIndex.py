@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import bisect
+from typing import Generic, TypeVar
+
+ValueType = TypeVar("ValueType")
+
+
+class IntervalIndex(Generic[ValueType]):
+    """Immutable index which allows to search every interval which contains a given address in O(log n).
+
+    Every start and end of the intervals is used to split the address space in elementary intervals, each one of them knowing which
+    of the intervals cover it. Searching for an address is a binary search over the elementary intervals.
+    """
+
+    def __init__(self, intervals: list[tuple[int, int, ValueType]]):
+        """Constructor
+
+        Args:
+            intervals (list[tuple[int, int, ValueType]]): A list of (start, end, value) tuples, each one representing the [start, end) interval
+        """
+
+        boundariesSet: set[int] = set()
+        for start, end, _ in intervals:
+            boundariesSet.add(start)
+            boundariesSet.add(end)
+
+        self._boundaries: list[int] = sorted(boundariesSet)
+        "Sorted starts and ends of every interval"
+
+        self._coverage: list[list[ValueType]] = [list() for _ in self._boundaries]
+        "The values of the intervals which contain the range [`_boundaries[i]`, `_boundaries[i+1]`), in the same order they were passed"
+
+        for start, end, value in intervals:
+            index = bisect.bisect_left(self._boundaries, start)
+            while self._boundaries[index] < end:
+                self._coverage[index].append(value)
+                index += 1
+
+
+    def getValues(self, address: int) -> list[ValueType]:
+        "Returns the values of every interval which contains the passed `address`, in the same order they were passed to the constructor"
+        index = bisect.bisect_right(self._boundaries, address) - 1
+        if index < 0:
+            return []
+        return self._coverage[index]
+
+    def getValuesInRange(self, start: int, end: int) -> list[ValueType]:
+        "Returns the values of every interval which overlaps the [`start`, `end`) range, without repeating them"
+        values: list[ValueType] = list()
+        seen: set[int] = set()
+        index = max(bisect.bisect_right(self._boundaries, start) - 1, 0)
+        endIndex = bisect.bisect_left(self._boundaries, end)
+        for coverage in self._coverage[index:endIndex]:
+            for value in coverage:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    values.append(value)
+        return values
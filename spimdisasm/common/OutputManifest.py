@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+import threading
+
+
+class OutputManifest:
+    """Remembers the hash of the contents of every output file, so a file is only written again if its contents changed.
+
+    Not rewriting the unchanged files keeps their modification times, so build systems don't rebuild them.
+    Each file is stored in the manifest with its hash, size and modification time. If the file on disk still has the same size and
+    modification time as the ones in the manifest then the file is assumed to be unchanged without reading it, otherwise its contents are
+    read to be compared.
+    """
+
+    FormatVersion: int = 1
+    "Bumped each time the layout of the manifest changes in an incompatible way"
+
+    def __init__(self, manifestPath: Path):
+        self.manifestPath: Path = manifestPath
+
+        self.entries: dict[str, tuple[str, int, int]] = dict()
+        "key: path of the file, value: hash of the contents, size and modification time in nanoseconds"
+
+        self.written: int = 0
+        "Amount of files which were written because their contents changed"
+        self.unchanged: int = 0
+        "Amount of files which were not written because they already had the same contents"
+
+        self._lock = threading.Lock()
+
+        self.load()
+
+
+    def load(self) -> None:
+        "Reads the manifest from the previous run, if any. An unreadable manifest is ignored"
+        try:
+            with self.manifestPath.open() as f:
+                manifest = json.load(f)
+            if manifest.get("formatVersion") != self.FormatVersion:
+                return
+            for path, (digest, size, mtime) in manifest["files"].items():
+                self.entries[path] = (digest, size, mtime)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self.entries.clear()
+
+    def save(self) -> None:
+        self.manifestPath.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            files = {path: list(entry) for path, entry in sorted(self.entries.items())}
+        with self.manifestPath.open("w") as f:
+            json.dump({"formatVersion": self.FormatVersion, "files": files}, f, indent=4)
+            f.write("\n")
+
+
+    def _isUnchanged(self, path: Path, digest: str, size: int) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        if stat.st_size != size:
+            return False
+
+        with self._lock:
+            entry = self.entries.get(str(path))
+        if entry == (digest, stat.st_size, stat.st_mtime_ns):
+            return True
+
+        # The file is not on the manifest or was modified after it was written, so the contents have to be compared
+        try:
+            return hashlib.md5(path.read_bytes()).hexdigest() == digest
+        except OSError:
+            return False
+
+    def writeFile(self, path: Path, contents: bytes) -> bool:
+        """Writes the file only if its contents are different from the ones already on disk.
+
+        Returns `True` if the file was written.
+        """
+        digest = hashlib.md5(contents).hexdigest()
+        wasWritten = not self._isUnchanged(path, digest, len(contents))
+        if wasWritten:
+            with path.open("wb") as f:
+                f.write(contents)
+
+        stat = path.stat()
+        with self._lock:
+            self.entries[str(path)] = (digest, stat.st_size, stat.st_mtime_ns)
+            if wasWritten:
+                self.written += 1
+            else:
+                self.unchanged += 1
+        return wasWritten
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+from pathlib import Path
+
+from .FileWriter import FileWriter
+from .OutputManifest import OutputManifest
+
+
+class ParallelFileWriter(FileWriter):
+    """Writes files on a pool of threads, allowing the caller to keep producing the contents of the next files while the previous ones are
+    still being written.
+
+    The files are written in no particular order, but each file has exactly the same contents it would have if it was written directly.
+    Writes to the same path are done in the order they were requested, so the last one is the one which is kept.
+    Any exception raised while writing a file is re-raised by `wait`, or by the next write if there are too many pending files.
+    """
+
+    def __init__(self, jobs: int, maxPendingFiles: int|None=None, manifest: OutputManifest|None=None):
+        super().__init__(manifest)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        self._pending: collections.deque[tuple[Path, concurrent.futures.Future]] = collections.deque()
+        self._lastWrites: dict[Path, concurrent.futures.Future] = dict()
+        "The most recent pending write of each path"
+
+        self.maxPendingFiles: int = maxPendingFiles if maxPendingFiles is not None else jobs * 16
+        "Limits how many files can be waiting to be written, so their contents aren't kept in memory indefinitely"
+
+
+    def _submit(self, path: Path, contents: str|bytes, mode: str) -> None:
+        while len(self._pending) >= self.maxPendingFiles:
+            self._waitOldest()
+
+        key = path.absolute()
+        previousWrite = self._lastWrites.get(key)
+        if previousWrite is None:
+            future = self._executor.submit(self._writeFile, path, contents, mode)
+        else:
+            # The previous write was submitted first, so it is already being run by another thread by the time this one starts waiting
+            future = self._executor.submit(self._writeFileAfter, previousWrite, path, contents, mode)
+        self._lastWrites[key] = future
+        self._pending.append((key, future))
+
+    def _writeFileAfter(self, previousWrite: concurrent.futures.Future, path: Path, contents: str|bytes, mode: str) -> None:
+        concurrent.futures.wait([previousWrite])
+        self._writeFile(path, contents, mode)
+
+    def _waitOldest(self) -> None:
+        key, future = self._pending.popleft()
+        if self._lastWrites.get(key) is future:
+            del self._lastWrites[key]
+        future.result()
+
+
+    def wait(self) -> None:
+        "Waits until every pending file has been written"
+        while len(self._pending) > 0:
+            self._waitOldest()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> ParallelFileWriter:
+        return self
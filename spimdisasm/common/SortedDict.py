@@ -7,7 +7,7 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 import bisect
-from typing import Any, Generator, TypeVar
+from typing import Any, Generator, Iterable, TypeVar
 
 # typing.Mapping and typing.MutableMapping are deprecated since Python 3.9.
 # Using collections.abc is encouraged instead, but 3.7 and 3.8 will to run this file
@@ -24,24 +24,149 @@ ValueType = TypeVar("ValueType")
 
 
 class SortedDict(MutableMapping[int, ValueType]):
+    """Dictionary which keeps its keys sorted.
+
+    The keys are stored in a list of sorted chunks, each one holding at most `2 * ChunkLoad` keys, so inserting or removing a key only needs to
+    shift the keys of a single chunk instead of the whole keys list. Looking up a key position is a binary search over the maximum key of each
+    chunk followed by a binary search inside the chunk.
+    """
+
+    ChunkLoad: int = 1000
+    "Amount of keys a chunk is split into when it grows past twice this value"
+
     def __init__(self, other: Mapping[int, ValueType]|None=None):
         self.map: dict[int, ValueType] = dict()
-        self.sortedKeys: list[int] = list()
+
+        self._chunks: list[list[int]] = list()
+        "Each chunk is a sorted list of keys, and every key of a chunk is smaller than every key of the next chunk"
+        self._chunksMaxes: list[int] = list()
+        "The greatest key of each chunk"
 
         if other is not None:
-            for key, value in other.items():
-                self.add(key, value)
+            self.updateMany(other)
+
+
+    @property
+    def sortedKeys(self) -> list[int]:
+        "A sorted copy of every key of this dictionary"
+        keys: list[int] = list()
+        for chunk in self._chunks:
+            keys.extend(chunk)
+        return keys
+
+
+    def _insertKey(self, key: int) -> None:
+        if len(self._chunks) == 0:
+            self._chunks.append([key])
+            self._chunksMaxes.append(key)
+            return
+
+        chunkIndex = bisect.bisect_left(self._chunksMaxes, key)
+        if chunkIndex == len(self._chunks):
+            # Greater than every other key, append it to the last chunk
+            chunkIndex -= 1
+            chunk = self._chunks[chunkIndex]
+            chunk.append(key)
+            self._chunksMaxes[chunkIndex] = key
+        else:
+            chunk = self._chunks[chunkIndex]
+            bisect.insort(chunk, key)
+
+        if len(chunk) > 2 * self.ChunkLoad:
+            # Split the chunk in half
+            newChunk = chunk[self.ChunkLoad:]
+            del chunk[self.ChunkLoad:]
+            self._chunksMaxes[chunkIndex] = chunk[-1]
+            self._chunks.insert(chunkIndex + 1, newChunk)
+            self._chunksMaxes.insert(chunkIndex + 1, newChunk[-1])
+
+    def _removeKey(self, key: int) -> None:
+        chunkIndex = bisect.bisect_left(self._chunksMaxes, key)
+        chunk = self._chunks[chunkIndex]
+        del chunk[bisect.bisect_left(chunk, key)]
+
+        if len(chunk) == 0:
+            del self._chunks[chunkIndex]
+            del self._chunksMaxes[chunkIndex]
+        else:
+            self._chunksMaxes[chunkIndex] = chunk[-1]
+
+    def _bisect(self, key: int, right: bool) -> tuple[int, int]:
+        """Returns the position (chunk index, index inside the chunk) where `key` would be inserted.
+
+        Works like `bisect.bisect_right` if `right` is `True`, like `bisect.bisect_left` otherwise.
+        If `key` is greater than every other key then the returned position is `(len(self._chunks), 0)`
+        """
+        if right:
+            chunkIndex = bisect.bisect_right(self._chunksMaxes, key)
+            if chunkIndex == len(self._chunks):
+                return chunkIndex, 0
+            return chunkIndex, bisect.bisect_right(self._chunks[chunkIndex], key)
+
+        chunkIndex = bisect.bisect_left(self._chunksMaxes, key)
+        if chunkIndex == len(self._chunks):
+            return chunkIndex, 0
+        return chunkIndex, bisect.bisect_left(self._chunks[chunkIndex], key)
+
+    def _getKeysInRange(self, startKey: int, endKey: int, startInclusive: bool, endInclusive: bool) -> list[int]:
+        chunkIndex, index = self._bisect(startKey, right=not startInclusive)
+
+        keys: list[int] = list()
+        while chunkIndex < len(self._chunks):
+            chunk = self._chunks[chunkIndex]
+            if self._chunksMaxes[chunkIndex] < endKey or (endInclusive and self._chunksMaxes[chunkIndex] == endKey):
+                # The whole remaining chunk is inside the range
+                keys.extend(chunk[index:])
+            else:
+                if endInclusive:
+                    indexEnd = bisect.bisect_right(chunk, endKey, index)
+                else:
+                    indexEnd = bisect.bisect_left(chunk, endKey, index)
+                keys.extend(chunk[index:indexEnd])
+                break
+            chunkIndex += 1
+            index = 0
+        return keys
 
 
     def add(self, key: int, value: ValueType) -> None:
         if key not in self.map:
             # Avoid adding the key twice if it is already on the map
-            bisect.insort(self.sortedKeys, key)
+            self._insertKey(key)
         self.map[key] = value
 
     def remove(self, key: int) -> None:
         del self.map[key]
-        self.sortedKeys.remove(key)
+        self._removeKey(key)
+
+    def updateMany(self, other: Mapping[int, ValueType]|Iterable[tuple[int, ValueType]]) -> None:
+        """Adds every (key, value) pair from `other`, overwriting the value of the keys which already exist.
+
+        The new keys are sorted once and merged with the current keys, instead of being inserted one by one, which makes this method
+        preferred over calling `add` in a loop when adding lots of pairs at once.
+        """
+        pairs = other.items() if isinstance(other, Mapping) else other
+
+        newKeys: list[int] = list()
+        for key, value in pairs:
+            if key not in self.map:
+                newKeys.append(key)
+            self.map[key] = value
+
+        if len(newKeys) * 16 < len(self.map):
+            # Only a few new keys, rebuilding every chunk would be more expensive than inserting them individually
+            for key in newKeys:
+                self._insertKey(key)
+            return
+
+        # Both lists are already sorted, so sorting the concatenation only needs to merge them
+        newKeys.sort()
+        keys = self.sortedKeys
+        keys.extend(newKeys)
+        keys.sort()
+
+        self._chunks = [keys[i:i+self.ChunkLoad] for i in range(0, len(keys), self.ChunkLoad)]
+        self._chunksMaxes = [chunk[-1] for chunk in self._chunks]
 
 
     def getKeyRight(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
@@ -49,13 +174,13 @@ class SortedDict(MutableMapping[int, ValueType]):
 
         If `inclusive` is `False`, then the returned pair will be strictly less than the passed `key`.
         """
-        if inclusive:
-            index = bisect.bisect_right(self.sortedKeys, key)
-        else:
-            index = bisect.bisect_left(self.sortedKeys, key)
+        chunkIndex, index = self._bisect(key, right=inclusive)
         if index == 0:
-            return None
-        currentKey = self.sortedKeys[index - 1]
+            if chunkIndex == 0:
+                return None
+            currentKey = self._chunks[chunkIndex - 1][-1]
+        else:
+            currentKey = self._chunks[chunkIndex][index - 1]
         return currentKey, self.map[currentKey]
 
     def getKeyLeft(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
@@ -63,13 +188,10 @@ class SortedDict(MutableMapping[int, ValueType]):
 
         If `inclusive` is `False`, then the returned pair will be strictly greater than the passed `key`.
         """
-        if inclusive:
-            index = bisect.bisect_left(self.sortedKeys, key)
-        else:
-            index = bisect.bisect_right(self.sortedKeys, key)
-        if index == len(self.sortedKeys):
+        chunkIndex, index = self._bisect(key, right=not inclusive)
+        if chunkIndex == len(self._chunks):
             return None
-        key = self.sortedKeys[index]
+        key = self._chunks[chunkIndex][index]
         return key, self.map[key]
 
 
@@ -77,36 +199,15 @@ class SortedDict(MutableMapping[int, ValueType]):
         """Generator which iterates in the range [`startKey`, `endKey`], returining a (key, value) tuple.
 
         By default the `startKey` is inclusive but the `endKey` isn't, this can be changed with the `startInclusive` and `endInclusive` parameters"""
-        if startInclusive:
-            keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
-        else:
-            keyIndexStart = bisect.bisect_right(self.sortedKeys, startKey)
-
-        if endInclusive:
-            keyIndexEnd = bisect.bisect_right(self.sortedKeys, endKey)
-        else:
-            keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
-
-        for index in range(keyIndexStart, keyIndexEnd):
-            key = self.sortedKeys[index]
+        for key in self._getKeysInRange(startKey, endKey, startInclusive, endInclusive):
             yield (key, self.map[key])
 
     def getRangeAndPop(self, startKey: int, endKey: int, startInclusive: bool=True, endInclusive: bool=False) -> Generator[tuple[int, ValueType], None, None]:
         """Similar to `getRange`, but every pair is removed from the dictionary.
 
         Please note this generator iterates in reverse/descending order"""
-        if startInclusive:
-            keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
-        else:
-            keyIndexStart = bisect.bisect_right(self.sortedKeys, startKey)
-
-        if endInclusive:
-            keyIndexEnd = bisect.bisect_right(self.sortedKeys, endKey)
-        else:
-            keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
-
-        for index in range(keyIndexEnd-1, keyIndexStart-1, -1):
-            key = self.sortedKeys[index]
+        keys = self._getKeysInRange(startKey, endKey, startInclusive, endInclusive)
+        for key in reversed(keys):
             value = self.map[key]
             self.remove(key)
             yield (key, value)
@@ -122,8 +223,9 @@ class SortedDict(MutableMapping[int, ValueType]):
 
     def __iter__(self) -> Generator[int, None, None]:
         "Iteration is sorted by keys"
-        for key in self.sortedKeys:
-            yield key
+        for chunk in self._chunks:
+            for key in chunk:
+                yield key
 
     def __len__(self) -> int:
         return len(self.map)
@@ -6,18 +6,18 @@
 from __future__ import annotations
 
 import ast
-from typing import TextIO, Generator
+from typing import TextIO, Generator, Iterable
 from pathlib import Path
 
 from . import Utils
 from .SortedDict import SortedDict
-from .GlobalConfig import GlobalConfig
+from .GlobalConfig import DisasmConfig, GlobalConfig
 from .FileSectionType import FileSectionType
 from .ContextSymbols import SymbolSpecialType, ContextSymbol
 
 
 class SymbolsSegment:
-    def __init__(self, vromStart: int|None, vromEnd: int|None, vramStart: int, vramEnd: int, overlayCategory: str|None=None):
+    def __init__(self, vromStart: int|None, vromEnd: int|None, vramStart: int, vramEnd: int, overlayCategory: str|None=None, config: DisasmConfig|None=None):
         assert vramStart < vramEnd
         if vromStart is not None and vromEnd is not None:
             assert vromStart < vromEnd
@@ -30,6 +30,9 @@ class SymbolsSegment:
 
         self.overlayCategory: str|None = overlayCategory
 
+        self.config: DisasmConfig = config if config is not None else GlobalConfig
+        "The configuration of the context which owns this segment, given to every symbol created by this segment"
+
         self.symbols: SortedDict[ContextSymbol] = SortedDict()
 
         self.constants: dict[int, ContextSymbol] = dict()
@@ -46,6 +49,11 @@ class SymbolsSegment:
         self.dataReferencingConstants: set[int] = set()
         "Set of addresses of data symbols which are allowed to reference named constants"
 
+        self.countLookups: bool = False
+        "Enables counting the calls to `getSymbol` on `lookupsCount`. Set by the context which owns this segment"
+        self.lookupsCount: int = 0
+        "How many times `getSymbol` has been called on this segment, only counted if `countLookups` is enabled"
+
 
     @property
     def vromSize(self) -> int|None:
@@ -87,13 +95,17 @@ class SymbolsSegment:
         return vrom - self.vromStart + self.vramStart
 
 
+    def _newSymbol(self, address: int, sectionType: FileSectionType, isAutogenerated: bool) -> ContextSymbol:
+        contextSym = ContextSymbol(address, config=self.config)
+        contextSym.isAutogenerated = isAutogenerated
+        contextSym.sectionType = sectionType
+        contextSym.overlayCategory = self.overlayCategory
+        return contextSym
+
     def addSymbol(self, address: int, sectionType: FileSectionType=FileSectionType.Unknown, isAutogenerated: bool=False, vromAddress: int|None=None) -> ContextSymbol:
         contextSym = self.symbols.get(address, None)
         if contextSym is None:
-            contextSym = ContextSymbol(address)
-            contextSym.isAutogenerated = isAutogenerated
-            contextSym.sectionType = sectionType
-            contextSym.overlayCategory = self.overlayCategory
+            contextSym = self._newSymbol(address, sectionType, isAutogenerated)
             self.symbols[address] = contextSym
 
         if contextSym.sectionType == FileSectionType.Unknown:
@@ -133,9 +145,26 @@ class SymbolsSegment:
         return contextSym
 
 
+    def addSymbolsBulk(self, addresses: Iterable[int], sectionType: FileSectionType=FileSectionType.Unknown, isAutogenerated: bool=False) -> None:
+        """Makes sure a symbol exists for each one of the passed addresses, creating the missing ones all at once.
+
+        Already existing symbols are left untouched. The usual `add*` methods are expected to be called afterwards for each address to fill
+        the info of each symbol, which will be cheap since every symbol already exists.
+        """
+        newSymbols: dict[int, ContextSymbol] = dict()
+        for address in addresses:
+            if address in self.symbols or address in newSymbols:
+                continue
+            contextSym = self._newSymbol(address, sectionType, isAutogenerated)
+            if self.vromStart is None or self.vromEnd is None:
+                contextSym.unknownSegment = True
+            newSymbols[address] = contextSym
+        self.symbols.updateMany(newSymbols)
+
+
     def addConstant(self, constantValue: int, name: str) -> ContextSymbol:
         if constantValue not in self.constants:
-            contextSym = ContextSymbol(constantValue)
+            contextSym = ContextSymbol(constantValue, config=self.config)
             contextSym.name = name
             contextSym.type = SymbolSpecialType.constant
             self.constants[constantValue] = contextSym
@@ -145,7 +174,9 @@ class SymbolsSegment:
 
     def getSymbol(self, address: int, tryPlusOffset: bool = True, checkUpperLimit: bool = True) -> ContextSymbol|None:
         "Searches symbol or a symbol with an addend if `tryPlusOffset` is True"
-        if GlobalConfig.PRODUCE_SYMBOLS_PLUS_OFFSET and tryPlusOffset:
+        if self.countLookups:
+            self.lookupsCount += 1
+        if self.config.PRODUCE_SYMBOLS_PLUS_OFFSET and tryPlusOffset:
             pair = self.symbols.getKeyRight(address, inclusive=True)
             if pair is None:
                 return None
@@ -170,6 +201,10 @@ class SymbolsSegment:
     def popPointerInDataReference(self, pointer: int) -> int|None:
         return self.newPointersInData.pop(pointer, None)
 
+    def getPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
+        for key, _ in self.newPointersInData.getRange(low, high, startInclusive=True, endInclusive=False):
+            yield key
+
     def getAndPopPointerInDataReferencesRange(self, low: int, high: int) -> Generator[int, None, None]:
         for key, _ in self.newPointersInData.getRangeAndPop(low, high, startInclusive=True, endInclusive=False):
             yield key
@@ -306,6 +341,7 @@ class SymbolsSegment:
 
 
     def fillLibultraSymbols(self):
+        self.addSymbolsBulk(self.N64LibultraSyms.keys())
         for vram, (name, type, size) in self.N64LibultraSyms.items():
             contextSym = self.addSymbol(vram)
             contextSym.name = name
@@ -315,6 +351,7 @@ class SymbolsSegment:
             contextSym.isUserDeclared = True
 
     def fillHardwareRegs(self, useRealNames: bool=False):
+        self.addSymbolsBulk(self.N64HardwareRegs.keys())
         for vram, name in self.N64HardwareRegs.items():
             nameToUse = None
             if useRealNames:
@@ -353,15 +390,11 @@ class SymbolsSegment:
         if not filepath.exists():
             return
 
-        variables_file = Utils.readCsv(filepath)
+        variables_file = [row for row in Utils.readCsv(filepath) if len(row) != 0 and row[0] != "-"]
+        self.addSymbolsBulk(int(row[0], 16) for row in variables_file)
         for row in variables_file:
-            if len(row) == 0:
-                continue
-
             varType: SymbolSpecialType|str|None
             vramStr, varName, varType, varSizeStr = row
-            if vramStr == "-":
-                continue
 
             vram = int(vramStr, 16)
             varSize = int(varSizeStr, 16)
@@ -395,15 +428,10 @@ class SymbolsSegment:
         if not filepath.exists():
             return
 
-        functions_file = Utils.readCsv(filepath)
+        functions_file = [row for row in Utils.readCsv(filepath) if len(row) != 0 and row[0] != "-"]
+        self.addSymbolsBulk(int(row[0], 16) for row in functions_file)
         for row in functions_file:
-            if len(row) == 0:
-                continue
-
             vramStr, funcName = row
-            if vramStr == "-":
-                continue
-
             vram = int(vramStr, 16)
             contextSym = self.addFunction(vram)
             contextSym.name = funcName
@@ -6,9 +6,11 @@
 from __future__ import annotations
 
 import argparse
+import array
 import csv
 import hashlib
 import json
+import mmap
 from pathlib import Path
 import rabbitizer
 import struct
@@ -46,7 +48,7 @@ def isStdoutRedirected() -> bool:
 def getStrHash(byte_array: bytearray) -> str:
     return str(hashlib.md5(byte_array).hexdigest())
 
-def writeBytearrayToFile(filepath: Path, array_of_bytes: bytearray):
+def writeBytearrayToFile(filepath: Path, array_of_bytes: bytes|bytearray|memoryview):
     with filepath.open(mode="wb") as f:
         f.write(array_of_bytes)
 
@@ -56,6 +58,21 @@ def readFileAsBytearray(filepath: Path) -> bytearray:
     with filepath.open(mode="rb") as f:
         return bytearray(f.read())
 
+def readFileAsMemoryView(filepath: Path) -> memoryview:
+    """Maps the file into memory instead of reading it.
+
+    The returned view is read-only, and slicing it doesn't copy the underlying bytes, so only the parts of the file which are actually
+    used get loaded.
+    """
+    if not filepath.exists():
+        return memoryview(bytearray(0))
+    with filepath.open(mode="rb") as f:
+        if filepath.stat().st_size == 0:
+            # Empty files can't be mapped
+            return memoryview(bytearray(0))
+        # The mapping is still valid after closing the file
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
 def readFile(filepath: Path) -> list[str]:
     with filepath.open() as f:
         return [x.strip() for x in f.readlines()]
@@ -67,7 +84,7 @@ def readJson(filepath: Path):
 def removeExtraWhitespace(line: str) -> str:
     return " ".join(line.split())
 
-def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytearray, offset: int=0, offsetEnd: int|None=None) -> list[int]:
+def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytes|bytearray|memoryview, offset: int=0, offsetEnd: int|None=None) -> list[int]:
     totalBytesCount = len(array_of_bytes)
     if totalBytesCount == 0:
         return list()
@@ -79,11 +96,13 @@ def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytearray, offset
 
     if endian == InputEndian.MIDDLE:
         # Convert middle endian to big endian
+        # The conversion is done on a copy, so the input is left untouched and can be read-only
         halfwords = bytesCount//2
         little_byte_format = f"<{halfwords}H"
         big_byte_format = f">{halfwords}H"
         tmp = struct.unpack_from(little_byte_format, array_of_bytes, offset)
-        struct.pack_into(big_byte_format, array_of_bytes, offset, *tmp)
+        array_of_bytes = struct.pack(big_byte_format, *tmp)
+        offset = 0
 
     words = bytesCount//4
     endian_format = f">{words}I"
@@ -91,13 +110,39 @@ def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytearray, offset
         endian_format = f"<{words}I"
     return list(struct.unpack_from(endian_format, array_of_bytes, offset))
 
-def bytesToWords(array_of_bytes: bytearray, offset: int=0, offsetEnd: int|None=None) -> list[int]:
+def bytesToWords(array_of_bytes: bytes|bytearray|memoryview, offset: int=0, offsetEnd: int|None=None) -> list[int]:
     return endianessBytesToWords(GlobalConfig.ENDIAN, array_of_bytes, offset, offsetEnd)
 
+def endianessBytesToWordArray(endian: InputEndian, array_of_bytes: bytes|bytearray|memoryview, offset: int=0, offsetEnd: int|None=None) -> array.array[int]:
+    "Same as `endianessBytesToWords`, but the words are stored on a compact array of 4 bytes per word instead of a list"
+    if endian == InputEndian.MIDDLE:
+        return array.array("I", endianessBytesToWords(endian, array_of_bytes, offset, offsetEnd))
+
+    wordArray: array.array[int] = array.array("I")
+    totalBytesCount = len(array_of_bytes)
+    if totalBytesCount == 0:
+        return wordArray
+
+    bytesCount = totalBytesCount
+    if offsetEnd is not None and offsetEnd > 0:
+        bytesCount = offsetEnd
+    bytesCount -= offset
+
+    words = bytesCount//4
+    if offset + words*4 > totalBytesCount:
+        raise struct.error(f"Tried to read 0x{words*4:X} bytes at offset 0x{offset:X}, but the buffer has 0x{totalBytesCount:X} bytes")
+    wordArray.frombytes(array_of_bytes[offset:offset+words*4])
+    if (endian == InputEndian.LITTLE) != (sys.byteorder == "little"):
+        wordArray.byteswap()
+    return wordArray
+
+def bytesToWordArray(array_of_bytes: bytes|bytearray|memoryview, offset: int=0, offsetEnd: int|None=None) -> array.array[int]:
+    return endianessBytesToWordArray(GlobalConfig.ENDIAN, array_of_bytes, offset, offsetEnd)
+
 #! deprecated
 bytesToBEWords = bytesToWords
 
-def endianessWordsToBytes(endian: InputEndian, words_list: list[int], buffer: bytearray) -> bytearray:
+def endianessWordsToBytes(endian: InputEndian, words_list: list[int]|array.array[int], buffer: bytearray) -> bytearray:
     if endian == InputEndian.MIDDLE:
         raise BufferError("TODO: wordsToBytesEndianess: GlobalConfig.ENDIAN == InputEndian.MIDDLE")
 
@@ -108,7 +153,7 @@ def endianessWordsToBytes(endian: InputEndian, words_list: list[int], buffer: by
     struct.pack_into(endian_format, buffer, 0, *words_list)
     return buffer
 
-def wordsToBytes(words_list: list[int], buffer: bytearray) -> bytearray:
+def wordsToBytes(words_list: list[int]|array.array[int], buffer: bytearray) -> bytearray:
     return endianessWordsToBytes(GlobalConfig.ENDIAN, words_list, buffer)
 
 #! deprecated
@@ -120,17 +165,20 @@ def wordToFloat(word: int) -> float:
 def qwordToDouble(qword: int) -> float:
     return struct.unpack('>d', struct.pack('>Q', qword))[0]
 
-def wordToCurrenEndian(word: int) -> int:
-    if GlobalConfig.ENDIAN == InputEndian.BIG:
+def endianessWordToCurrentEndian(endian: InputEndian, word: int) -> int:
+    if endian == InputEndian.BIG:
         return word
 
-    if GlobalConfig.ENDIAN == InputEndian.LITTLE:
+    if endian == InputEndian.LITTLE:
         return struct.unpack('<I', struct.pack('>I', word))[0]
 
     # MIDDLE
     first, second = struct.unpack('>2H', struct.pack('<2H', word >> 16, word & 0xFFFF))
     return (first << 16) | second
 
+def wordToCurrenEndian(word: int) -> int:
+    return endianessWordToCurrentEndian(GlobalConfig.ENDIAN, word)
+
 def runCommandGetOutput(command: str, args: list[str]) -> list[str] | None:
     try:
         output = subprocess.check_output([command, *args]).decode("utf-8")
@@ -187,32 +235,65 @@ bannedEscapeCharacters = {
 
 escapeCharactersSpecialCases = {0x1B, 0x8C, 0x8D}
 
-def decodeString(buf: bytearray, offset: int, stringEncoding: str) -> tuple[list[str], int]:
-    result = []
+_bannedEscapeBytes = bytes(sorted(bannedEscapeCharacters))
+_escapeSpecialCasesBytes = bytes(sorted(escapeCharactersSpecialCases))
+
+def _decodeRawString(raw: bytes, stringEncoding: str) -> list[str]:
+    # Deleting the bytes is done in C, so it is faster than checking each byte
+    if len(raw.translate(None, _bannedEscapeBytes)) != len(raw):
+        raise RuntimeError()
+
+    if len(raw.translate(None, _escapeSpecialCasesBytes)) == len(raw):
+        # Most strings don't have special characters, so they can be decoded at once
+        if len(raw) == 0:
+            return []
+        return [rabbitizer.Utils.escapeString(raw.decode(stringEncoding))]
 
-    dst = bytearray()
-    i = 0
-    while offset + i < len(buf) and buf[offset + i] != 0:
-        char = buf[offset + i]
-        if char in bannedEscapeCharacters:
-            raise RuntimeError()
-        elif char in escapeCharactersSpecialCases:
-            if dst:
-                decoded = rabbitizer.Utils.escapeString(dst.decode(stringEncoding))
-                result.append(decoded)
-                dst.clear()
+    result = []
+    start = 0
+    for i, char in enumerate(raw):
+        if char in escapeCharactersSpecialCases:
+            if i > start:
+                result.append(rabbitizer.Utils.escapeString(raw[start:i].decode(stringEncoding)))
             result.append(f"\\x{char:02X}")
-        else:
-            dst.append(char)
-        i += 1
+            start = i + 1
+    if start < len(raw):
+        result.append(rabbitizer.Utils.escapeString(raw[start:].decode(stringEncoding)))
+    return result
+
+def decodeString(buf: bytes|bytearray, offset: int, stringEncoding: str, cache: dict[tuple[bytes, str], list[str]|None]|None=None) -> tuple[list[str], int]:
+    """Decodes the string starting at `offset` until the next 0 or the end of the buffer. Returns the escaped parts of the string and its
+    size in bytes, without the terminator.
+
+    Raises either `RuntimeError` or `UnicodeDecodeError` if the bytes are not a valid string.
 
-    if offset + i > len(buf):
+    If a `cache` is passed then strings with the same bytes and encoding are only decoded once, even if they are on different buffers.
+    """
+    if offset > len(buf):
         raise RuntimeError("Reached the end of the buffer without finding an 0")
 
-    if dst:
-        decoded = rabbitizer.Utils.escapeString(dst.decode(stringEncoding))
-        result.append(decoded)
-    return result, i
+    end = buf.find(0, offset)
+    if end < 0:
+        end = len(buf)
+    raw = bytes(buf[offset:end])
+
+    if cache is None:
+        return _decodeRawString(raw, stringEncoding), end - offset
+
+    key = (raw, stringEncoding)
+    if key in cache:
+        result = cache[key]
+        if result is None:
+            raise RuntimeError("String can't be decoded")
+    else:
+        try:
+            result = _decodeRawString(raw, stringEncoding)
+        except (UnicodeDecodeError, RuntimeError):
+            cache[key] = None
+            raise
+        cache[key] = result
+    # Copied since the callers may modify the list
+    return list(result), end - offset
 
 
 # Copied from argparse.py to be able to use it on Python versions < 3.9
@@ -4,11 +4,16 @@
 from . import Utils
 
 from .SortedDict import SortedDict
-from .GlobalConfig import GlobalConfig, InputEndian, Compiler
+from .IntervalIndex import IntervalIndex
+from .GlobalConfig import DisasmConfig, GlobalConfig, InputEndian, Compiler
 from .FileSectionType import FileSectionType, FileSections_ListBasic, FileSections_ListAll
 from .ContextSymbols import SymbolSpecialType, ContextSymbol, ContextOffsetSymbol, ContextRelocSymbol
+from .ContextSnapshot import SnapshotFormatError
 from .SymbolsSegment import SymbolsSegment
 from .Context import Context
 from .FileSplitFormat import FileSplitFormat, FileSplitEntry
 from .ElementBase import ElementBase
 from .GlobalOffsetTable import GlobalOffsetTable
+from .OutputManifest import OutputManifest
+from .FileWriter import FileWriter
+from .ParallelFileWriter import ParallelFileWriter
@@ -29,8 +29,8 @@ class Elf32DynEntry:
         return self.val
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32DynEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "II"
+    def fromBytearray(array_of_bytes: bytes|bytearray|memoryview, offset: int = 0, endian: common.InputEndian=common.InputEndian.BIG) -> Elf32DynEntry:
+        entryFormat = endian.toFormatString() + "II"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32DynEntry(*unpacked)
@@ -41,7 +41,7 @@ class Elf32DynEntry:
 
 
 class Elf32Dyns:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
+    def __init__(self, array_of_bytes: bytes|bytearray|memoryview, offset: int, rawSize: int, endian: common.InputEndian=common.InputEndian.BIG):
         self.dyns: list[Elf32DynEntry] = list()
         self.offset: int = offset
         self.rawSize: int = rawSize
@@ -52,7 +52,7 @@ class Elf32Dyns:
         self.gotSym: int | None = None
 
         for i in range(rawSize // Elf32DynEntry.structSize()):
-            entry = Elf32DynEntry.fromBytearray(array_of_bytes, offset + i*Elf32DynEntry.structSize())
+            entry = Elf32DynEntry.fromBytearray(array_of_bytes, offset + i*Elf32DynEntry.structSize(), endian)
             self.dyns.append(entry)
 
             if entry.tag == Elf32DynamicTable.PLTGOT.value:
@@ -21,15 +21,18 @@ from .Elf32Rels import Elf32Rels
 
 
 class Elf32File:
-    def __init__(self, array_of_bytes: bytearray):
+    def __init__(self, array_of_bytes: bytes|bytearray|memoryview):
         self.header = Elf32Header.fromBytearray(array_of_bytes)
         # print(self.header)
 
+        self.endian: common.InputEndian = common.GlobalConfig.ENDIAN
+        "Endian of the elf file, as specified by its header"
+
         dataEncoding = self.header.ident.getDataEncoding()
         if dataEncoding == Elf32HeaderIdentifier.DataEncoding.DATA2MSB:
-            common.GlobalConfig.ENDIAN = common.InputEndian.BIG
+            self.endian = common.InputEndian.BIG
         elif dataEncoding == Elf32HeaderIdentifier.DataEncoding.DATA2LSB:
-            common.GlobalConfig.ENDIAN = common.InputEndian.LITTLE
+            self.endian = common.InputEndian.LITTLE
 
         elfFlags, unknownElfFlags = Elf32HeaderFlag.parseFlags(self.header.flags)
         self.elfFlags = elfFlags
@@ -52,7 +55,7 @@ class Elf32File:
 
         self.reginfo: Elf32RegInfo | None = None
 
-        self.sectionHeaders = Elf32SectionHeaders(array_of_bytes, self.header.shoff, self.header.shnum)
+        self.sectionHeaders = Elf32SectionHeaders(array_of_bytes, self.header.shoff, self.header.shnum, self.endian)
 
         shstrtabSectionEntry = self.sectionHeaders.sections[self.header.shstrndx]
         self.shstrtab = Elf32StringTable(array_of_bytes, shstrtabSectionEntry.offset, shstrtabSectionEntry.size)
@@ -74,10 +77,10 @@ class Elf32File:
             self.got.initTables(self.dynamic, self.dynsym)
 
 
-    def _processSection_NULL(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_NULL(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         pass
 
-    def _processSection_PROGBITS(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_PROGBITS(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         fileSecType = common.FileSectionType.fromStr(sectionEntryName)
 
         if fileSecType != common.FileSectionType.Invalid:
@@ -87,7 +90,7 @@ class Elf32File:
             elif fileSecType == common.FileSectionType.Data:
                 self.sectionHeaders.mipsData = entry
         elif sectionEntryName == ".got":
-            self.got = Elf32GlobalOffsetTable(array_of_bytes, entry.offset, entry.size)
+            self.got = Elf32GlobalOffsetTable(array_of_bytes, entry.offset, entry.size, self.endian)
         elif sectionEntryName == ".interp":
             # strings with names of dynamic libraries
             common.Utils.printVerbose(f"Unhandled SYMTAB found: '{sectionEntryName}'")
@@ -100,13 +103,13 @@ class Elf32File:
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint(f"Unhandled PROGBITS found: '{sectionEntryName}'", entry, "\n")
 
-    def _processSection_SYMTAB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_SYMTAB(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".symtab":
-            self.symtab = Elf32Syms(array_of_bytes, entry.offset, entry.size)
+            self.symtab = Elf32Syms(array_of_bytes, entry.offset, entry.size, self.endian)
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled SYMTAB found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_STRTAB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_STRTAB(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".strtab":
             self.strtab = Elf32StringTable(array_of_bytes, entry.offset, entry.size)
         elif sectionEntryName == ".dynstr":
@@ -116,83 +119,83 @@ class Elf32File:
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled STRTAB found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_RELA(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_RELA(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_HASH(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_HASH(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_DYNAMIC(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_DYNAMIC(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".dynamic":
-            self.dynamic = Elf32Dyns(array_of_bytes, entry.offset, entry.size)
+            self.dynamic = Elf32Dyns(array_of_bytes, entry.offset, entry.size, self.endian)
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled DYNAMIC found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_NOTE(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_NOTE(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_NOBITS(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_NOBITS(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".bss":
             self.nobits = entry
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled NOBITS found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_REL(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_REL(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName.startswith(".rel."):
             fileSecType = common.FileSectionType.fromStr(sectionEntryName[4:])
             if fileSecType != common.FileSectionType.Invalid:
-                self.rel[fileSecType] = Elf32Rels(array_of_bytes, entry.offset, entry.size)
+                self.rel[fileSecType] = Elf32Rels(array_of_bytes, entry.offset, entry.size, self.endian)
             elif common.GlobalConfig.VERBOSE:
                 common.Utils.eprint("Unhandled REL subsection found: ", sectionEntryName, entry, "\n")
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled REL found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_DYNSYM(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_DYNSYM(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".dynsym":
-            self.dynsym = Elf32Syms(array_of_bytes, entry.offset, entry.size)
+            self.dynsym = Elf32Syms(array_of_bytes, entry.offset, entry.size, self.endian)
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled DYNSYM found: ", sectionEntryName, entry, "\n")
 
 
-    def _processSection_MIPS_LIBLIST(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_LIBLIST(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_MSYM(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_MSYM(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_GPTAB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_GPTAB(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_DEBUG(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_DEBUG(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_REGINFO(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_REGINFO(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         if sectionEntryName == ".reginfo":
-            self.reginfo = Elf32RegInfo.fromBytearray(array_of_bytes, entry.offset)
+            self.reginfo = Elf32RegInfo.fromBytearray(array_of_bytes, entry.offset, self.endian)
         elif common.GlobalConfig.VERBOSE:
             common.Utils.eprint("Unhandled MIPS_REGINFO found: ", sectionEntryName, entry, "\n")
 
-    def _processSection_MIPS_OPTIONS(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_OPTIONS(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_SYMBOL_LIB(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_SYMBOL_LIB(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
-    def _processSection_MIPS_ABIFLAGS(self, array_of_bytes: bytearray, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
+    def _processSection_MIPS_ABIFLAGS(self, array_of_bytes: bytes|bytearray|memoryview, entry: Elf32SectionHeaderEntry, sectionEntryName: str) -> None:
         # ?
         pass
 
 
-    _sectionProcessorCallbacks: dict[int, Callable[[Elf32File, bytearray, Elf32SectionHeaderEntry, str], None]] = {
+    _sectionProcessorCallbacks: dict[int, Callable[[Elf32File, bytes|bytearray|memoryview, Elf32SectionHeaderEntry, str], None]] = {
         Elf32SectionHeaderType.NULL.value: _processSection_NULL,
         Elf32SectionHeaderType.PROGBITS.value: _processSection_PROGBITS,
         Elf32SectionHeaderType.SYMTAB.value: _processSection_SYMTAB,
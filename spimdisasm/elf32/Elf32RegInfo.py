@@ -19,16 +19,16 @@ class Elf32RegInfo:
                                          # 0x18
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32RegInfo:
-        gprFormat = common.GlobalConfig.ENDIAN.toFormatString() + "I"
+    def fromBytearray(array_of_bytes: bytes|bytearray|memoryview, offset: int = 0, endian: common.InputEndian=common.InputEndian.BIG) -> Elf32RegInfo:
+        gprFormat = endian.toFormatString() + "I"
         gpr = struct.unpack_from(gprFormat, array_of_bytes, 0 + offset)[0]
         # print(gpr)
 
-        cprFormat = common.GlobalConfig.ENDIAN.toFormatString() + "4I"
+        cprFormat = endian.toFormatString() + "4I"
         cpr = list(struct.unpack_from(cprFormat, array_of_bytes, 4 + offset))
         # print(cpr)
 
-        gpFormat = common.GlobalConfig.ENDIAN.toFormatString() + "i"
+        gpFormat = endian.toFormatString() + "i"
         gp = struct.unpack_from(gpFormat, array_of_bytes, 0x14 + offset)[0]
         # print(gp)
 
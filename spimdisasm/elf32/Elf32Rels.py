@@ -26,21 +26,21 @@ class Elf32RelEntry:
         return self.info & 0xFF
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32RelEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "II"
+    def fromBytearray(array_of_bytes: bytes|bytearray|memoryview, offset: int = 0, endian: common.InputEndian=common.InputEndian.BIG) -> Elf32RelEntry:
+        entryFormat = endian.toFormatString() + "II"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32RelEntry(*unpacked)
 
 
 class Elf32Rels:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
+    def __init__(self, array_of_bytes: bytes|bytearray|memoryview, offset: int, rawSize: int, endian: common.InputEndian=common.InputEndian.BIG):
         self.relocations: list[Elf32RelEntry] = list()
         self.offset: int = offset
         self.rawSize: int = rawSize
 
         for i in range(rawSize // 0x08):
-            entry = Elf32RelEntry.fromBytearray(array_of_bytes, offset + i*0x08)
+            entry = Elf32RelEntry.fromBytearray(array_of_bytes, offset + i*0x08, endian)
             self.relocations.append(entry)
 
     def __iter__(self):
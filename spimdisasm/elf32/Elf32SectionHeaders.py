@@ -29,15 +29,15 @@ class Elf32SectionHeaderEntry:
                                 # 0x28
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32SectionHeaderEntry:
-        headerFormat = common.GlobalConfig.ENDIAN.toFormatString() + "10I"
+    def fromBytearray(array_of_bytes: bytes|bytearray|memoryview, offset: int = 0, endian: common.InputEndian=common.InputEndian.BIG) -> Elf32SectionHeaderEntry:
+        headerFormat = endian.toFormatString() + "10I"
         unpacked = struct.unpack_from(headerFormat, array_of_bytes, offset)
 
         return Elf32SectionHeaderEntry(*unpacked)
 
 
 class Elf32SectionHeaders:
-    def __init__(self, array_of_bytes: bytearray, shoff: int, shnum: int):
+    def __init__(self, array_of_bytes: bytes|bytearray|memoryview, shoff: int, shnum: int, endian: common.InputEndian=common.InputEndian.BIG):
         self.sections: list[Elf32SectionHeaderEntry] = list()
         self.shoff: int = shoff
         self.shnum: int = shnum
@@ -46,7 +46,7 @@ class Elf32SectionHeaders:
         self.mipsData: Elf32SectionHeaderEntry | None = None
 
         for i in range(shnum):
-            sectionHeaderEntry = Elf32SectionHeaderEntry.fromBytearray(array_of_bytes, shoff + i * 0x28)
+            sectionHeaderEntry = Elf32SectionHeaderEntry.fromBytearray(array_of_bytes, shoff + i * 0x28, endian)
             self.sections.append(sectionHeaderEntry)
             # print(sectionHeaderEntry)
 
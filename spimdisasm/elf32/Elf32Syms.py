@@ -31,8 +31,8 @@ class Elf32SymEntry:
         return self.info & 0xF
 
     @staticmethod
-    def fromBytearray(array_of_bytes: bytearray, offset: int = 0) -> Elf32SymEntry:
-        entryFormat = common.GlobalConfig.ENDIAN.toFormatString() + "IIIBBH"
+    def fromBytearray(array_of_bytes: bytes|bytearray|memoryview, offset: int = 0, endian: common.InputEndian=common.InputEndian.BIG) -> Elf32SymEntry:
+        entryFormat = endian.toFormatString() + "IIIBBH"
         unpacked = struct.unpack_from(entryFormat, array_of_bytes, offset)
 
         return Elf32SymEntry(*unpacked)
@@ -43,13 +43,13 @@ class Elf32SymEntry:
 
 
 class Elf32Syms:
-    def __init__(self, array_of_bytes: bytearray, offset: int, rawSize: int):
+    def __init__(self, array_of_bytes: bytes|bytearray|memoryview, offset: int, rawSize: int, endian: common.InputEndian=common.InputEndian.BIG):
         self.symbols: list[Elf32SymEntry] = list()
         self.offset: int = offset
         self.rawSize: int = rawSize
 
         for i in range(rawSize // Elf32SymEntry.structSize()):
-            entry = Elf32SymEntry.fromBytearray(array_of_bytes, offset + i*Elf32SymEntry.structSize())
+            entry = Elf32SymEntry.fromBytearray(array_of_bytes, offset + i*Elf32SymEntry.structSize(), endian)
             self.symbols.append(entry)
 
     def __getitem__(self, key: int) -> Elf32SymEntry:
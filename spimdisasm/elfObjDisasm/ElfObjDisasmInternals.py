@@ -24,6 +24,10 @@ def getArgsParser() -> argparse.ArgumentParser:
     parser.add_argument("--data-output", help="Path to output the data and rodata disassembly")
 
     parser.add_argument("--save-context", help="Saves the context to a file", metavar="FILENAME")
+    parser.add_argument("--save-context-snapshot", help="Saves the whole context to a binary snapshot, which can be loaded with --load-context-snapshot", metavar="FILENAME")
+    parser.add_argument("--load-context-snapshot", help="Starts from the context saved on a binary snapshot instead of an empty one", metavar="FILENAME")
+
+    parser.add_argument("--stats-json", help="Write a json report with the time spent on each stage and section, and the amount of instructions, functions, symbols and context lookups", metavar="PATH")
 
     common.GlobalConfig.addParametersToArgParse(parser)
 
@@ -54,7 +58,7 @@ def getOutputPath(inputPath: Path, textOutput: Path, dataOutput: Path, sectionTy
 
     return outputFilePath
 
-def getProcessedSections(context: common.Context, elfFile: elf32.Elf32File, array_of_bytes: bytearray, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, mips.sections.SectionBase], dict[common.FileSectionType, Path]]:
+def getProcessedSections(context: common.Context, elfFile: elf32.Elf32File, array_of_bytes: bytes|bytearray|memoryview, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, mips.sections.SectionBase], dict[common.FileSectionType, Path]]:
     processedSegments: dict[common.FileSectionType, mips.sections.SectionBase] = dict()
     segmentPaths: dict[common.FileSectionType, Path] = dict()
 
@@ -144,7 +148,17 @@ def addRelocatedSymbol(context: common.Context, symEntry: elf32.Elf32SymEntry, s
     contextSym.isUserDeclared = True
     contextSym.setSizeIfUnset(symEntry.size)
 
+def addRelocatedSymbols(context: common.Context, symbols: list[tuple[elf32.Elf32SymEntry, str|None]]):
+    # Create every symbol at once, `addRelocatedSymbol` will fill their info
+    ignoredTypes = {elf32.Elf32SymbolTableType.SECTION.value, elf32.Elf32SymbolTableType.NOTYPE.value}
+    context.globalSegment.addSymbolsBulk(symEntry.value for symEntry, _ in symbols if symEntry.value != 0 and symEntry.stType not in ignoredTypes)
+
+    for symEntry, symName in symbols:
+        addRelocatedSymbol(context, symEntry, symName)
+
 def insertSymtabIntoContext(context: common.Context, symbolTable: elf32.Elf32Syms, stringTable: elf32.Elf32StringTable, elfFile: elf32.Elf32File, processedSegments: dict[common.FileSectionType, mips.sections.SectionBase]):
+    relocatedSymbols: list[tuple[elf32.Elf32SymEntry, str|None]] = list()
+
     # Use the symbol table to replace symbol names present in disassembled sections
     for i, symEntry in enumerate(symbolTable):
         symName = stringTable[symEntry.name]
@@ -157,7 +171,7 @@ def insertSymtabIntoContext(context: common.Context, symbolTable: elf32.Elf32Sym
             continue
 
         if elfFile.header.type != elf32.Elf32ObjectFileType.REL.value:
-            addRelocatedSymbol(context, symEntry, symName)
+            relocatedSymbols.append((symEntry, symName))
             continue
 
         sectName = elfFile.shstrtab[sectHeaderEntry.name]
@@ -166,17 +180,16 @@ def insertSymtabIntoContext(context: common.Context, symbolTable: elf32.Elf32Sym
             subSegment = processedSegments[sectType]
             symbolOffset = symEntry.value + subSegment.vromStart
 
-            contextOffsetSym = common.ContextOffsetSymbol(symbolOffset, symName, sectType)
+            contextOffsetSym = common.ContextOffsetSymbol(symbolOffset, symName, sectType, config=context.config)
             contextOffsetSym.isUserDeclared = True
             context.offsetSymbols[sectType][symbolOffset] = contextOffsetSym
         else:
             common.Utils.eprint(f"Warning: symbol {i} (name: '{symName}', value: 0x{symEntry.value:X}) is referencing invalid section '{sectName}'")
 
-def insertDynsymIntoContext(context: common.Context, symbolTable: elf32.Elf32Syms, stringTable: elf32.Elf32StringTable):
-    for symEntry in symbolTable:
-        symName = stringTable[symEntry.name]
+    addRelocatedSymbols(context, relocatedSymbols)
 
-        addRelocatedSymbol(context, symEntry, symName)
+def insertDynsymIntoContext(context: common.Context, symbolTable: elf32.Elf32Syms, stringTable: elf32.Elf32StringTable):
+    addRelocatedSymbols(context, [(symEntry, stringTable[symEntry.name]) for symEntry in symbolTable])
 
 
 def injectAllElfSymbols(context: common.Context, elfFile: elf32.Elf32File, processedSegments: dict[common.FileSectionType, mips.sections.SectionBase]) -> None:
@@ -191,7 +204,7 @@ def injectAllElfSymbols(context: common.Context, elfFile: elf32.Elf32File, proce
                     if symbolName == "":
                         continue
 
-                    contextRelocSym = common.ContextRelocSymbol(rel.offset, symbolName, sectType)
+                    contextRelocSym = common.ContextRelocSymbol(rel.offset, symbolName, sectType, config=context.config)
                     contextRelocSym.isDefined = True
                     contextRelocSym.relocType = rel.rType
                     context.relocSymbols[sectType][rel.offset] = contextRelocSym
@@ -206,7 +219,7 @@ def injectAllElfSymbols(context: common.Context, elfFile: elf32.Elf32File, proce
 
 def processGlobalOffsetTable(context: common.Context, elfFile: elf32.Elf32File) -> None:
     if elfFile.reginfo is not None:
-        common.GlobalConfig.GP_VALUE = elfFile.reginfo.gpValue
+        context.config.GP_VALUE = elfFile.reginfo.gpValue
 
     if elfFile.got is not None:
         context.got.localsTable = elfFile.got.localsTable
@@ -228,14 +241,24 @@ def elfObjDisasmMain():
 
     applyGlobalConfigurations()
 
+    stats = mips.PipelineStats("elfObjDisasm")
+
     context = common.Context()
+    if args.stats_json is not None:
+        stats.countContextLookups(context)
+    if args.load_context_snapshot is not None:
+        with stats.stage("loadContextSnapshot"):
+            context.loadSnapshot(Path(args.load_context_snapshot))
 
     inputPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
-    elfFile = elf32.Elf32File(array_of_bytes)
+    with stats.stage("readInput"):
+        array_of_bytes = common.Utils.readFileAsMemoryView(inputPath)
+    with stats.stage("parseElf"):
+        elfFile = elf32.Elf32File(array_of_bytes)
 
+    context.config.ENDIAN = elfFile.endian
     if elf32.Elf32HeaderFlag.PIC in elfFile.elfFlags or elf32.Elf32HeaderFlag.CPIC in elfFile.elfFlags:
-        common.GlobalConfig.PIC = True
+        context.config.PIC = True
 
     textOutput = Path(args.output)
     if args.data_output is None:
@@ -243,20 +266,37 @@ def elfObjDisasmMain():
     else:
         dataOutput = Path(args.data_output)
 
-    processedSegments, segmentPaths = getProcessedSections(context, elfFile, array_of_bytes, inputPath, textOutput, dataOutput)
+    with stats.stage("createSections"):
+        processedSegments, segmentPaths = getProcessedSections(context, elfFile, array_of_bytes, inputPath, textOutput, dataOutput)
 
-    changeGlobalSegmentRanges(context, processedSegments)
-    injectAllElfSymbols(context, elfFile, processedSegments)
-    processGlobalOffsetTable(context, elfFile)
+        changeGlobalSegmentRanges(context, processedSegments)
 
-    for subSegment in processedSegments.values():
-        subSegment.analyze()
+    with stats.stage("injectSymbols"):
+        injectAllElfSymbols(context, elfFile, processedSegments)
+        processGlobalOffsetTable(context, elfFile)
 
-    for sectionType, subSegment in processedSegments.items():
-        outputFilePath = segmentPaths[sectionType]
-        mips.FilesHandlers.writeSection(outputFilePath, subSegment)
+    with stats.stage("analyze"):
+        for subSegment in processedSegments.values():
+            with stats.sectionStage(subSegment, "analyze"):
+                subSegment.analyze()
+
+    with stats.stage("writeProcessedFiles"):
+        for sectionType, subSegment in processedSegments.items():
+            outputFilePath = segmentPaths[sectionType]
+            with stats.sectionStage(subSegment, "write"):
+                mips.FilesHandlers.writeSection(outputFilePath, subSegment)
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with stats.stage("saveContext"):
+            context.saveContextToFile(contextPath)
+
+    if args.save_context_snapshot is not None:
+        with stats.stage("saveContextSnapshot"):
+            context.saveSnapshot(Path(args.save_context_snapshot))
+
+    if args.stats_json is not None:
+        stats.countSections(processedSegments.values())
+        stats.countContext(context)
+        stats.writeJson(Path(args.stats_json))
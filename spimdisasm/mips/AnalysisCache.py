@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import rabbitizer
+
+from .. import __version__
+from .. import common
+
+from . import sections
+from . import symbols
+
+
+class AnalysisCache:
+    """On-disk cache of the instruction analysis of the functions of text sections.
+
+    Each text section is stored on its own file, named after a hash of the words and vram of the section, the global configuration and the
+    instruction configuration. A section which did not change between runs reuses the analysis of every function which is found at the same
+    place as before, the functions themselves are still found by `SectionText.analyze` since that depends on the symbols of the context.
+    """
+
+    FormatVersion: int = 2
+    "Bumped each time the cached data changes in an incompatible way"
+
+    AnalysisSettings: list[str] = [
+        "DISASSEMBLE_UNKNOWN_INSTRUCTIONS",
+        "COMPILER",
+        "GP_VALUE",
+        "SYMBOL_FINDER_FILTER_LOW_ADDRESSES",
+        "SYMBOL_FINDER_FILTER_HIGH_ADDRESSES",
+        "SYMBOL_FINDER_FILTERED_ADDRESSES_AS_CONSTANTS",
+    ]
+    "Names of the `DisasmConfig` settings used while analyzing the instructions of a function"
+
+    def __init__(self, cacheDir: Path):
+        self.cacheDir: Path = cacheDir
+
+        self.hits: int = 0
+        "Amount of sections which were restored from the cache"
+        self.misses: int = 0
+        "Amount of sections which were not found on the cache"
+
+        self._cachedKeys: dict[Path, set[tuple[int, int, bool]]] = dict()
+        "The keys of `precomputedInstrAnalysis` restored from each cache file"
+
+
+    @staticmethod
+    def _getConfigFingerprint(context: common.Context) -> str:
+        "Returns a representation of every setting which may change the result of analyzing the instructions"
+        settings: list[str] = list()
+        for name in AnalysisCache.AnalysisSettings:
+            settings.append(f"{name}={getattr(context.config, name)!r}")
+        for name in sorted(dir(rabbitizer.config)):
+            if name.startswith("_"):
+                continue
+            settings.append(f"rabbitizer.{name}={getattr(rabbitizer.config, name)!r}")
+        settings.append(f"got={context.got.tableStart!r},{context.got.localsTable!r},{context.got.globalsTable!r}")
+        return ";".join(settings)
+
+    def getSectionPath(self, section: sections.SectionText) -> Path:
+        hasher = hashlib.md5()
+        hasher.update(f"{self.FormatVersion};{__version__};{rabbitizer.__version__};".encode())
+        hasher.update(f"{section.getVramOffset(0)};{section.instrCat.name};".encode())
+        hasher.update(self._getConfigFingerprint(section.context).encode())
+        hasher.update(section.getHash().encode())
+        return self.cacheDir / f"{hasher.hexdigest()}.pickle"
+
+
+    def load(self, section: sections.SectionText) -> bool:
+        """Fills the `precomputedInstrAnalysis` of the section with the cached analysis, if any.
+
+        Returns `True` if the section was found on the cache.
+        """
+        sectionPath = self.getSectionPath(section)
+        try:
+            with sectionPath.open("rb") as f:
+                cachedResults: dict[tuple[int, int, bool], symbols.analysis.InstrAnalysisResult] = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        except Exception:
+            # Corrupted or incompatible file, it will be overwritten once the section is analyzed
+            common.Utils.eprint(f"Warning: Ignoring unreadable analysis cache file for '{section.name}'")
+            self.misses += 1
+            return False
+
+        # The cache uses offsets relative to the start of the section, so it can be reused if the section is moved in the rom
+        cachedKeys: set[tuple[int, int, bool]] = set()
+        for (start, end, hasUnimplementedIntrs), result in cachedResults.items():
+            key = (section.vromStart + start, section.vromStart + end, hasUnimplementedIntrs)
+            section.precomputedInstrAnalysis[key] = result
+            cachedKeys.add(key)
+        self._cachedKeys[sectionPath] = cachedKeys
+        self.hits += 1
+        return True
+
+    def store(self, section: sections.SectionText) -> None:
+        "Saves the analysis of every function of the already analyzed section, unless the cache already has all of them"
+        sectionPath = self.getSectionPath(section)
+        results = section.getInstrAnalysisResults()
+        if results.keys() <= self._cachedKeys.get(sectionPath, set()):
+            return
+
+        allResults = dict(section.precomputedInstrAnalysis)
+        allResults.update(results)
+        cachedResults = {(start - section.vromStart, end - section.vromStart, hasUnimplementedIntrs): result for (start, end, hasUnimplementedIntrs), result in allResults.items()}
+
+        self.cacheDir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so other runs never see a partially written file
+        tempPath = sectionPath.with_suffix(f".{os.getpid()}.tmp")
+        with tempPath.open("wb") as f:
+            pickle.dump(cachedResults, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tempPath, sectionPath)
@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-from typing import TextIO
+from typing import Iterable, TextIO
 from pathlib import Path
 
 import rabbitizer
@@ -16,7 +16,7 @@ from . import sections
 from . import symbols
 
 
-def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_bytes: bytearray, outputPath: Path, context: common.Context) -> sections.SectionBase:
+def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_bytes: bytes|bytearray|memoryview, outputPath: Path, context: common.Context) -> sections.SectionBase:
     offsetStart = splitEntry.offset
     offsetEnd = splitEntry.nextOffset
 
@@ -52,35 +52,31 @@ def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_byte
 
     return f
 
-def writeSection(path: Path, fileSection: sections.SectionBase):
+def writeSection(path: Path, fileSection: sections.SectionBase, writer: common.FileWriter|None=None):
     path.parent.mkdir(parents=True, exist_ok=True)
-    fileSection.saveToFile(str(path))
+    fileSection.saveToFile(str(path), writer)
     return path
 
 
-def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, rodataSection: sections.SectionRodata) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+def _filterRdataAndLateRodataForFunction(func: symbols.SymbolFunction, referencedRodata: Iterable[symbols.SymbolBase]) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
     rdataList: list[symbols.SymbolBase] = []
     lateRodataList: list[symbols.SymbolBase] = []
     lateRodataSize = 0
 
-    intersection = func.instrAnalyzer.referencedVrams & rodataSection.symbolsVRams
-    for rodataSym in rodataSection.symbolList:
-        if rodataSym.vram not in intersection:
-            continue
-
+    for rodataSym in referencedRodata:
         # We only care for rodata that's used once
         if rodataSym.contextSym.referenceCounter != 1:
-            if common.GlobalConfig.COMPILER == common.Compiler.IDO:
+            if func.config.COMPILER == common.Compiler.IDO:
                 continue
-            elif len(rodataSym.contextSym.referenceFunctions) != 1:
+            elif rodataSym.contextSym.getReferenceFunctionsCount() != 1:
                 continue
 
         # A const variable should not be placed with a function
         if rodataSym.contextSym.isMaybeConstVariable():
-            if common.GlobalConfig.COMPILER != common.Compiler.SN64:
+            if func.config.COMPILER != common.Compiler.SN64:
                 continue
 
-        if rodataSym.contextSym.isLateRodata() and common.GlobalConfig.COMPILER == common.Compiler.IDO:
+        if rodataSym.contextSym.isLateRodata() and func.config.COMPILER == common.Compiler.IDO:
             lateRodataList.append(rodataSym)
             lateRodataSize += rodataSym.sizew
         else:
@@ -88,11 +84,62 @@ def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, ro
 
     return rdataList, lateRodataList, lateRodataSize
 
-def getRdataAndLateRodataForFunction(func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata]) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+def getRdataAndLateRodataForFunctionFromSection(func: symbols.SymbolFunction, rodataSection: sections.SectionRodata) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+    intersection = func.instrAnalyzer.referencedVrams & rodataSection.symbolsVRams
+    return _filterRdataAndLateRodataForFunction(func, (rodataSym for rodataSym in rodataSection.symbolList if rodataSym.vram in intersection))
+
+
+class RodataSymbolsIndex:
+    """Maps the vram of every rodata symbol of the passed sections to the symbols with that vram.
+
+    Allows to find the rodata referenced by a function without going through every rodata symbol of every section for each function.
+    The index has to be built after the sections have been analyzed.
+    """
+
+    def __init__(self, rodataFileList: list[sections.SectionRodata]):
+        self._symbolsByVram: dict[int, list[tuple[int, int, symbols.SymbolBase]]] = dict()
+        "key: vram, value: the index of the section, the index of the symbol in its section, and the symbol"
+
+        for sectionIndex, rodataSection in enumerate(rodataFileList):
+            for symbolIndex, rodataSym in enumerate(rodataSection.symbolList):
+                if rodataSym.vram in rodataSection.symbolsVRams:
+                    self._symbolsByVram.setdefault(rodataSym.vram, []).append((sectionIndex, symbolIndex, rodataSym))
+
+    def getReferencedSymbols(self, func: symbols.SymbolFunction) -> list[list[symbols.SymbolBase]]:
+        "Returns the rodata symbols referenced by the function grouped per section, in the same order of the sections and their symbols"
+        referenced: list[tuple[int, int, symbols.SymbolBase]] = []
+        for vram in func.instrAnalyzer.referencedVrams:
+            symbolsInVram = self._symbolsByVram.get(vram)
+            if symbolsInVram is not None:
+                referenced += symbolsInVram
+        referenced.sort(key=lambda entry: (entry[0], entry[1]))
+
+        groups: list[list[symbols.SymbolBase]] = []
+        lastSectionIndex = -1
+        for sectionIndex, _, rodataSym in referenced:
+            if sectionIndex != lastSectionIndex:
+                groups.append([])
+                lastSectionIndex = sectionIndex
+            groups[-1].append(rodataSym)
+        return groups
+
+
+def getRdataAndLateRodataForFunction(func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], rodataIndex: RodataSymbolsIndex|None=None) -> tuple[list[symbols.SymbolBase], list[symbols.SymbolBase], int]:
+    """Returns the rodata which should be placed with the function, from the first section which has any.
+
+    If a `rodataIndex` built from `rodataFileList` is passed then only the symbols referenced by the function are checked.
+    """
     rdataList: list[symbols.SymbolBase] = []
     lateRodataList: list[symbols.SymbolBase] = []
     lateRodataSize = 0
 
+    if rodataIndex is not None:
+        for referencedRodata in rodataIndex.getReferencedSymbols(func):
+            rdataList, lateRodataList, lateRodataSize = _filterRdataAndLateRodataForFunction(func, referencedRodata)
+            if len(rdataList) > 0 or len(lateRodataList) > 0:
+                break
+        return rdataList, lateRodataList, lateRodataSize
+
     for rodataSection in rodataFileList:
         if len(rdataList) > 0 or len(lateRodataList) > 0:
             # We already have the rodata for this function. Stop searching
@@ -111,39 +158,39 @@ def writeFunctionRodataToFile(f: TextIO, func: symbols.SymbolFunction, rdataList
     if len(rdataList) > 0:
         # Write the rdata
         sectionName = ".rodata"
-        f.write(f".section {sectionName}" + common.GlobalConfig.LINE_ENDS)
+        f.write(f".section {sectionName}" + func.config.LINE_ENDS)
         for sym in rdataList:
-            f.write(sym.disassemble())
-            f.write(common.GlobalConfig.LINE_ENDS)
+            sym.disassembleToStream(f)
+            f.write(func.config.LINE_ENDS)
 
     if len(lateRodataList) > 0:
         # Write the late_rodata
-        f.write(".section .late_rodata" + common.GlobalConfig.LINE_ENDS)
+        f.write(".section .late_rodata" + func.config.LINE_ENDS)
         if lateRodataSize / len(func.instructions) > 1/3:
             align = 4
             firstLateRodataVram = lateRodataList[0].vram
             if firstLateRodataVram is not None and firstLateRodataVram % 8 == 0:
                 align = 8
-            f.write(f".late_rodata_alignment {align}" + common.GlobalConfig.LINE_ENDS)
+            f.write(f".late_rodata_alignment {align}" + func.config.LINE_ENDS)
         for sym in lateRodataList:
-            f.write(sym.disassemble())
-            f.write(common.GlobalConfig.LINE_ENDS)
+            sym.disassembleToStream(f)
+            f.write(func.config.LINE_ENDS)
 
     if len(rdataList) > 0 or len(lateRodataList) > 0:
-        f.write(common.GlobalConfig.LINE_ENDS + ".section .text" + common.GlobalConfig.LINE_ENDS)
+        f.write(func.config.LINE_ENDS + ".section .text" + func.config.LINE_ENDS)
 
-def writeSplitedFunction(path: Path, func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata]):
+def writeSplitedFunction(path: Path, func: symbols.SymbolFunction, rodataFileList: list[sections.SectionRodata], writer: common.FileWriter|None=None, rodataIndex: RodataSymbolsIndex|None=None):
     path.mkdir(parents=True, exist_ok=True)
 
     funcPath = path / (func.getName()+ ".s")
-    with funcPath.open("w") as f:
-        rdataList, lateRodataList, lateRodataSize = getRdataAndLateRodataForFunction(func, rodataFileList)
+    with (funcPath.open("w") if writer is None else writer.openText(funcPath)) as f:
+        rdataList, lateRodataList, lateRodataSize = getRdataAndLateRodataForFunction(func, rodataFileList, rodataIndex)
         writeFunctionRodataToFile(f, func, rdataList, lateRodataList, lateRodataSize)
 
         # Write the function itself
-        f.write(func.disassemble())
+        func.disassembleToStream(f)
 
-def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionRodata]):
+def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionRodata], writer: common.FileWriter|None=None):
     for rodataSection in rodataFileList:
         rodataPath = path / rodataSection.name
         rodataPath.mkdir(parents=True, exist_ok=True)
@@ -153,6 +200,6 @@ def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionRodata]):
                 continue
 
             rodataSymbolPath = rodataPath / (rodataSym.getName() + ".s")
-            with rodataSymbolPath.open("w") as f:
-                f.write(".section .rdata" + common.GlobalConfig.LINE_ENDS)
-                f.write(rodataSym.disassemble())
+            with (rodataSymbolPath.open("w") if writer is None else writer.openText(rodataSymbolPath)) as f:
+                f.write(".section .rdata" + rodataSym.config.LINE_ENDS)
+                rodataSym.disassembleToStream(f)
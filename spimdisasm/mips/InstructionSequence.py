@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import array
+from collections import OrderedDict
+from typing import Iterator, Sequence, overload
+
+import rabbitizer
+
+
+class InstructionSequence(Sequence[rabbitizer.Instruction]):
+    """A sequence of instructions which are decoded from their words when they are accessed, instead of all at once.
+
+    Sequences of up to `WindowSize` instructions, like most functions, are decoded all at once the first time they are accessed. Longer ones
+    are decoded in chunks of `ChunkSize` instructions, keeping only the most recently used chunks which fit on the window, so the memory used
+    by the instructions doesn't grow with the size of the sequence.
+
+    Since an instruction may be decoded again after its chunk was evicted or the cache was released, changes to the decoded instructions are
+    not kept, with the exception of the ones made through the methods of this class.
+    """
+
+    ChunkSize: int = 64
+    WindowSize: int = 1024
+    "Maximum amount of instructions kept decoded by a sequence"
+
+    def __init__(self, words: array.array[int]|Sequence[int], vram: int|None, instrCat: rabbitizer.Enum, start: int=0, end: int|None=None):
+        self._words = words
+        "Shared with the sequence this was sliced from"
+        self._start = start
+        self._end = end if end is not None else len(words)
+
+        self.vram: int|None = vram
+        "Vram of the first instruction of the sequence. If `None` then the vram of the instructions is not set"
+        self.instrCat: rabbitizer.Enum = instrCat
+
+        self._inHandwrittenFunction: bool = False
+
+        self._decoded: list[rabbitizer.Instruction]|None = None
+        "Every instruction of the sequence, only used if the sequence fits on the window"
+        self._chunks: OrderedDict[int, list[rabbitizer.Instruction]] = OrderedDict()
+        self._lastChunkIndex: int = -1
+        self._lastChunk: list[rabbitizer.Instruction] = list()
+
+        self._pinned: dict[int, rabbitizer.Instruction] = dict()
+        "Instructions which were modified, so they are never decoded again"
+
+        self.version: int = 0
+        "Incremented every time an instruction is blanked out or removed, so anything computed from the instructions can know when it is stale"
+
+    @staticmethod
+    def fromInstructions(instrsList: list[rabbitizer.Instruction]) -> InstructionSequence:
+        "Wraps already decoded instructions. Every instruction is kept, so nothing is decoded lazily"
+        vram = instrsList[0].vram if len(instrsList) > 0 else None
+        # The category is never used, since no instruction is decoded
+        sequence = InstructionSequence([instr.getRaw() for instr in instrsList], vram, rabbitizer.InstrCategory.CPU)
+        sequence._pinned = dict(enumerate(instrsList))
+        return sequence
+
+
+    def _decodeRange(self, start: int, end: int) -> list[rabbitizer.Instruction]:
+        instrsList: list[rabbitizer.Instruction] = list()
+        for index in range(start, end):
+            instr = self._pinned.get(index)
+            if instr is None:
+                instr = rabbitizer.Instruction(self._words[self._start + index], category=self.instrCat)
+                if self.vram is not None:
+                    instr.vram = self.vram + index * 4
+                if self._inHandwrittenFunction:
+                    instr.inHandwrittenFunction = True
+            instrsList.append(instr)
+        return instrsList
+
+    def _getDecoded(self) -> list[rabbitizer.Instruction]|None:
+        if self._decoded is None and len(self) <= self.WindowSize:
+            self._decoded = self._decodeRange(0, len(self))
+        return self._decoded
+
+    def _getChunk(self, chunkIndex: int) -> list[rabbitizer.Instruction]:
+        if chunkIndex == self._lastChunkIndex:
+            return self._lastChunk
+
+        chunk = self._chunks.get(chunkIndex)
+        if chunk is not None:
+            self._chunks.move_to_end(chunkIndex)
+        else:
+            chunkStart = chunkIndex * self.ChunkSize
+            chunk = self._decodeRange(chunkStart, min(chunkStart + self.ChunkSize, len(self)))
+            self._chunks[chunkIndex] = chunk
+            if len(self._chunks) * self.ChunkSize > self.WindowSize:
+                self._chunks.popitem(last=False)
+
+        self._lastChunkIndex = chunkIndex
+        self._lastChunk = chunk
+        return chunk
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> rabbitizer.Instruction: ...
+    @overload
+    def __getitem__(self, index: slice) -> InstructionSequence: ...
+    def __getitem__(self, index: int|slice) -> rabbitizer.Instruction|InstructionSequence:
+        if isinstance(index, int):
+            # Fast paths, since this is called for almost every instruction
+            decoded = self._decoded
+            if decoded is not None:
+                return decoded[index]
+            if index >= 0:
+                chunkIndex = index // self.ChunkSize
+                if chunkIndex == self._lastChunkIndex:
+                    return self._lastChunk[index - chunkIndex * self.ChunkSize]
+
+        if isinstance(index, slice):
+            start, end, step = index.indices(len(self))
+            assert step == 1, "Only contiguous slices are supported"
+            end = max(start, end)
+            vram = self.vram + start * 4 if self.vram is not None else None
+            sliced = InstructionSequence(self._words, vram, self.instrCat, self._start + start, self._start + end)
+            sliced._inHandwrittenFunction = self._inHandwrittenFunction
+            sliced._pinned = {i - start: instr for i, instr in self._pinned.items() if start <= i < end}
+            return sliced
+
+        decoded = self._getDecoded()
+        if decoded is not None:
+            return decoded[index]
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("instruction index out of range")
+        return self._getChunk(index // self.ChunkSize)[index % self.ChunkSize]
+
+    def __iter__(self) -> Iterator[rabbitizer.Instruction]:
+        decoded = self._getDecoded()
+        if decoded is not None:
+            return iter(decoded)
+        return self._iterChunks()
+
+    def _iterChunks(self) -> Iterator[rabbitizer.Instruction]:
+        for chunkIndex in range((len(self) + self.ChunkSize - 1) // self.ChunkSize):
+            yield from self._getChunk(chunkIndex)
+
+
+    def toList(self) -> list[rabbitizer.Instruction]:
+        """Returns every instruction as a list, which is faster to index. Meant for passes which access all the instructions many times.
+
+        The list is not cached by the sequence if it doesn't fit on the window.
+        """
+        decoded = self._getDecoded()
+        if decoded is not None:
+            return decoded
+        return self._decodeRange(0, len(self))
+
+    def getUncached(self, index: int) -> rabbitizer.Instruction:
+        "Decodes only the instruction at `index`, without caching it. Meant for sparse accesses, where decoding whole chunks is wasteful"
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("instruction index out of range")
+        return self._decodeRange(index, index + 1)[0]
+
+    def getRaw(self, index: int) -> int:
+        "Returns the word of the instruction at `index` without decoding it"
+        instr = self._pinned.get(index)
+        if instr is not None:
+            return instr.getRaw()
+        return self._words[self._start + index]
+
+    def setInHandwrittenFunction(self, inHandwrittenFunction: bool) -> None:
+        "Sets the `inHandwrittenFunction` attribute of every instruction of the sequence, including the ones decoded later"
+        self._inHandwrittenFunction = inHandwrittenFunction
+        for instr in self._pinned.values():
+            instr.inHandwrittenFunction = inHandwrittenFunction
+        self.releaseCache()
+
+    def blankOut(self, index: int) -> None:
+        "Blanks out the instruction at `index`, keeping it instead of decoding it again"
+        instr = self[index]
+        instr.blankOut()
+        self._pinned[index] = instr
+        self.version += 1
+
+    def truncate(self, length: int) -> None:
+        "Removes every instruction after the first `length` ones"
+        if length >= len(self):
+            return
+        self._end = self._start + length
+        self.version += 1
+        self._pinned = {i: instr for i, instr in self._pinned.items() if i < length}
+        self.releaseCache()
+
+    def releaseCache(self) -> None:
+        "Drops every decoded instruction which was not modified, so they are decoded again the next time they are accessed"
+        self._decoded = None
+        self._chunks.clear()
+        self._lastChunkIndex = -1
+        self._lastChunk = list()
@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+import array
+import io
 import sys
 from typing import TextIO
 from pathlib import Path
@@ -15,7 +17,7 @@ from . import symbols
 
 
 class FileBase(common.ElementBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, words: list[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, words: list[int]|array.array[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, 0, vram, filename, words, sectionType, segmentVromStart, overlayCategory)
 
         self.symbolList: list[symbols.SymbolBase] = []
@@ -38,29 +40,29 @@ class FileBase(common.ElementBase):
     def getAsmPrelude(self) -> str:
         output = ""
 
-        output += ".include \"macro.inc\"" + common.GlobalConfig.LINE_ENDS
-        output += common.GlobalConfig.LINE_ENDS
-        output += "# assembler directives" + common.GlobalConfig.LINE_ENDS
-        output += ".set noat      # allow manual use of $at" + common.GlobalConfig.LINE_ENDS
-        output += ".set noreorder # don't insert nops after branches" + common.GlobalConfig.LINE_ENDS
-        output += ".set gp=64     # allow use of 64-bit general purpose registers" + common.GlobalConfig.LINE_ENDS
-        output += common.GlobalConfig.LINE_ENDS
-        output += f".section {self.sectionType.toSectionName()}" + common.GlobalConfig.LINE_ENDS
-        output += common.GlobalConfig.LINE_ENDS
-        output += ".balign 16" + common.GlobalConfig.LINE_ENDS
+        output += ".include \"macro.inc\"" + self.config.LINE_ENDS
+        output += self.config.LINE_ENDS
+        output += "# assembler directives" + self.config.LINE_ENDS
+        output += ".set noat      # allow manual use of $at" + self.config.LINE_ENDS
+        output += ".set noreorder # don't insert nops after branches" + self.config.LINE_ENDS
+        output += ".set gp=64     # allow use of 64-bit general purpose registers" + self.config.LINE_ENDS
+        output += self.config.LINE_ENDS
+        output += f".section {self.sectionType.toSectionName()}" + self.config.LINE_ENDS
+        output += self.config.LINE_ENDS
+        output += ".balign 16" + self.config.LINE_ENDS
 
         return output
 
     def getHash(self) -> str:
         buffer = bytearray(4*len(self.words))
-        common.Utils.wordsToBytes(self.words, buffer)
+        common.Utils.endianessWordsToBytes(self.config.ENDIAN, self.words, buffer)
         return common.Utils.getStrHash(buffer)
 
 
     def checkAndCreateFirstSymbol(self) -> None:
         "Check if the very start of the file has a symbol and create it if it doesn't exist yet"
 
-        if not common.GlobalConfig.ADD_NEW_SYMBOLS:
+        if not self.config.ADD_NEW_SYMBOLS:
             return
 
         currentVram = self.getVramOffset(0)
@@ -71,7 +73,7 @@ class FileBase(common.ElementBase):
 
 
     def printNewFileBoundaries(self):
-        if not common.GlobalConfig.PRINT_NEW_FILE_BOUNDARIES:
+        if not self.config.PRINT_NEW_FILE_BOUNDARIES:
             return
 
         if len(self.fileBoundaries) > 0:
@@ -140,46 +142,57 @@ class FileBase(common.ElementBase):
         return result
 
     def blankOutDifferences(self, other: FileBase) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         return False
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         return False
 
 
     def disassemble(self) -> str:
-        output = ""
+        output = io.StringIO()
+        self.disassembleToStream(output)
+        return output.getvalue()
+
+    def disassembleToStream(self, f: TextIO) -> None:
         for i, sym in enumerate(self.symbolList):
-            output += sym.disassemble()
+            sym.disassembleToStream(f)
             if i + 1 < len(self.symbolList):
-                output += common.GlobalConfig.LINE_ENDS
-        return output
+                f.write(self.config.LINE_ENDS)
 
     def disassembleToFile(self, f: TextIO):
-        if common.GlobalConfig.ASM_USE_PRELUDE:
+        if self.config.ASM_USE_PRELUDE:
             f.write(self.getAsmPrelude())
-            f.write(common.GlobalConfig.LINE_ENDS)
-        f.write(self.disassemble())
+            f.write(self.config.LINE_ENDS)
+        self.disassembleToStream(f)
+
 
+    def saveToFile(self, filepath: str, writer: common.FileWriter|None=None):
+        """Writes the disassembly of this file, and its binary if `WRITE_BINARY` is enabled.
 
-    def saveToFile(self, filepath: str):
+        If a `writer` is passed then the files are written by it instead of being written before returning.
+        """
         if len(self.symbolList) == 0:
             return
 
         if filepath == "-":
             self.disassembleToFile(sys.stdout)
         else:
-            if common.GlobalConfig.WRITE_BINARY:
+            if self.config.WRITE_BINARY:
                 if self.sizew > 0:
                     buffer = bytearray(4*len(self.words))
-                    common.Utils.wordsToBytes(self.words, buffer)
-                    common.Utils.writeBytearrayToFile(Path(filepath + self.sectionType.toStr()), buffer)
-            with open(filepath + self.sectionType.toStr() + ".s", "w") as f:
+                    common.Utils.endianessWordsToBytes(self.config.ENDIAN, self.words, buffer)
+                    if writer is None:
+                        common.Utils.writeBytearrayToFile(Path(filepath + self.sectionType.toStr()), buffer)
+                    else:
+                        writer.writeBytes(Path(filepath + self.sectionType.toStr()), buffer)
+            asmPath = Path(filepath + self.sectionType.toStr() + ".s")
+            with (asmPath.open("w") if writer is None else writer.openText(asmPath)) as f:
                 self.disassembleToFile(f)
 
 
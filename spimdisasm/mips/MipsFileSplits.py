@@ -16,8 +16,8 @@ from . import FileBase, createEmptyFile
 
 
 class FileSplits(FileBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytearray, segmentVromStart: int, overlayCategory: str|None, splitsData: common.FileSplitFormat|None=None, relocSection: sections.SectionRelocZ64|None=None):
-        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Unknown, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|bytearray|memoryview, segmentVromStart: int, overlayCategory: str|None, splitsData: common.FileSplitFormat|None=None, relocSection: sections.SectionRelocZ64|None=None):
+        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.endianessBytesToWordArray(context.config.ENDIAN, array_of_bytes, vromStart, vromEnd), common.FileSectionType.Unknown, segmentVromStart, overlayCategory)
 
         self.sectionsDict: dict[common.FileSectionType, dict[str, sections.SectionBase]] = {
             common.FileSectionType.Text: dict(),
@@ -96,12 +96,12 @@ class FileSplits(FileBase):
                 section.setVram(vram)
 
     def getHash(self) -> str:
-        words = list()
+        words: list[int] = list()
         for sectDict in self.sectionsDict.values():
             for section in sectDict.values():
                 words += section.words
         buffer = bytearray(4*len(words))
-        common.Utils.wordsToBytes(words, buffer)
+        common.Utils.endianessWordsToBytes(self.config.ENDIAN, words, buffer)
         return common.Utils.getStrHash(buffer)
 
     def analyze(self):
@@ -149,7 +149,7 @@ class FileSplits(FileBase):
         return super().compareToFile(other_file)
 
     def blankOutDifferences(self, other_file: FileBase) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         if not isinstance(other_file, FileSplits):
@@ -169,7 +169,7 @@ class FileSplits(FileBase):
         return was_updated
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
@@ -179,9 +179,9 @@ class FileSplits(FileBase):
 
         return was_updated
 
-    def saveToFile(self, filepath: str):
+    def saveToFile(self, filepath: str, writer: common.FileWriter|None=None):
         for sectDict in self.sectionsDict.values():
             for name, section in sectDict.items():
                 if name != "" and not filepath.endswith("/"):
                     name = " " + name
-                section.saveToFile(filepath + name)
+                section.saveToFile(filepath + name, writer)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+from pathlib import Path
+import time
+from typing import Any, Generator, Iterable
+
+from .. import __version__
+from .. import common
+
+from . import sections
+from . import symbols
+
+
+@dataclasses.dataclass
+class StageTimes:
+    wall: float = 0.0
+    "Elapsed real time, in seconds"
+    cpu: float = 0.0
+    "CPU time of the current process, in seconds. Does not include the time spent by worker processes"
+
+    def toJson(self) -> dict[str, float]:
+        return {"wall": self.wall, "cpu": self.cpu}
+
+
+@dataclasses.dataclass
+class SectionStats:
+    name: str
+    sectionType: common.FileSectionType
+    vromStart: int
+    vromEnd: int
+    vram: int
+    stages: dict[str, StageTimes] = dataclasses.field(default_factory=dict)
+    counts: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    def toJson(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.sectionType.toStr(),
+            "vromStart": self.vromStart,
+            "vromEnd": self.vromEnd,
+            "vram": self.vram,
+            "counts": self.counts,
+            "stages": {stage: times.toJson() for stage, times in self.stages.items()},
+        }
+
+
+class PipelineStats:
+    """Records how much time is spent on each stage of the disassembly pipeline and on each section, alongside some counters, so it can be
+    written as a json report.
+    """
+
+    FormatVersion: int = 1
+    "Bumped each time the layout of the json report changes in an incompatible way"
+
+    def __init__(self, tool: str=""):
+        self.tool: str = tool
+        "Name of the program which produced the report"
+
+        self.stages: dict[str, StageTimes] = dict()
+        "Times of each stage of the pipeline, in the order they were first run"
+        self.counts: dict[str, int] = dict()
+
+        self._sections: dict[int, SectionStats] = dict()
+        "Keyed by the `id` of the section, since the same name can be used by many sections"
+
+        self._startWall: float = time.perf_counter()
+        self._startCpu: float = time.process_time()
+
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _measure(times: StageTimes) -> Generator[None, None, None]:
+        startWall = time.perf_counter()
+        startCpu = time.process_time()
+        try:
+            yield
+        finally:
+            times.wall += time.perf_counter() - startWall
+            times.cpu += time.process_time() - startCpu
+
+    def stage(self, name: str) -> contextlib.AbstractContextManager[None]:
+        "Times the `with` block as part of the `name` stage. A stage can be run many times, its times are accumulated"
+        if name not in self.stages:
+            self.stages[name] = StageTimes()
+        return self._measure(self.stages[name])
+
+    def _getSectionStats(self, section: sections.SectionBase) -> SectionStats:
+        sectionStats = self._sections.get(id(section))
+        if sectionStats is None:
+            sectionStats = SectionStats(section.name, section.sectionType, section.vromStart, section.vromEnd, section.vram)
+            self._sections[id(section)] = sectionStats
+        return sectionStats
+
+    def sectionStage(self, section: sections.SectionBase, name: str) -> contextlib.AbstractContextManager[None]:
+        "Times the `with` block as part of the `name` stage of the passed section"
+        sectionStats = self._getSectionStats(section)
+        if name not in sectionStats.stages:
+            sectionStats.stages[name] = StageTimes()
+        return self._measure(sectionStats.stages[name])
+
+
+    def countSections(self, sectionsList: Iterable[sections.SectionBase]) -> None:
+        "Counts the instructions, functions and symbols of the already analyzed sections"
+        instructionsCount = 0
+        functionsCount = 0
+        sectionsCount = 0
+        for section in sectionsList:
+            sectionStats = self._getSectionStats(section)
+            sectionStats.counts["symbols"] = len(section.symbolList)
+            if section.sectionType == common.FileSectionType.Text:
+                sectionFunctions = sum(1 for func in section.symbolList if isinstance(func, symbols.SymbolFunction))
+                sectionStats.counts["instructions"] = section.sizew
+                sectionStats.counts["functions"] = sectionFunctions
+                instructionsCount += section.sizew
+                functionsCount += sectionFunctions
+            sectionsCount += 1
+
+        self.counts["sections"] = sectionsCount
+        self.counts["instructions"] = instructionsCount
+        self.counts["functions"] = functionsCount
+
+    def countContextLookups(self, context: common.Context) -> None:
+        "Starts counting how many times a symbol is searched on the context, which is reported by `countContext`"
+        context.setLookupsCounting(True)
+
+    def countContext(self, context: common.Context) -> None:
+        """Counts the symbols of the context and how many times a symbol was searched on it by the current process.
+
+        The lookups are only reported if `countContextLookups` was called with this context before disassembling.
+        """
+        self.counts["symbols"] = sum(len(segment.symbols) for segment in context.getAllSegments())
+        if context.countLookups:
+            self.counts["contextLookups"] = sum(segment.lookupsCount for segment in context.getAllSegments())
+
+
+    def toJson(self) -> dict[str, Any]:
+        totalWall = time.perf_counter() - self._startWall
+        totalCpu = time.process_time() - self._startCpu
+
+        instructionsCount = self.counts.get("instructions", 0)
+        return {
+            "formatVersion": self.FormatVersion,
+            "tool": self.tool,
+            "version": __version__,
+            "total": StageTimes(totalWall, totalCpu).toJson(),
+            "instructionsPerSecond": instructionsCount / totalWall if totalWall > 0 else 0.0,
+            "stages": {stage: times.toJson() for stage, times in self.stages.items()},
+            "counts": self.counts,
+            "sections": [sectionStats.toJson() for sectionStats in self._sections.values()],
+        }
+
+    def writeJson(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(self.toJson(), f, indent=4)
+            f.write("\n")
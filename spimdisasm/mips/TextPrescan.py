@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import array
+import bisect
+from typing import Sequence
+
+import rabbitizer
+
+try:
+    import numpy as np
+    NumpyAvailable = True
+except ImportError:
+    NumpyAvailable = False
+
+
+_PlainPrimaryOpcodes = frozenset({
+    0x31, # lwc1
+    0x35, # ldc1
+    0x39, # swc1
+    0x3D, # sdc1
+})
+"CPU opcodes which are always plain"
+
+_PlainPrimaryOpcodesUnlessKernelRegs = frozenset({
+    0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x0E, 0x0F, # addiu, slti, sltiu, andi, ori, xori, lui
+    0x18, 0x19, 0x1A, 0x1B, # daddi, daddiu, ldl, ldr
+    0x20, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, # lb, lh, lwl, lw, lbu, lhu, lwr, lwu
+    0x28, 0x29, 0x2A, 0x2B, 0x2C, 0x2D, 0x2E, # sb, sh, swl, sw, sdl, sdr, swr
+    0x32, 0x33, 0x36, 0x37, 0x3A, 0x3E, 0x3F, # lwc2, pref, ldc2, ld, swc2, sdc2, sd
+})
+"CPU opcodes which are plain if neither `rs` nor `rt` are `$k0` or `$k1`, since using those registers makes a function likely handwritten"
+
+_PlainSpecialFunctions = frozenset({
+    0x00, 0x02, 0x03, 0x04, 0x06, 0x07, # sll, srl, sra, sllv, srlv, srav
+    0x0A, 0x0B, 0x0D, 0x0F, # movz, movn, break, sync
+    0x10, 0x11, 0x12, 0x13, 0x14, 0x16, 0x17, # mfhi, mthi, mflo, mtlo, dsllv, dsrlv, dsrav
+    0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E, 0x1F, # mult, multu, div, divu, dmult, dmultu, ddiv, ddivu
+    0x21, 0x23, 0x24, 0x25, 0x26, 0x27, 0x2A, 0x2B, # addu, subu, and, or, xor, nor, slt, sltu
+    0x2C, 0x2D, 0x2E, 0x2F, # dadd, daddu, dsub, dsubu
+    0x38, 0x3A, 0x3B, 0x3C, 0x3E, 0x3F, # dsll, dsrl, dsra, dsll32, dsrl32, dsra32
+})
+"Functions of the CPU SPECIAL opcode which are always plain, including the `nop`"
+
+
+class TextPrescan:
+    """Finds which words of a CPU text section may change the state of the function boundary detection of `SectionText.analyze`.
+
+    A word is plain if it is an implemented instruction which is not a branch or a jump and doesn't make the function likely handwritten, no
+    matter the rabbitizer configuration. Nops are plain too, since they only matter after the end of a function, where the boundary detection
+    doesn't skip words. The boundary detection can skip every run of plain words in a single step, without decoding them. The rest of the
+    words are the interesting ones.
+
+    The words are classified with NumPy if it is installed, otherwise a plain Python loop is used.
+    """
+
+    def __init__(self, words: array.array[int]|Sequence[int]):
+        self.wordsCount: int = len(words)
+        if NumpyAvailable:
+            self.interestingIndices: list[int] = self._findInterestingNumpy(words)
+        else:
+            self.interestingIndices = self._findInterestingPython(words)
+        "Sorted indices of every word which is not plain"
+
+    @staticmethod
+    def isSupported(instrCat: rabbitizer.Enum) -> bool:
+        return instrCat == rabbitizer.InstrCategory.CPU
+
+
+    @staticmethod
+    def _findInterestingNumpy(words: array.array[int]|Sequence[int]) -> list[int]:
+        if isinstance(words, array.array) and words.itemsize == 4:
+            wordsArray = np.frombuffer(words, dtype=np.uint32)
+        else:
+            wordsArray = np.array(words, dtype=np.uint32)
+
+        plainPrimary = np.zeros(64, dtype=np.bool_)
+        plainPrimary[list(_PlainPrimaryOpcodes)] = True
+        plainPrimaryUnlessKernelRegs = np.zeros(64, dtype=np.bool_)
+        plainPrimaryUnlessKernelRegs[list(_PlainPrimaryOpcodesUnlessKernelRegs)] = True
+        plainSpecial = np.zeros(64, dtype=np.bool_)
+        plainSpecial[list(_PlainSpecialFunctions)] = True
+
+        opcodes = wordsArray >> 26
+        # `$k0` and `$k1` are registers 26 and 27
+        usesKernelRegs = (((wordsArray >> 22) & 0xF) == 13) | (((wordsArray >> 17) & 0xF) == 13)
+
+        plain = np.where(
+            opcodes == 0,
+            plainSpecial[wordsArray & 0x3F],
+            plainPrimary[opcodes] | (plainPrimaryUnlessKernelRegs[opcodes] & ~usesKernelRegs),
+        )
+        interestingIndices: list[int] = np.flatnonzero(~plain).tolist()
+        return interestingIndices
+
+    @staticmethod
+    def _findInterestingPython(words: array.array[int]|Sequence[int]) -> list[int]:
+        interestingIndices: list[int] = list()
+        for index, word in enumerate(words):
+            opcode = word >> 26
+            if opcode == 0:
+                if (word & 0x3F) in _PlainSpecialFunctions:
+                    continue
+            elif opcode in _PlainPrimaryOpcodes:
+                continue
+            elif opcode in _PlainPrimaryOpcodesUnlessKernelRegs:
+                # `$k0` and `$k1` are registers 26 and 27
+                if ((word >> 22) & 0xF) != 13 and ((word >> 17) & 0xF) != 13:
+                    continue
+            interestingIndices.append(index)
+        return interestingIndices
+
+
+    def getRunEnd(self, index: int) -> int:
+        "Returns the index of the first interesting word starting at `index`, or the amount of words if every word after it is plain"
+        position = bisect.bisect_left(self.interestingIndices, index)
+        if position < len(self.interestingIndices):
+            return self.interestingIndices[position]
+        return self.wordsCount
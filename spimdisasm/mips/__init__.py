@@ -10,7 +10,10 @@ from . import symbols
 
 from . import FilesHandlers
 
+from .AnalysisCache import AnalysisCache
 from .InstructionConfig import InstructionConfig
+from .InstructionSequence import InstructionSequence
 from .MipsFileBase import FileBase, createEmptyFile
 from .MipsFileSplits import FileSplits
 from .MipsRelocTypes import RelocTypes
+from .PipelineStats import PipelineStats
@@ -5,20 +5,18 @@
 
 from __future__ import annotations
 
-from ... import common
-
 from ..MipsFileBase import FileBase
 
 class SectionBase(FileBase):
     def blankOutDifferences(self, other: FileBase) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
-        if len(common.GlobalConfig.IGNORE_WORD_LIST) > 0:
+        if len(self.config.IGNORE_WORD_LIST) > 0:
             min_len = min(self.sizew, other.sizew)
             for i in range(min_len):
-                for upperByte in common.GlobalConfig.IGNORE_WORD_LIST:
+                for upperByte in self.config.IGNORE_WORD_LIST:
                     word = upperByte << 24
                     if ((self.words[i] >> 24) & 0xFF) == upperByte and ((other.words[i] >> 24) & 0xFF) == upperByte:
                         self.words[i] = word
@@ -5,22 +5,45 @@
 
 from __future__ import annotations
 
+import array
+
 from ... import common
 
 from .. import symbols
 
 from . import SectionBase
 
+try:
+    import numpy as np
+    NumpyAvailable = True
+except ImportError:
+    NumpyAvailable = False
+
 
 class SectionData(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytearray, segmentVromStart: int, overlayCategory: str|None):
-        if common.GlobalConfig.ENDIAN_DATA is not None:
-            words = common.Utils.endianessBytesToWords(common.GlobalConfig.ENDIAN_DATA, array_of_bytes, vromStart, vromEnd)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|bytearray|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        if context.config.ENDIAN_DATA is not None:
+            words = common.Utils.endianessBytesToWordArray(context.config.ENDIAN_DATA, array_of_bytes, vromStart, vromEnd)
         else:
-            words = common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd)
+            words = common.Utils.endianessBytesToWordArray(context.config.ENDIAN, array_of_bytes, vromStart, vromEnd)
         super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Data, segmentVromStart, overlayCategory)
 
 
+    def _findPointerCandidates(self) -> list[int]:
+        """Returns, sorted and without duplicates, every word which may be a pointer.
+
+        The words are masked with NumPy if it is installed, otherwise a plain Python loop is used.
+        """
+        if NumpyAvailable:
+            if isinstance(self.words, array.array) and self.words.itemsize == 4:
+                wordsArray = np.frombuffer(self.words, dtype=np.uint32)
+            else:
+                wordsArray = np.array(self.words, dtype=np.uint32)
+            mask = (wordsArray >= self.vram) & (wordsArray > 0x80000000) & (wordsArray < 0x84000000)
+            candidates: list[int] = np.unique(wordsArray[mask]).tolist()
+            return candidates
+        return sorted({w for w in self.words if w >= self.vram and w > 0x80000000 and w < 0x84000000})
+
     def analyze(self):
         self.checkAndCreateFirstSymbol()
 
@@ -29,41 +52,61 @@ class SectionData(SectionBase):
 
         needsFurtherAnalyzis = False
 
+        vramEnd = self.getVramOffset(self.sizew*4)
+        # Only the addresses which already have a symbol need to be looked up
+        symbolsVrams = self.getSymbolsVramsInRange(self.vram, vramEnd)
+
+        # Pointer tables usually have many pointers to the same addresses, so each address is only looked up once.
+        # key: possible pointer, value: if it has a symbol
+        pointerCandidates: dict[int, bool] = dict()
+        for w in self._findPointerCandidates():
+            if w not in self.context.bannedSymbols:
+                pointerCandidates[w] = self.getSymbol(w, tryPlusOffset=True, checkUpperLimit=True) is not None
+        # The symbols added by this loop may change the symbol found for the addresses after them, so those are looked up again
+        firstAddedVram: int|None = None
+        # Only the addresses with a pending pointer need to be popped. Updated with the pointers added by this loop
+        pendingPointers = set(self.getPointersInDataReferencesInRange(self.vram, vramEnd))
+
         for w in self.words:
             currentVram = self.getVramOffset(localOffset)
 
-            contextSym = self.getSymbol(currentVram, tryPlusOffset=False)
+            contextSym = self.getSymbol(currentVram, tryPlusOffset=False) if currentVram in symbolsVrams else None
             if contextSym is not None:
                 symbolList.append((localOffset, contextSym))
-            elif self.popPointerInDataReference(currentVram) is not None:
-                if common.GlobalConfig.ADD_NEW_SYMBOLS:
+            elif currentVram in pendingPointers and self.popPointerInDataReference(currentVram) is not None:
+                if self.config.ADD_NEW_SYMBOLS:
                     contextSym = self.addSymbol(currentVram, self.sectionType, isAutogenerated=True)
                     symbolList.append((localOffset, contextSym))
+                    if firstAddedVram is None:
+                        firstAddedVram = currentVram
 
-            if w >= self.vram and w > 0x80000000 and w < 0x84000000:
-                if w not in self.context.bannedSymbols:
-                    if self.getSymbol(w, tryPlusOffset=True, checkUpperLimit=True) is None:
-                        self.addPointerInDataReference(w)
+            hasSymbol = pointerCandidates.get(w)
+            if hasSymbol is not None:
+                if firstAddedVram is not None and w >= firstAddedVram:
+                    hasSymbol = self.getSymbol(w, tryPlusOffset=True, checkUpperLimit=True) is not None
+                if not hasSymbol:
+                    self.addPointerInDataReference(w)
+                    pendingPointers.add(w)
 
-                        if w < currentVram and self.containsVram(w):
-                            # References a data symbol from this section and it is behind this current symbol
-                            needsFurtherAnalyzis = True
+                    if w < currentVram and self.containsVram(w):
+                        # References a data symbol from this section and it is behind this current symbol
+                        needsFurtherAnalyzis = True
 
             localOffset += 4
 
         if needsFurtherAnalyzis:
-            localOffset = 0
-            for w in self.words:
-                currentVram = self.getVramOffset(localOffset)
+            # Only the words with a pending pointer to them can get a new symbol, so there's no need to go through every word again
+            for currentVram in self.getPointersInDataReferencesInRange(self.vram, vramEnd):
+                localOffset = currentVram - self.vram
+                if localOffset % 4 != 0:
+                    continue
 
                 contextSym = self.getSymbol(currentVram, tryPlusOffset=True, checkUpperLimit=True)
                 if contextSym is None and self.popPointerInDataReference(currentVram) is not None:
-                    if common.GlobalConfig.ADD_NEW_SYMBOLS:
+                    if self.config.ADD_NEW_SYMBOLS:
                         contextSym = self.addSymbol(currentVram, self.sectionType, isAutogenerated=True)
                         symbolList.append((localOffset, contextSym))
 
-                localOffset += 4
-
             symbolList.sort()
 
         for i, (offset, contextSym) in enumerate(symbolList):
@@ -85,7 +128,7 @@ class SectionData(SectionBase):
 
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
@@ -15,24 +15,27 @@ from . import SectionBase
 
 
 class SectionRodata(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytearray, segmentVromStart: int, overlayCategory: str|None):
-        if common.GlobalConfig.ENDIAN_RODATA is not None:
-            words = common.Utils.endianessBytesToWords(common.GlobalConfig.ENDIAN_RODATA, array_of_bytes, vromStart, vromEnd)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|bytearray|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        if context.config.ENDIAN_RODATA is not None:
+            words = common.Utils.endianessBytesToWordArray(context.config.ENDIAN_RODATA, array_of_bytes, vromStart, vromEnd)
         else:
-            words = common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd)
+            words = common.Utils.endianessBytesToWordArray(context.config.ENDIAN, array_of_bytes, vromStart, vromEnd)
         super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Rodata, segmentVromStart, overlayCategory)
 
         self.bytes: bytearray = bytearray(self.sizew*4)
-        common.Utils.wordsToBytes(self.words, self.bytes)
+        common.Utils.endianessWordsToBytes(self.config.ENDIAN, self.words, self.bytes)
 
         self.stringEncoding: str = "EUC-JP"
 
+        self.decodedStrings: dict[tuple[bytes, str], list[str]|None] = dict()
+        "Cache of decoded strings, shared by the string guesser and the rendering of the symbols of this section"
+
 
     def _stringGuesser(self, contextSym: common.ContextSymbol, localOffset: int) -> bool:
         if contextSym.isMaybeString or contextSym.isString():
             return True
 
-        if not common.GlobalConfig.STRING_GUESSER:
+        if not self.config.STRING_GUESSER:
             return False
 
         if not contextSym.hasNoType() or contextSym.referenceCounter > 1:
@@ -43,7 +46,7 @@ class SectionRodata(SectionBase):
             return False
 
         try:
-            common.Utils.decodeString(self.bytes, localOffset, self.stringEncoding)
+            common.Utils.decodeString(self.bytes, localOffset, self.stringEncoding, self.decodedStrings)
         except (UnicodeDecodeError, RuntimeError):
             # String can't be decoded
             return False
@@ -63,7 +66,7 @@ class SectionRodata(SectionBase):
                     relocSymbol.sectionType = sectType
 
                     relocName = f"{relocSymbol.name}_{w:06X}"
-                    contextOffsetSym = common.ContextOffsetSymbol(w, relocName, sectType)
+                    contextOffsetSym = common.ContextOffsetSymbol(w, relocName, sectType, config=self.config)
                     if sectType == common.FileSectionType.Text:
                         # jumptable
                         relocName = f"L{w:06X}"
@@ -85,10 +88,13 @@ class SectionRodata(SectionBase):
 
         lastVramSymbol: common.ContextSymbol | None = None
 
+        # Only the addresses which have a symbol need to be looked up. Updated with the symbols added by this loop
+        symbolsVrams = self.getSymbolsVramsInRange(self.vram, self.getVramOffset(self.sizew*4))
+
         partOfJumpTable = False
         for w in self.words:
             currentVram = self.getVramOffset(localOffset)
-            contextSym = self.getSymbol(currentVram, tryPlusOffset=False)
+            contextSym = self.getSymbol(currentVram, tryPlusOffset=False) if currentVram in symbolsVrams else None
 
             if contextSym is not None:
                 lastVramSymbol = contextSym
@@ -108,26 +114,28 @@ class SectionRodata(SectionBase):
 
                 elif ((w >> 24) & 0xFF) != 0x80:
                     partOfJumpTable = False
-                    if lastVramSymbol is not None and lastVramSymbol.isJumpTable() and lastVramSymbol.isGot and common.GlobalConfig.GP_VALUE is not None:
+                    if lastVramSymbol is not None and lastVramSymbol.isJumpTable() and lastVramSymbol.isGot and self.config.GP_VALUE is not None:
                         partOfJumpTable = True
 
             if partOfJumpTable:
-                if lastVramSymbol is not None and lastVramSymbol.isGot and common.GlobalConfig.GP_VALUE is not None:
-                    labelAddr = common.GlobalConfig.GP_VALUE + rabbitizer.Utils.from2Complement(w, 32)
-                    labelSym = self.addJumpTableLabel(labelAddr, isAutogenerated=True)
+                if lastVramSymbol is not None and lastVramSymbol.isGot and self.config.GP_VALUE is not None:
+                    labelAddr = self.config.GP_VALUE + rabbitizer.Utils.from2Complement(w, 32)
                 else:
-                    labelSym = self.addJumpTableLabel(w, isAutogenerated=True)
+                    labelAddr = w
+                labelSym = self.addJumpTableLabel(labelAddr, isAutogenerated=True)
                 labelSym.referenceCounter += 1
+                symbolsVrams.add(labelAddr)
 
             elif self.popPointerInDataReference(currentVram) is not None:
-                if common.GlobalConfig.ADD_NEW_SYMBOLS:
+                if self.config.ADD_NEW_SYMBOLS:
                     contextSym = self.addSymbol(currentVram, self.sectionType, isAutogenerated=True)
                     contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
+                    symbolsVrams.add(currentVram)
 
             elif contextSym is not None:
                 contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
 
-            contextSym = self.getSymbol(currentVram, tryPlusOffset=False)
+            contextSym = self.getSymbol(currentVram, tryPlusOffset=False) if currentVram in symbolsVrams else None
             if contextSym is not None:
                 self.symbolsVRams.add(currentVram)
 
@@ -151,6 +159,7 @@ class SectionRodata(SectionBase):
             sym.parent = self
             sym.setCommentOffset(self.commentOffset)
             sym.stringEncoding = self.stringEncoding
+            sym.decodedStrings = self.decodedStrings
             sym.analyze()
             self.symbolList.append(sym)
 
@@ -158,7 +167,7 @@ class SectionRodata(SectionBase):
             if sym.inFileOffset % 16 == 0:
                 # Files are always 0x10 aligned
 
-                if previousSymbolWasLateRodata and not sym.contextSym.isLateRodata() and common.GlobalConfig.COMPILER == common.Compiler.IDO:
+                if previousSymbolWasLateRodata and not sym.contextSym.isLateRodata() and self.config.COMPILER == common.Compiler.IDO:
                     # late rodata followed by normal rodata implies a file split
                     self.fileBoundaries.append(sym.inFileOffset)
                 elif previousSymbolExtraPadding > 0:
@@ -176,7 +185,7 @@ class SectionRodata(SectionBase):
 
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = super().removePointers()
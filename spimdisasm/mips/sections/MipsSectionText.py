@@ -5,29 +5,42 @@
 
 from __future__ import annotations
 
+import array
+import bisect
+from typing import Callable
+
 import rabbitizer
 
 from ... import common
 
 from .. import symbols
+from ..InstructionSequence import InstructionSequence
 from ..MipsFileBase import FileBase
+from ..TextPrescan import TextPrescan
 
 from . import SectionBase
 
 
 class SectionText(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytearray, segmentVromStart: int, overlayCategory: str|None):
-        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Text, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|bytearray|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.endianessBytesToWordArray(context.config.ENDIAN, array_of_bytes, vromStart, vromEnd), common.FileSectionType.Text, segmentVromStart, overlayCategory)
 
         self.instrCat: rabbitizer.Enum = rabbitizer.InstrCategory.CPU
 
+        self.precomputedInstrAnalysis: dict[tuple[int, int, bool], symbols.analysis.InstrAnalysisResult] = dict()
+        """Results of `SymbolFunction.analyzeInstructions` computed ahead of time, for example by another process.
+
+        The key is the vrom start and end of the function and if it has unimplemented instructions. Functions found by `analyze` which are not in
+        this dictionary are analyzed as usual.
+        """
+
 
     @property
     def nFuncs(self) -> int:
         return len(self.symbolList)
 
     @staticmethod
-    def wordListToInstructions(wordList: list[int], currentVram: int|None, instrCat: rabbitizer.Enum) -> list[rabbitizer.Instruction]:
+    def wordListToInstructions(wordList: list[int]|array.array[int], currentVram: int|None, instrCat: rabbitizer.Enum) -> list[rabbitizer.Instruction]:
         instrsList: list[rabbitizer.Instruction] = list()
         for word in wordList:
             instr = rabbitizer.Instruction(word, category=instrCat)
@@ -39,13 +52,53 @@ class SectionText(SectionBase):
             instrsList.append(instr)
         return instrsList
 
+    def _findFunctionEndInPlainRun(self, runStart: int, runEnd: int, currentFunctionSym: common.ContextSymbol|None, currentInstructionStart: int, symbolsCandidates: list[int]) -> int|None:
+        """Returns the index of the first word of the run of plain words which ends the current function, or `None` if none of them does.
+
+        Does the same checks `analyze` does for every word, but only for the words which may be followed by a function.
+        """
+        if currentFunctionSym is not None and currentFunctionSym.size is not None:
+            endOffset = currentInstructionStart + currentFunctionSym.getSize() - 8
+            if endOffset % 4 == 0 and runStart <= endOffset // 4 < runEnd:
+                return endOffset // 4
+            return None
+
+        candidateIndex = bisect.bisect_left(symbolsCandidates, self.getVramOffset(runStart*4 + 8))
+        runEndVram = self.getVramOffset(runEnd*4 + 8)
+        while candidateIndex < len(symbolsCandidates) and symbolsCandidates[candidateIndex] < runEndVram:
+            candidateVram = symbolsCandidates[candidateIndex]
+            candidateIndex += 1
+            if (candidateVram - self.vram) % 4 != 0:
+                continue
+            index = (candidateVram - self.vram - 8) // 4
+            funcSymbol = self.getSymbol(candidateVram, tryPlusOffset=False, checkGlobalSegment=False)
+            if funcSymbol is not None and funcSymbol.isTrustableFunction(self.instrCat == rabbitizer.InstrCategory.RSP):
+                if funcSymbol.vromAddress is None or self.getVromOffset(index*4+8) == funcSymbol.vromAddress:
+                    return index
+        return None
+
     def analyze(self):
         functionEnded = False
         farthestBranch = 0
         funcsStartsList = [0]
         unimplementedInstructionsFuncList = []
 
-        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
+        instrsList = InstructionSequence(self.words, self.getVramOffset(0), self.instrCat)
+
+        # Runs of words which can't change the state of the boundary detection are skipped all at once
+        prescan: TextPrescan|None = None
+        # Vrams of every known symbol which may end a function, a superset of the ones found by `getSymbol`
+        symbolsCandidates: list[int] = list()
+        symbolsCandidatesSet: set[int] = set()
+        # Only the interesting words are decoded if the prescan is used, which are too sparse to be worth caching
+        getInstr: Callable[[int], rabbitizer.Instruction] = instrsList.__getitem__
+        if TextPrescan.isSupported(self.instrCat):
+            prescan = TextPrescan(self.words)
+            candidatesStart = self.getVramOffset(8)
+            candidatesEnd = self.getVramOffset(len(instrsList)*4 + 8)
+            symbolsCandidatesSet = {address for segment in self.context.getAllSegments() for address, _ in segment.getSymbolsRange(candidatesStart, candidatesEnd)}
+            symbolsCandidates = sorted(symbolsCandidatesSet)
+            getInstr = instrsList.getUncached
 
         instructionOffset = 0
         currentInstructionStart = 0
@@ -57,7 +110,19 @@ class SectionText(SectionBase):
         index = 0
         nInstr = len(instrsList)
         while index < nInstr:
-            instr = instrsList[index]
+            if prescan is not None and not functionEnded:
+                runEnd = prescan.getRunEnd(index)
+                if runEnd > index:
+                    endIndex = self._findFunctionEndInPlainRun(index, runEnd, currentFunctionSym, currentInstructionStart, symbolsCandidates)
+                    if endIndex is not None:
+                        functionEnded = True
+                        runEnd = endIndex + 1
+                    farthestBranch -= 4 * (runEnd - index)
+                    instructionOffset += 4 * (runEnd - index)
+                    index = runEnd
+                    continue
+
+            instr = getInstr(index)
             if not instr.isImplemented():
                 isInstrImplemented = False
 
@@ -70,7 +135,7 @@ class SectionText(SectionBase):
                 isboundary = False
                 # Loop over until we find a instruction that isn't a nop
                 while index < nInstr:
-                    instr = instrsList[index]
+                    instr = getInstr(index)
                     if not instr.isNop():
                         if isboundary:
                             self.fileBoundaries.append(self.inFileOffset + index*4)
@@ -86,7 +151,7 @@ class SectionText(SectionBase):
                 unimplementedInstructionsFuncList.append(not isInstrImplemented)
                 if index >= len(instrsList):
                     break
-                instr = instrsList[index]
+                instr = getInstr(index)
                 isInstrImplemented = instr.isImplemented()
 
             currentVram = self.getVramOffset(instructionOffset)
@@ -126,6 +191,9 @@ class SectionText(SectionBase):
                         # RSP address space?
                         isLikelyHandwritten = True
                 self.addFunction(target, isAutogenerated=True)
+                if prescan is not None and target not in symbolsCandidatesSet:
+                    bisect.insort(symbolsCandidates, target)
+                    symbolsCandidatesSet.add(target)
 
             # Try to find the end of the function
             if currentFunctionSym is not None and currentFunctionSym.size is not None:
@@ -146,7 +214,10 @@ class SectionText(SectionBase):
                             functionEnded = True
 
                 # If there's another function after this then the current function has ended
-                funcSymbol = self.getSymbol(currentVram + 8, tryPlusOffset=False, checkGlobalSegment=False)
+                if prescan is not None and currentVram + 8 not in symbolsCandidatesSet:
+                    funcSymbol = None
+                else:
+                    funcSymbol = self.getSymbol(currentVram + 8, tryPlusOffset=False, checkGlobalSegment=False)
                 if funcSymbol is not None and funcSymbol.isTrustableFunction(self.instrCat == rabbitizer.InstrCategory.RSP):
                     if funcSymbol.vromAddress is None or self.getVromOffset(instructionOffset+8) == funcSymbol.vromAddress:
                         functionEnded = True
@@ -175,9 +246,9 @@ class SectionText(SectionBase):
             vrom = self.getVromOffset(localOffset)
             vromEnd = vrom + (end - start)*4
 
-            if common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS or not hasUnimplementedIntrs:
+            if self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS or not hasUnimplementedIntrs:
                 funcSymbol = self.addFunction(vram, isAutogenerated=True, symbolVrom=vrom)
-            elif common.GlobalConfig.ADD_NEW_SYMBOLS:
+            elif self.config.ADD_NEW_SYMBOLS:
                 self.addSymbol(vram, sectionType=self.sectionType, isAutogenerated=True, symbolVrom=vrom)
 
             self.symbolsVRams.add(vram)
@@ -189,11 +260,30 @@ class SectionText(SectionBase):
             func.hasUnimplementedIntrs = hasUnimplementedIntrs
             func.parent = self
             func.isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+            precomputed = self.precomputedInstrAnalysis.get((vrom, vromEnd, hasUnimplementedIntrs), None)
+            if precomputed is not None:
+                func.setInstrAnalysis(precomputed)
             func.analyze()
+            # The instructions are decoded again when disassembling, so they don't take memory while the other functions are analyzed
+            func.instructions.releaseCache()
             self.symbolList.append(func)
             i += 1
 
 
+    def getInstrAnalysisResults(self) -> dict[tuple[int, int, bool], symbols.analysis.InstrAnalysisResult]:
+        "Returns the results of `SymbolFunction.analyzeInstructions` for every function of this section, using the same keys as `precomputedInstrAnalysis`"
+        results: dict[tuple[int, int, bool], symbols.analysis.InstrAnalysisResult] = dict()
+        for func in self.symbolList:
+            assert isinstance(func, symbols.SymbolFunction)
+            if not func.instrsAnalyzed:
+                continue
+            # Functions already known to have unimplemented instructions are only analyzed if disassembling unknown instructions is enabled,
+            # which also means the analysis never changes this flag
+            hasUnimplementedIntrs = func.hasUnimplementedIntrs and self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS
+            results[(func.vromStart, func.vromEnd, hasUnimplementedIntrs)] = func.getInstrAnalysis()
+        return results
+
+
     def compareToFile(self, other: FileBase):
         result = super().compareToFile(other)
 
@@ -226,7 +316,7 @@ class SectionText(SectionBase):
         return result
 
     def blankOutDifferences(self, other_file: FileBase) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         if not isinstance(other_file, SectionText):
@@ -243,7 +333,7 @@ class SectionText(SectionBase):
         return was_updated
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
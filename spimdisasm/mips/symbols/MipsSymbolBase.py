@@ -5,13 +5,15 @@
 
 from __future__ import annotations
 
-from typing import Callable
+import array
+import io
+from typing import Callable, TextIO
 
 from ... import common
 
 
 class SymbolBase(common.ElementBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int]|array.array[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, "", words, sectionType, segmentVromStart, overlayCategory)
 
         self.endOfLineComment: list[str] = []
@@ -42,17 +44,17 @@ class SymbolBase(common.ElementBase):
 
 
     def generateAsmLineComment(self, localOffset: int, wordValue: int|None = None) -> str:
-        if not common.GlobalConfig.ASM_COMMENT:
+        if not self.config.ASM_COMMENT:
             return ""
 
-        offsetHex = "{0:0{1}X}".format(localOffset + self.inFileOffset + self.commentOffset, common.GlobalConfig.ASM_COMMENT_OFFSET_WIDTH)
+        offsetHex = "{0:0{1}X}".format(localOffset + self.inFileOffset + self.commentOffset, self.config.ASM_COMMENT_OFFSET_WIDTH)
 
         currentVram = self.getVramOffset(localOffset)
         vramHex = f"{currentVram:08X}"
 
         wordValueHex = ""
         if wordValue is not None:
-            wordValueHex = f"{common.Utils.wordToCurrenEndian(wordValue):08X} "
+            wordValueHex = f"{common.Utils.endianessWordToCurrentEndian(self.config.ENDIAN, wordValue):08X} "
 
         return f"/* {offsetHex} {vramHex} {wordValueHex}*/"
 
@@ -132,12 +134,12 @@ class SymbolBase(common.ElementBase):
                 contextSym = self.getSymbolAtVramOrOffset(localOffset+j)
                 if contextSym is not None:
                     # Possible symbols in the middle
-                    label = common.GlobalConfig.LINE_ENDS
+                    label = self.config.LINE_ENDS
                     symLabel = contextSym.getSymbolLabel()
                     if symLabel:
-                        label += symLabel + common.GlobalConfig.LINE_ENDS
-                        if common.GlobalConfig.ASM_DATA_SYM_AS_LABEL:
-                            label += f"{contextSym.getName()}:" + common.GlobalConfig.LINE_ENDS
+                        label += symLabel + self.config.LINE_ENDS
+                        if self.config.ASM_DATA_SYM_AS_LABEL:
+                            label += f"{contextSym.getName()}:" + self.config.LINE_ENDS
 
             if isByte:
                 shiftValue = 24 - (j * 8)
@@ -169,7 +171,7 @@ class SymbolBase(common.ElementBase):
             output += f"{label}{comment} {dotType} {value}"
             if j == 0 and i < len(self.endOfLineComment):
                 output += self.endOfLineComment[i]
-            output += common.GlobalConfig.LINE_ENDS
+            output += self.config.LINE_ENDS
 
         return output, 0
 
@@ -184,11 +186,11 @@ class SymbolBase(common.ElementBase):
     def getPostAlignDirective(self, i: int=0) -> str:
         return ""
 
-    def disassembleAsData(self) -> str:
-        output = self.getPrevAlignDirective(0)
-        output += self.getLabel()
-        if common.GlobalConfig.ASM_DATA_SYM_AS_LABEL:
-            output += f"{self.getName()}:" + common.GlobalConfig.LINE_ENDS
+    def disassembleAsDataToStream(self, f: TextIO) -> None:
+        f.write(self.getPrevAlignDirective(0))
+        f.write(self.getLabel())
+        if self.config.ASM_DATA_SYM_AS_LABEL:
+            f.write(f"{self.getName()}:" + self.config.LINE_ENDS)
 
         canReferenceSymbolsWithAddends = self.canUseAddendsOnData()
         canReferenceConstants = self.canUseConstantsOnData()
@@ -197,13 +199,22 @@ class SymbolBase(common.ElementBase):
         while i < self.sizew:
             data, skip = self.getNthWord(i, canReferenceSymbolsWithAddends, canReferenceConstants)
             if i != 0:
-                output += self.getPrevAlignDirective(i)
-            output += data
-            output += self.getPostAlignDirective(i)
+                f.write(self.getPrevAlignDirective(i))
+            f.write(data)
+            f.write(self.getPostAlignDirective(i))
 
             i += skip
             i += 1
-        return output
+
+    def disassembleAsData(self) -> str:
+        output = io.StringIO()
+        self.disassembleAsDataToStream(output)
+        return output.getvalue()
 
     def disassemble(self) -> str:
-        return self.disassembleAsData()
+        output = io.StringIO()
+        self.disassembleToStream(output)
+        return output.getvalue()
+
+    def disassembleToStream(self, f: TextIO) -> None:
+        self.disassembleAsDataToStream(f)
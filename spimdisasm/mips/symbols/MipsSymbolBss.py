@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+from typing import TextIO
+
 from ... import common
 
 from . import SymbolBase
@@ -23,11 +25,14 @@ class SymbolBss(SymbolBase):
 
     def disassembleAsBss(self) -> str:
         output = self.getLabel()
-        if common.GlobalConfig.ASM_DATA_SYM_AS_LABEL:
-            output += f"{self.getName()}:" + common.GlobalConfig.LINE_ENDS
+        if self.config.ASM_DATA_SYM_AS_LABEL:
+            output += f"{self.getName()}:" + self.config.LINE_ENDS
         output += self.generateAsmLineComment(0)
-        output += f" .space 0x{self.spaceSize:02X}" + common.GlobalConfig.LINE_ENDS
+        output += f" .space 0x{self.spaceSize:02X}" + self.config.LINE_ENDS
         return output
 
     def disassemble(self) -> str:
         return self.disassembleAsBss()
+
+    def disassembleToStream(self, f: TextIO) -> None:
+        f.write(self.disassembleAsBss())
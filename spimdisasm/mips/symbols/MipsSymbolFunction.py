@@ -5,19 +5,23 @@
 
 from __future__ import annotations
 
+import array
+from typing import TextIO
+
 import rabbitizer
 
 from ... import common
 
+from ..InstructionSequence import InstructionSequence
 from . import SymbolText, analysis
 
 
 class SymbolFunction(SymbolText):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, instrsList: list[rabbitizer.Instruction], segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, instrsList: InstructionSequence|list[rabbitizer.Instruction], segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, list(), segmentVromStart, overlayCategory)
-        self.instructions = list(instrsList)
+        self.instructions: InstructionSequence = instrsList if isinstance(instrsList, InstructionSequence) else InstructionSequence.fromInstructions(instrsList)
 
-        self.instrAnalyzer = analysis.InstrAnalyzer(self.vram)
+        self.instrAnalyzer = analysis.InstrAnalyzer(self.vram, self.config)
 
         self.branchesTaken: set[int] = set()
 
@@ -28,6 +32,31 @@ class SymbolFunction(SymbolText):
         self.isRsp: bool = False
         self.isLikelyHandwritten: bool = False
 
+        self.instrsAnalyzed: bool = False
+        "Set once `analyzeInstructions` has been run or its result has been set with `setInstrAnalysis`"
+        self._instrAnalysis: analysis.InstrAnalysisResult|None = None
+        "Copy of the result of `analyzeInstructions`, since `analyze` modifies the analyzer while adding the symbols to the context"
+
+        self.memoizeImmOverrides: bool = False
+        """Set when this function is going to be rendered again, so the next render remembers the result of `getImmOverrideForInstruction`
+        for every instruction and the following one reuses them.
+
+        The memoized overrides are discarded by the first render done after this is unset.
+        """
+        self._immOverrides: dict[int, str] = dict()
+        """Memoized results of `getImmOverrideForInstruction` which are not `None`, key: instruction offset.
+
+        Cleared when the instructions change or the pointers are removed.
+        """
+        self._immOverridesComplete: bool = False
+        "Set once a whole render has been memoized, so a missing offset means the instruction has no override"
+        self._immOverridesVersion: int = 0
+        "Version of the instructions the memoized overrides were computed from"
+
+        self._controlFlowGraph: analysis.ControlFlowGraph|None = None
+        self._controlFlowGraphVersion: int = -1
+        "Version of the instructions the cached control flow graph was built from"
+
     @property
     def nInstr(self) -> int:
         return len(self.instructions)
@@ -37,7 +66,17 @@ class SymbolFunction(SymbolText):
         return self.nInstr
 
 
-    def _lookAheadSymbolFinder(self, instr: rabbitizer.Instruction, prevInstr: rabbitizer.Instruction, instructionOffset: int, trackedRegistersOriginal: rabbitizer.RegistersTracker):
+    def getControlFlowGraph(self) -> analysis.ControlFlowGraph:
+        """Returns the basic blocks of this function and the edges between them.
+
+        The graph is built the first time it is requested and is cached until an instruction of this function is blanked out or removed.
+        """
+        if self._controlFlowGraph is None or self._controlFlowGraphVersion != self.instructions.version:
+            self._controlFlowGraph = analysis.ControlFlowGraph(self.instructions.toList(), self.vram)
+            self._controlFlowGraphVersion = self.instructions.version
+        return self._controlFlowGraph
+
+    def _lookAheadSymbolFinder(self, instrsList: list[rabbitizer.Instruction], blockStates: analysis.BlockStates, instr: rabbitizer.Instruction, prevInstr: rabbitizer.Instruction, instructionOffset: int, trackedRegistersOriginal: rabbitizer.RegistersTracker):
         if not prevInstr.isBranch() and not prevInstr.isUnconditionalBranch():
             return
 
@@ -60,21 +99,29 @@ class SymbolFunction(SymbolText):
             return
         self.branchesTaken.add(instructionOffset)
 
-        sizew = len(self.instructions)*4
+        checkpoints = blockStates.checkpoints
+        walkStart = branch
+        sizew = len(instrsList)*4
         while branch < sizew:
-            prevTargetInstr = self.instructions[branch//4 - 1]
-            targetInstr = self.instructions[branch//4]
+            if branch in checkpoints and not blockStates.shouldVisit(branch, regsTracker):
+                # The rest of the walk would not change anything
+                break
+
+            prevTargetInstr = instrsList[branch//4 - 1]
+            targetInstr = instrsList[branch//4]
 
             self.instrAnalyzer.processInstr(regsTracker, targetInstr, branch, self.getVramOffset(branch), prevTargetInstr, self.context.got)
 
             if prevTargetInstr.isUnconditionalBranch():
-                return
+                break
             if prevTargetInstr.isJump() and not prevTargetInstr.doesLink():
-                return
+                break
 
             self.instrAnalyzer.processPrevFuncCall(regsTracker, targetInstr, prevTargetInstr)
             branch += 4
 
+        blockStates.addWalked(branch - walkStart)
+
     def _processElfRelocSymbols(self):
         if len(self.context.relocSymbols[common.FileSectionType.Text]) == 0:
             return
@@ -96,7 +143,7 @@ class SymbolFunction(SymbolText):
                                 common.Utils.eprint(f"Warning. Jumptable referenced in reloc does not have '.rodata' as its name")
                             contextOffsetSym = self.context.addOffsetJumpTable(addressOffset, sectType)
                             contextOffsetSym.referenceCounter += 1
-                            contextOffsetSym.referenceFunctions.add(self.contextSym)
+                            contextOffsetSym.addReferenceFunction(self.contextSym)
                             relocSymbol.name = contextOffsetSym.name
                             self.instrAnalyzer.symbolInstrOffset[instructionOffset] = 0
                             if instructionOffset in self.instrAnalyzer.lowToHiDict:
@@ -109,7 +156,7 @@ class SymbolFunction(SymbolText):
                             addressOffset = self.instrAnalyzer.symbolInstrOffset[instructionOffset]
                             relocName = f"{relocSymbol.name}_{addressOffset:06X}"
                             # print(relocName, addressOffset, instr)
-                            contextOffsetSym = common.ContextOffsetSymbol(addressOffset, relocName, sectType)
+                            contextOffsetSym = common.ContextOffsetSymbol(addressOffset, relocName, sectType, config=self.config)
                             self.context.offsetSymbols[sectType][addressOffset] = contextOffsetSym
                             relocSymbol.name = relocName
                             self.instrAnalyzer.symbolInstrOffset[instructionOffset] = 0
@@ -117,44 +164,93 @@ class SymbolFunction(SymbolText):
             instructionOffset += 4
 
 
-    def analyze(self):
-        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs:
-            offset = 0
-            for instr in self.instructions:
-                currentVram = self.getVramOffset(offset)
-                contextSym = self.getSymbol(currentVram, False)
-                if contextSym is not None:
-                    contextSym.isDefined = True
-                offset += 4
-            return
+    def analyzeInstructions(self) -> None:
+        """Runs the `InstrAnalyzer` over every instruction of this function.
 
+        This pass only depends on the instructions of this function and the global configuration, the symbols of the context are neither read
+        nor modified. `analyze` calls this method if it wasn't called already.
+        """
         regsTracker = rabbitizer.RegistersTracker()
+        self.instrsAnalyzed = True
+
+        # Indexing a list is faster than indexing the lazy sequence
+        instrsList = self.instructions.toList()
+        blockStates = analysis.BlockStates(self.instrAnalyzer, len(instrsList)*4, self.getControlFlowGraph)
 
         instructionOffset = 0
-        for instr in self.instructions:
+        for instr in instrsList:
             currentVram = self.getVramOffset(instructionOffset)
-            prevInstr = self.instructions[instructionOffset//4 - 1]
+            prevInstr = instrsList[instructionOffset//4 - 1]
 
             self.instrAnalyzer.printAnalisisDebugInfo_IterInfo(regsTracker, instr, currentVram)
 
             if not self.isLikelyHandwritten:
                 self.isLikelyHandwritten = instr.isLikelyHandwritten()
 
-            if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and not instr.isImplemented():
+            if not self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and not instr.isImplemented():
                 # Abort analysis
                 self.hasUnimplementedIntrs = True
+                self._finishInstrAnalysis()
                 return
 
             if not prevInstr.isBranchLikely() and not prevInstr.isUnconditionalBranch():
                 self.instrAnalyzer.processInstr(regsTracker, instr, instructionOffset, currentVram, prevInstr, self.context.got)
 
             # look-ahead symbol finder
-            self._lookAheadSymbolFinder(instr, prevInstr, instructionOffset, regsTracker)
+            self._lookAheadSymbolFinder(instrsList, blockStates, instr, prevInstr, instructionOffset, regsTracker)
 
             self.instrAnalyzer.processPrevFuncCall(regsTracker, instr, prevInstr, currentVram)
 
             instructionOffset += 4
 
+        self._finishInstrAnalysis()
+
+    def _finishInstrAnalysis(self) -> None:
+        # The changes log is only needed while analyzing, so it doesn't take memory for the rest of the run
+        self.instrAnalyzer.changesLog = list()
+        self._instrAnalysis = analysis.InstrAnalysisResult(self.instrAnalyzer.getResults(), set(self.branchesTaken), self.isLikelyHandwritten, self.hasUnimplementedIntrs)
+
+    def getInstrAnalysis(self) -> analysis.InstrAnalysisResult:
+        """Returns the result of `analyzeInstructions`, or the one set with `setInstrAnalysis`.
+
+        It is not affected by `analyze` adding the symbols to the context, so it can be set on another function with the same vram and
+        instructions.
+        """
+        assert self._instrAnalysis is not None
+        return self._instrAnalysis
+
+    def setInstrAnalysis(self, instrAnalysis: analysis.InstrAnalysisResult) -> None:
+        """Uses the result of running `analyzeInstructions` on a function with the same vram and instructions as this one, so `analyze` doesn't
+        need to run it again.
+
+        The passed result is not modified, `analyze` works on a copy of it.
+        """
+        self._instrAnalysis = instrAnalysis
+        self.instrAnalyzer = analysis.InstrAnalyzer(self.vram, self.config)
+        self.instrAnalyzer.setResults(instrAnalysis.analyzerResults, self.instructions)
+        self.branchesTaken = set(instrAnalysis.branchesTaken)
+        self.isLikelyHandwritten = instrAnalysis.isLikelyHandwritten
+        self.hasUnimplementedIntrs = instrAnalysis.hasUnimplementedIntrs
+        self.instrsAnalyzed = True
+
+    def analyze(self):
+        if not self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs and not self.instrsAnalyzed:
+            offset = 0
+            for instr in self.instructions:
+                currentVram = self.getVramOffset(offset)
+                contextSym = self.getSymbol(currentVram, False)
+                if contextSym is not None:
+                    contextSym.isDefined = True
+                offset += 4
+            return
+
+        if not self.instrsAnalyzed:
+            self.analyzeInstructions()
+
+        if not self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and self.hasUnimplementedIntrs:
+            # The analysis was aborted
+            return
+
         self.instrAnalyzer.printSymbolFinderDebugInfo_UnpairedLuis()
 
         self._processElfRelocSymbols()
@@ -164,13 +260,13 @@ class SymbolFunction(SymbolText):
             branch = self.instrAnalyzer.branchTargetInstrOffsets[instrOffset]
             labelSym = self.addBranchLabel(targetBranchVram, isAutogenerated=True, symbolVrom=self.getVromOffset(branch))
             labelSym.referenceCounter += 1
-            labelSym.referenceFunctions.add(self.contextSym)
+            labelSym.addReferenceFunction(self.contextSym)
 
         # Function calls
         for targetVram in self.instrAnalyzer.funcCallInstrOffsets.values():
             funcSym = self.addFunction(targetVram, isAutogenerated=True)
             funcSym.referenceCounter += 1
-            funcSym.referenceFunctions.add(self.contextSym)
+            funcSym.addReferenceFunction(self.contextSym)
 
         if not self.isRsp and len(self.instrAnalyzer.funcCallOutsideRangesOffsets) > 0:
             self.isLikelyHandwritten = True
@@ -188,7 +284,7 @@ class SymbolFunction(SymbolText):
             symType = self.instrAnalyzer.possibleSymbolTypes.get(symVram, None)
             contextSym = self.getSymbol(symVram)
             if contextSym is None:
-                if not common.GlobalConfig.ADD_NEW_SYMBOLS:
+                if not self.config.ADD_NEW_SYMBOLS:
                     continue
                 contextSym = self.addSymbol(symVram, isAutogenerated=True)
             else:
@@ -198,13 +294,13 @@ class SymbolFunction(SymbolText):
                         if contextSym.getType() in {"u16", "s16", "u8", "u8"} or symType in {"u16", "s16", "u8", "u8"}:
                             if not (contextSym.getSize() > 4):
                                 if contextSym.size is None or symVram >= contextSym.address + contextSym.size:
-                                    if common.GlobalConfig.ADD_NEW_SYMBOLS:
+                                    if self.config.ADD_NEW_SYMBOLS:
                                         if symType is not None:
                                             contextSym.setTypeIfUnset(symType)
                                         contextSym = self.addSymbol(symVram, isAutogenerated=True)
 
             contextSym.referenceCounter += 1
-            contextSym.referenceFunctions.add(self.contextSym)
+            contextSym.addReferenceFunction(self.contextSym)
             if symType is not None:
                 contextSym.setTypeIfUnset(symType)
 
@@ -224,15 +320,14 @@ class SymbolFunction(SymbolText):
                 contextSym = self.getSymbol(gpSymbolAddress, tryPlusOffset=False)
                 if contextSym is not None:
                     contextSym.isGot = True
-            elif common.GlobalConfig.GP_VALUE is not None:
+            elif self.config.GP_VALUE is not None:
                 gpLoadInstr = self.instrAnalyzer.gpLoads[gpLoadOffset]
-                gpSymbolAddress = common.GlobalConfig.GP_VALUE + gpLoadInstr.getProcessedImmediate()
+                gpSymbolAddress = self.config.GP_VALUE + gpLoadInstr.getProcessedImmediate()
                 self.instrAnalyzer.symbolInstrOffset[gpLoadOffset] = gpSymbolAddress
                 self.addSymbol(gpSymbolAddress, isAutogenerated=True)
 
         if self.isLikelyHandwritten:
-            for instr in self.instructions:
-                instr.inHandwrittenFunction = self.isLikelyHandwritten
+            self.instructions.setInHandwrittenFunction(self.isLikelyHandwritten)
 
 
     def countExtraPadding(self) -> int:
@@ -268,7 +363,7 @@ class SymbolFunction(SymbolText):
         return result
 
     def blankOutDifferences(self, other_func: SymbolFunction) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
@@ -277,20 +372,20 @@ class SymbolFunction(SymbolText):
             instr1 = self.instructions[i]
             instr2 = other_func.instructions[i]
             if instr1.sameOpcodeButDifferentArguments(instr2):
-                instr1.blankOut()
-                instr2.blankOut()
+                self.instructions.blankOut(i)
+                other_func.instructions.blankOut(i)
                 was_updated = True
 
         return was_updated
 
     def removePointers(self) -> bool:
-        if not common.GlobalConfig.REMOVE_POINTERS:
+        if not self.config.REMOVE_POINTERS:
             return False
 
         was_updated = False
 
         for instructionOffset in self.instrAnalyzer.symbolInstrOffset:
-            self.instructions[instructionOffset//4].blankOut()
+            self.instructions.blankOut(instructionOffset//4)
         was_updated = len(self.instrAnalyzer.symbolInstrOffset) > 0 or was_updated
 
         for fileOffset in self.pointersOffsets:
@@ -299,14 +394,15 @@ class SymbolFunction(SymbolText):
                 continue
             if index >= self.nInstr:
                 continue
-            self.instructions[index].blankOut()
+            self.instructions.blankOut(index)
 
-        if common.GlobalConfig.IGNORE_BRANCHES:
+        if self.config.IGNORE_BRANCHES:
             for instructionOffset in self.instrAnalyzer.branchInstrOffsets:
-                self.instructions[instructionOffset//4].blankOut()
+                self.instructions.blankOut(instructionOffset//4)
             was_updated = len(self.instrAnalyzer.branchInstrOffsets) > 0 or was_updated
 
         self.pointersRemoved = True
+        self._clearImmOverrides()
 
         return was_updated
 
@@ -324,7 +420,7 @@ class SymbolFunction(SymbolText):
 
         if first_nop < self.nInstr:
             was_updated = True
-            del self.instructions[first_nop:]
+            self.instructions.truncate(first_nop)
         return was_updated
 
 
@@ -333,13 +429,13 @@ class SymbolFunction(SymbolText):
             return f"%hi({symName})"
 
         if instr.rs in {rabbitizer.RegGprO32.gp, rabbitizer.RegGprN32.gp}:
-            if common.GlobalConfig.PIC:
+            if self.config.PIC:
                 if symbol is not None:
                     if symbol.isGotGlobal and symbol.type == common.SymbolSpecialType.function:
                         return f"%call16({symName})"
                     elif symbol.isGot:
                         return f"%got({symName})"
-            if not common.GlobalConfig.PIC:
+            if not self.config.PIC:
                 return f"%gp_rel({symName})"
 
         return f"%lo({symName})"
@@ -388,7 +484,7 @@ class SymbolFunction(SymbolText):
                 return auxOverride
 
         if instr.isBranch() or instr.isUnconditionalBranch():
-            if not common.GlobalConfig.IGNORE_BRANCHES:
+            if not self.config.IGNORE_BRANCHES:
                 branchOffset = instr.getGenericBranchOffset(self.getVramOffset(instructionOffset))
                 targetBranchVram = self.getVramOffset(instructionOffset + branchOffset)
                 labelSymbol = self.getSymbol(targetBranchVram, tryPlusOffset=False)
@@ -438,7 +534,7 @@ class SymbolFunction(SymbolText):
                 if generatedStr is not None:
                     return generatedStr
 
-                if common.GlobalConfig.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_HILO:
+                if self.config.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_HILO:
                     return self.generateHiLoStr(instr, f"0x{constant:X}", None)
 
             if instr.canBeHi():
@@ -452,19 +548,17 @@ class SymbolFunction(SymbolText):
 
         return None
 
-    def getLabelForOffset(self, instructionOffset: int) -> str:
-        if common.GlobalConfig.IGNORE_BRANCHES or instructionOffset == 0:
-            # Skip over this function to avoid duplication
-            return ""
-
+    def _getLabelSymbolForOffset(self, instructionOffset: int) -> common.ContextSymbol|None:
         currentVram = self.getVramOffset(instructionOffset)
         labelSym = self.getSymbol(currentVram, tryPlusOffset=False)
         if labelSym is None and len(self.context.offsetJumpTablesLabels) > 0:
             labelSym = self.context.getOffsetGenericLabel(self.inFileOffset+instructionOffset, common.FileSectionType.Text)
         if labelSym is None and len(self.context.offsetSymbols[self.sectionType]) > 0:
             labelSym = self.context.getOffsetSymbol(self.inFileOffset+instructionOffset, common.FileSectionType.Text)
+        return labelSym
 
-        if labelSym is None or labelSym.overlayCategory != self.overlayCategory:
+    def _generateLabel(self, labelSym: common.ContextSymbol) -> str:
+        if labelSym.overlayCategory != self.overlayCategory:
             return ""
 
         labelSym.isDefined = True
@@ -472,48 +566,107 @@ class SymbolFunction(SymbolText):
         if labelSym.type == common.SymbolSpecialType.function or labelSym.type == common.SymbolSpecialType.jumptablelabel:
             label = labelSym.getSymbolLabel()
             if label:
-                label += common.GlobalConfig.LINE_ENDS
-            if common.GlobalConfig.ASM_TEXT_FUNC_AS_LABEL:
-                label += f"{labelSym.getName()}:{common.GlobalConfig.LINE_ENDS}"
+                label += self.config.LINE_ENDS
+            if self.config.ASM_TEXT_FUNC_AS_LABEL:
+                label += f"{labelSym.getName()}:{self.config.LINE_ENDS}"
             return label
-        return labelSym.getName() + ":" + common.GlobalConfig.LINE_ENDS
+        return labelSym.getName() + ":" + self.config.LINE_ENDS
+
+    def getLabelForOffset(self, instructionOffset: int) -> str:
+        if self.config.IGNORE_BRANCHES or instructionOffset == 0:
+            # Skip over this function to avoid duplication
+            return ""
+
+        labelSym = self._getLabelSymbolForOffset(instructionOffset)
+        if labelSym is None:
+            return ""
+        return self._generateLabel(labelSym)
+
+    def getLabelsTable(self) -> list[tuple[int, common.ContextSymbol]]:
+        """Returns the offset and symbol of every instruction of this function which `getLabelForOffset` would find a symbol for, sorted by
+        offset.
+
+        Only the symbols which are inside this function are looked up, instead of looking up every instruction.
+        """
+        if self.config.IGNORE_BRANCHES:
+            return []
+
+        vramStart = self.getVramOffset(4)
+        vramEnd = self.getVramOffset(self.sizew*4)
+        candidates = {vram - self.vram for vram in self.getSymbolsVramsInRange(vramStart, vramEnd)}
+
+        fileStart = self.inFileOffset + 4
+        fileEnd = self.inFileOffset + self.sizew*4
+        for offsetSymbols in (self.context.offsetJumpTablesLabels, self.context.offsetSymbols[self.sectionType]):
+            if len(offsetSymbols) < self.sizew:
+                candidates.update(offset - self.inFileOffset for offset in offsetSymbols if fileStart <= offset < fileEnd)
+            else:
+                candidates.update(offset - self.inFileOffset for offset in range(fileStart, fileEnd, 4) if offset in offsetSymbols)
+
+        labels: list[tuple[int, common.ContextSymbol]] = list()
+        for instructionOffset in sorted(candidates):
+            if instructionOffset % 4 != 0:
+                continue
+            labelSym = self._getLabelSymbolForOffset(instructionOffset)
+            if labelSym is not None:
+                labels.append((instructionOffset, labelSym))
+        return labels
 
 
-    def disassemble(self) -> str:
-        output = ""
+    def _clearImmOverrides(self) -> None:
+        self._immOverrides = dict()
+        self._immOverridesComplete = False
 
-        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS:
+    def disassembleToStream(self, f: TextIO) -> None:
+        if not self.config.DISASSEMBLE_UNKNOWN_INSTRUCTIONS:
             if self.hasUnimplementedIntrs:
-                return self.disassembleAsData()
+                self.disassembleAsDataToStream(f)
+                return
 
         if self.isLikelyHandwritten:
             if not self.isRsp:
                 # RSP functions are always handwritten, so this is redundant
-                output += "# Handwritten function" + common.GlobalConfig.LINE_ENDS
+                f.write("# Handwritten function" + self.config.LINE_ENDS)
 
-        output += self.getLabel()
+        f.write(self.getLabel())
 
-        if common.GlobalConfig.ASM_TEXT_ENT_LABEL:
-            output += f"{common.GlobalConfig.ASM_TEXT_ENT_LABEL} {self.getName()}" + common.GlobalConfig.LINE_ENDS
+        if self.config.ASM_TEXT_ENT_LABEL:
+            f.write(f"{self.config.ASM_TEXT_ENT_LABEL} {self.getName()}" + self.config.LINE_ENDS)
 
-        if common.GlobalConfig.ASM_TEXT_FUNC_AS_LABEL:
-            output += f"{self.getName()}:" + common.GlobalConfig.LINE_ENDS
+        if self.config.ASM_TEXT_FUNC_AS_LABEL:
+            f.write(f"{self.getName()}:" + self.config.LINE_ENDS)
+
+        labels = self.getLabelsTable()
+        labelIndex = 0
+
+        if self._immOverridesVersion != self.instructions.version:
+            self._clearImmOverrides()
+            self._immOverridesVersion = self.instructions.version
+        immOverrides = self._immOverrides
+        useMemoizedOverrides = self._immOverridesComplete
+        memoizeOverrides = self.memoizeImmOverrides and not useMemoizedOverrides
 
         wasLastInstABranch = False
         instructionOffset = 0
         for instr in self.instructions:
-            label = self.getLabelForOffset(instructionOffset)
-            output += label
+            if labelIndex < len(labels) and labels[labelIndex][0] == instructionOffset:
+                f.write(self._generateLabel(labels[labelIndex][1]))
+                labelIndex += 1
 
             cpload = self.instrAnalyzer.cploads.get(instructionOffset)
             if cpload is not None:
                 assert cpload.reg is not None
-                output += f".set noreorder; .cpload ${cpload.reg.name}; # .set reorder" + common.GlobalConfig.LINE_ENDS
+                f.write(f".set noreorder; .cpload ${cpload.reg.name}; # .set reorder" + self.config.LINE_ENDS)
             elif instructionOffset in self.instrAnalyzer.cploadOffsets:
                 # don't emit the other instructions which are part of .cpload
                 pass
             else:
-                immOverride = self.getImmOverrideForInstruction(instr, instructionOffset)
+                if useMemoizedOverrides:
+                    immOverride = immOverrides.get(instructionOffset)
+                else:
+                    immOverride = self.getImmOverrideForInstruction(instr, instructionOffset)
+                    if memoizeOverrides and immOverride is not None:
+                        immOverrides[instructionOffset] = immOverride
                 comment = self.generateAsmLineComment(instructionOffset, instr.getRaw())
                 extraLJust = 0
 
@@ -523,16 +676,22 @@ class SymbolFunction(SymbolText):
 
                 line = instr.disassemble(immOverride, extraLJust=extraLJust)
 
-                output += f"{comment}  {line}" + common.GlobalConfig.LINE_ENDS
+                f.write(f"{comment}  {line}" + self.config.LINE_ENDS)
 
             wasLastInstABranch = instr.hasDelaySlot()
             instructionOffset += 4
 
-        if common.GlobalConfig.ASM_TEXT_END_LABEL:
-            output += f"{common.GlobalConfig.ASM_TEXT_END_LABEL} {self.getName()}" + common.GlobalConfig.LINE_ENDS
+        if self.config.ASM_TEXT_END_LABEL:
+            f.write(f"{self.config.ASM_TEXT_END_LABEL} {self.getName()}" + self.config.LINE_ENDS)
+
+        if memoizeOverrides:
+            self._immOverridesComplete = True
+        elif not self.memoizeImmOverrides:
+            # No other render needs them
+            self._clearImmOverrides()
 
-        return output
+        self.instructions.releaseCache()
 
-    def disassembleAsData(self) -> str:
-        self.words = [instr.getRaw() for instr in self.instructions]
-        return super().disassembleAsData()
+    def disassembleAsDataToStream(self, f: TextIO) -> None:
+        self.words = array.array("I", [self.instructions.getRaw(i) for i in range(self.nInstr)])
+        super().disassembleAsDataToStream(f)
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import array
 import rabbitizer
 
 from ... import common
@@ -13,12 +14,17 @@ from . import SymbolBase
 
 
 class SymbolRodata(SymbolBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int], segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int]|array.array[int], segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, words, common.FileSectionType.Rodata, segmentVromStart, overlayCategory)
 
         self.stringEncoding: str = "EUC-JP"
         self._failedStringDecoding: bool = False
 
+        self.decodedStrings: dict[tuple[bytes, str], list[str]|None]|None = None
+        "Cache of decoded strings, shared with the section this symbol belongs to"
+        self._bytes: bytearray|None = None
+        "The words of this symbol as bytes, built the first time a string is rendered"
+
 
     def isString(self) -> bool:
         return self.contextSym.isString() and not self._failedStringDecoding
@@ -57,7 +63,7 @@ class SymbolRodata(SymbolBase):
             return True
 
         # This symbol could be an unreferenced non-const variable
-        if self.contextSym.referenceCounter == 1 or (len(self.contextSym.referenceFunctions) == 1 and common.GlobalConfig.COMPILER != common.Compiler.IDO):
+        if self.contextSym.referenceCounter == 1 or (self.contextSym.getReferenceFunctionsCount() == 1 and self.config.COMPILER != common.Compiler.IDO):
             # This const variable was already used in a function
             return False
 
@@ -65,7 +71,7 @@ class SymbolRodata(SymbolBase):
 
 
     def renameBasedOnType(self):
-        if not common.GlobalConfig.AUTOGENERATED_NAMES_BASED_ON_DATA_TYPE:
+        if not self.config.AUTOGENERATED_NAMES_BASED_ON_DATA_TYPE:
             return
 
         if not self.contextSym.isAutogenerated:
@@ -118,33 +124,33 @@ class SymbolRodata(SymbolBase):
 
     def getPrevAlignDirective(self, i: int=0) -> str:
         commentPaddingNum = 22
-        if not common.GlobalConfig.ASM_COMMENT:
+        if not self.config.ASM_COMMENT:
             commentPaddingNum = 1
 
         alignDirective = ""
 
         if self.isDouble(i):
-            if common.GlobalConfig.COMPILER == common.Compiler.SN64:
+            if self.config.COMPILER == common.Compiler.SN64:
                 alignDirective += commentPaddingNum * " "
                 alignDirective += ".align 3"
-                alignDirective += common.GlobalConfig.LINE_ENDS
+                alignDirective += self.config.LINE_ENDS
 
         return alignDirective
 
     def getPostAlignDirective(self, i: int=0) -> str:
         commentPaddingNum = 22
-        if not common.GlobalConfig.ASM_COMMENT:
+        if not self.config.ASM_COMMENT:
             commentPaddingNum = 1
 
         alignDirective = ""
 
         if self.isString():
             alignDirective += commentPaddingNum * " "
-            if common.GlobalConfig.COMPILER == common.Compiler.SN64:
+            if self.config.COMPILER == common.Compiler.SN64:
                 alignDirective += ".align 2"
             else:
                 alignDirective += ".balign 4"
-            alignDirective += common.GlobalConfig.LINE_ENDS
+            alignDirective += self.config.LINE_ENDS
 
         return alignDirective
 
@@ -164,9 +170,9 @@ class SymbolRodata(SymbolBase):
         if possibleSymbolName is not None:
             labelName = possibleSymbolName.getSymbolLabel()
             if labelName:
-                label = labelName + common.GlobalConfig.LINE_ENDS
-                if common.GlobalConfig.ASM_DATA_SYM_AS_LABEL:
-                    label += f"{possibleSymbolName.getName()}:" + common.GlobalConfig.LINE_ENDS
+                label = labelName + self.config.LINE_ENDS
+                if self.config.ASM_DATA_SYM_AS_LABEL:
+                    label += f"{possibleSymbolName.getName()}:" + self.config.LINE_ENDS
 
         if len(self.context.relocSymbols[self.sectionType]) > 0:
             possibleReference = self.context.getRelocSymbol(self.inFileOffset + localOffset, self.sectionType)
@@ -192,8 +198,8 @@ class SymbolRodata(SymbolBase):
             rodataWord = doubleWord
             skip = 1
         else:
-            if self.contextSym.isJumpTable() and self.contextSym.isGot and common.GlobalConfig.GP_VALUE is not None:
-                labelAddr = common.GlobalConfig.GP_VALUE + rabbitizer.Utils.from2Complement(w, 32)
+            if self.contextSym.isJumpTable() and self.contextSym.isGot and self.config.GP_VALUE is not None:
+                labelAddr = self.config.GP_VALUE + rabbitizer.Utils.from2Complement(w, 32)
                 labelSym = self.getSymbol(labelAddr, tryPlusOffset=False)
             else:
                 labelSym = self.getSymbol(w, tryPlusOffset=False)
@@ -201,24 +207,25 @@ class SymbolRodata(SymbolBase):
                 value = labelSym.getName()
             elif self.isString():
                 try:
-                    buffer = bytearray(4*len(self.words))
-                    common.Utils.wordsToBytes(self.words, buffer)
-                    decodedStrings, rawStringSize = common.Utils.decodeString(buffer, 4*i, self.stringEncoding)
+                    if self._bytes is None:
+                        self._bytes = bytearray(4*len(self.words))
+                        common.Utils.endianessWordsToBytes(self.config.ENDIAN, self.words, self._bytes)
+                    decodedStrings, rawStringSize = common.Utils.decodeString(self._bytes, 4*i, self.stringEncoding, self.decodedStrings)
 
                     skip = rawStringSize // 4
                     comment = self.generateAsmLineComment(localOffset)
                     result = f"{label}{comment} "
 
                     commentPaddingNum = 22
-                    if not common.GlobalConfig.ASM_COMMENT:
+                    if not self.config.ASM_COMMENT:
                         commentPaddingNum = 1
 
                     if rawStringSize == 0:
                         decodedStrings.append("")
                     for decodedValue in decodedStrings[:-1]:
                         result += f'.ascii "{decodedValue}"'
-                        result += common.GlobalConfig.LINE_ENDS + (commentPaddingNum * " ")
-                    result += f'.asciz "{decodedStrings[-1]}"{common.GlobalConfig.LINE_ENDS}'
+                        result += self.config.LINE_ENDS + (commentPaddingNum * " ")
+                    result += f'.asciz "{decodedStrings[-1]}"{self.config.LINE_ENDS}'
 
                     return result, skip
                 except (UnicodeDecodeError, RuntimeError):
@@ -226,4 +233,4 @@ class SymbolRodata(SymbolBase):
                     self._failedStringDecoding = True
 
         comment = self.generateAsmLineComment(localOffset, rodataWord)
-        return f"{label}{comment} {dotType} {value}{common.GlobalConfig.LINE_ENDS}", skip
+        return f"{label}{comment} {dotType} {value}{self.config.LINE_ENDS}", skip
@@ -5,11 +5,13 @@
 
 from __future__ import annotations
 
+import array
+
 from ... import common
 
 from . import SymbolBase
 
 
 class SymbolText(SymbolBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int], segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int]|array.array[int], segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, words, common.FileSectionType.Text, segmentVromStart, overlayCategory)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import array
+import bisect
+import operator
+from typing import Callable
+
+import rabbitizer
+
+from .InstrAnalyzer import InstrAnalyzer
+
+
+def isTerminator(instr: rabbitizer.Instruction) -> bool:
+    "Returns `True` if the basic block of `instr` ends after the delay slot of `instr`"
+    return instr.isBranch() or instr.isUnconditionalBranch() or (instr.isJump() and not instr.doesLink())
+
+def fallsThrough(instr: rabbitizer.Instruction) -> bool:
+    "Returns `True` if the execution may continue after the delay slot of `instr`"
+    return not instr.isUnconditionalBranch() and not (instr.isJump() and not instr.doesLink())
+
+
+class ControlFlowGraph:
+    """The basic blocks of a function and the edges between them.
+
+    A block is entered only through its first instruction and is left only after its last one. Blocks end after the delay slot of every
+    branch and of every jump which doesn't link, and before every branch target. Function calls don't end blocks.
+
+    Every offset is the offset of an instruction relative to the start of the function, in bytes. The blocks are stored in parallel arrays
+    indexed by block index, sorted by offset. The edges are stored in a compressed form: the successors of the block `i` are
+    `successors[successorsStart[i]:successorsStart[i+1]]`, and the same applies to its predecessors. Jumps to registers have no successors.
+    """
+
+    def __init__(self, instrsList: list[rabbitizer.Instruction], funcVram: int):
+        sizew = len(instrsList) * 4
+
+        boundaries: set[int] = {0}
+        # key: offset of the delay slot of a branch, value: offset of its target
+        branchTargets: dict[int, int] = dict()
+        for index, instr in enumerate(instrsList):
+            # Checking for a delay slot first is faster, since most instructions don't have one
+            if not instr.hasDelaySlot() or not isTerminator(instr):
+                continue
+            offset = index * 4
+            boundaries.add(offset + 8)
+            if instr.isBranch() or instr.isUnconditionalBranch():
+                target = offset + instr.getGenericBranchOffset(funcVram + offset)
+                if 0 <= target < sizew:
+                    boundaries.add(target)
+                    branchTargets[offset + 4] = target
+
+        self.instructionsCount: int = len(instrsList)
+
+        self.blockStarts: array.array[int] = array.array("I", sorted(offset for offset in boundaries if offset < sizew))
+        "Offset of the first instruction of each block"
+        self.blockEnds: array.array[int] = array.array("I", self.blockStarts[1:])
+        "Offset just after the last instruction of each block"
+        if len(instrsList) > 0:
+            self.blockEnds.append(sizew)
+
+        self._blockIndexByStart: dict[int, int] = {start: blockIndex for blockIndex, start in enumerate(self.blockStarts)}
+
+        self.branchTargets: bytearray = bytearray(len(self.blockStarts))
+        "Non-zero for each block which is the target of a branch"
+        for target in branchTargets.values():
+            self.branchTargets[self._blockIndexByStart[target]] = 1
+
+        successorsLists: list[list[int]] = list()
+        predecessorsLists: list[list[int]] = [list() for _ in self.blockStarts]
+        for blockIndex, end in enumerate(self.blockEnds):
+            blockSuccessors: list[int] = list()
+            lastOffset = end - 4
+            if lastOffset >= 4 and isTerminator(instrsList[lastOffset//4 - 1]):
+                # The block ends with the delay slot of a branch or jump, which may be on the previous block if the delay slot is a branch target
+                if fallsThrough(instrsList[lastOffset//4 - 1]) and blockIndex + 1 < len(self.blockStarts):
+                    blockSuccessors.append(blockIndex + 1)
+                branchTarget = branchTargets.get(lastOffset)
+                if branchTarget is not None:
+                    targetIndex = self._blockIndexByStart[branchTarget]
+                    if targetIndex not in blockSuccessors:
+                        blockSuccessors.append(targetIndex)
+            elif blockIndex + 1 < len(self.blockStarts):
+                blockSuccessors.append(blockIndex + 1)
+
+            successorsLists.append(blockSuccessors)
+            for successor in blockSuccessors:
+                predecessorsLists[successor].append(blockIndex)
+
+        self.chainEnds: array.array[int] = array.array("I", self.blockEnds)
+        "Offset just after the last instruction which can be reached from each block without taking a branch"
+        for blockIndex in range(len(self.blockStarts) - 2, -1, -1):
+            if blockIndex + 1 in successorsLists[blockIndex]:
+                self.chainEnds[blockIndex] = self.chainEnds[blockIndex + 1]
+
+        self.successorsStart: array.array[int] = array.array("I", [0])
+        self.successors: array.array[int] = array.array("I")
+        for blockSuccessors in successorsLists:
+            self.successors.extend(blockSuccessors)
+            self.successorsStart.append(len(self.successors))
+
+        self.predecessorsStart: array.array[int] = array.array("I", [0])
+        self.predecessors: array.array[int] = array.array("I")
+        for blockPredecessors in predecessorsLists:
+            self.predecessors.extend(blockPredecessors)
+            self.predecessorsStart.append(len(self.predecessors))
+
+
+    @property
+    def blocksCount(self) -> int:
+        return len(self.blockStarts)
+
+    def getBlockIndex(self, offset: int) -> int:
+        "Returns the index of the block which contains the instruction at `offset`"
+        if offset < 0 or offset >= self.instructionsCount * 4:
+            raise IndexError(f"offset 0x{offset:X} is outside of the function")
+        return bisect.bisect_right(self.blockStarts, offset) - 1
+
+    def getBlockIndexStartingAt(self, offset: int) -> int|None:
+        "Returns the index of the block which starts at `offset`, or `None` if no block starts there"
+        return self._blockIndexByStart.get(offset)
+
+    def getSuccessors(self, blockIndex: int) -> array.array[int]:
+        return self.successors[self.successorsStart[blockIndex]:self.successorsStart[blockIndex+1]]
+
+    def getPredecessors(self, blockIndex: int) -> array.array[int]:
+        return self.predecessors[self.predecessorsStart[blockIndex]:self.predecessorsStart[blockIndex+1]]
+
+
+_getTrackedRegisterState = operator.attrgetter(
+    "hasLuiValue", "luiOffset", "luiSetOnBranchLikely",
+    "hasGpGot", "gpGotOffset",
+    "hasLoValue", "loOffset", "dereferenced", "dereferenceOffset",
+    "checkedForBranching", "lastBranchOffset",
+    "value",
+)
+"Every field of a `rabbitizer.TrackedRegisterState` except for its register number"
+
+_TrackedRegisterOffsetFields: tuple[int, ...] = (1, 4, 6, 8, 10)
+"Position of the fields which hold an instruction offset on the tuples returned by `_getTrackedRegisterState`"
+
+
+class BlockStates:
+    """Remembers which registers states have entered each basic block while looking ahead the branches of a function.
+
+    Walking a block again with the same registers state repeats exactly what the previous walk from that block did, unless some of the results
+    of the `InstrAnalyzer` which that walk may have read or replaced were changed since. In that case the walk can't change anything so it can
+    be stopped, which makes each block to be walked once per distinct incoming state instead of once per branch which reaches it.
+    """
+
+    MinimumSkippedLength: int = 32
+    "Blocks which can't lead to walking at least this amount of instructions are not checked, since comparing the states costs more"
+    WalkedFunctionsBeforeChecking: int = 4
+    "The blocks are checked only after the walks have processed this many times the instructions of the function"
+
+    def __init__(self, instrAnalyzer: InstrAnalyzer, functionSize: int, getControlFlowGraph: Callable[[], ControlFlowGraph]):
+        self.instrAnalyzer: InstrAnalyzer = instrAnalyzer
+
+        self.checkpoints: set[int] = set()
+        """Offsets of the start of the blocks which are checked.
+
+        Walks only meet on branch targets, so there's no need to check the other blocks. Empty until the walks are long enough to be worth
+        checking, since most functions are walked only a few times.
+        """
+
+        self._functionSize = functionSize
+        self._getControlFlowGraph: Callable[[], ControlFlowGraph]|None = getControlFlowGraph
+        "Cleared once the checkpoints are set"
+        self._walkedSize: int = 0
+        "Amount of bytes walked before the checks started"
+
+        self._states: dict[int, dict[tuple, int]|None] = dict()
+        """For each checked block, by offset, the length of the changes log of the analyzer the last time the block was entered with each state.
+
+        The states are not recorded the first time a block is entered, since most blocks are entered only once.
+        """
+        self._registerStates: dict[tuple, tuple] = dict()
+        "Used to share the same tuple between equal register states, since most of them are equal"
+
+    def addWalked(self, walkedSize: int) -> None:
+        """Starts checking the blocks once the walks have processed enough instructions to be worth building the control flow graph.
+
+        Not checking the first walks is always safe, since it only means some blocks will be walked again.
+        """
+        if self._getControlFlowGraph is None:
+            return
+        self._walkedSize += walkedSize
+        if self._walkedSize < self._functionSize * self.WalkedFunctionsBeforeChecking:
+            return
+
+        cfg = self._getControlFlowGraph()
+        self._getControlFlowGraph = None
+        for blockIndex, blockStart in enumerate(cfg.blockStarts):
+            if cfg.branchTargets[blockIndex] and cfg.chainEnds[blockIndex] - blockStart >= self.MinimumSkippedLength * 4:
+                self.checkpoints.add(blockStart)
+
+    def _getState(self, regsTracker: rabbitizer.RegistersTracker) -> tuple:
+        registerStates = self._registerStates
+        state: list[tuple] = list()
+        # The type stubs of rabbitizer don't declare the indexing of the tracker
+        getRegisterState = getattr(regsTracker, "__getitem__")
+        for registerState in map(_getTrackedRegisterState, map(getRegisterState, range(32))):
+            state.append(registerStates.setdefault(registerState, registerState))
+        return tuple(state)
+
+    def shouldVisit(self, blockStart: int, regsTracker: rabbitizer.RegistersTracker) -> bool:
+        "Returns `False` if walking from the checked block starting at `blockStart` with the registers of `regsTracker` can't change any result of the analyzer"
+        if blockStart not in self._states:
+            self._states[blockStart] = None
+            return True
+
+        state = self._getState(regsTracker)
+        changesLog = self.instrAnalyzer.changesLog
+        blockStates = self._states[blockStart]
+        if blockStates is None:
+            blockStates = dict()
+            self._states[blockStart] = blockStates
+        lastVisit = blockStates.get(state)
+        blockStates[state] = len(changesLog)
+        if lastVisit is None:
+            return True
+
+        # A walk from this block only reads and changes the results of the instructions it walks, the ones after the start of the block,
+        # and the results of the instructions which set the registers it starts with
+        changes = changesLog[lastVisit:]
+        if len(changes) == 0:
+            return False
+        if max(changes) >= blockStart or min(changes) < 0:
+            return True
+        stateOffsets = {registerState[field] for registerState in state for field in _TrackedRegisterOffsetFields}
+        return not stateOffsets.isdisjoint(changes)
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import dataclasses
 import rabbitizer
+from typing import Any, Sequence
 
 from .... import common
 
@@ -19,9 +20,16 @@ class CploadInfo:
     reg: rabbitizer.Enum|None = None
 
 class InstrAnalyzer:
-    def __init__(self, funcVram: int) -> None:
+    InstructionsResults: set[str] = {"luiInstrs", "gpLoads"}
+    "Results which reference the analyzed instructions, `getResults` only keeps their offsets"
+    NonResults: set[str] = {"funcVram", "config", "changesLog"}
+    "Attributes which are not part of the results gathered by the analyzer"
+
+    def __init__(self, funcVram: int, config: common.DisasmConfig|None=None) -> None:
         self.funcVram = funcVram
 
+        self.config: common.DisasmConfig = config if config is not None else common.GlobalConfig
+
         self.referencedVrams: set[int] = set()
         "Every referenced vram found"
         self.referencedConstants: set[int] = set()
@@ -87,6 +95,45 @@ class InstrAnalyzer:
         self.cploads: dict[int, CploadInfo] = dict()
         "Completed cpload, key: offset of last instruction of the cpload"
 
+        self.changesLog: list[int] = list()
+        """Instruction offset of every change to a result which may be read or replaced while processing other instructions, or -1 if the change
+        is not tied to an offset.
+
+        Results which are only ever added and never read back are not logged. This allows to know when processing again some instructions
+        with the same registers state can't change anything.
+
+        Only used while `SymbolFunction.analyzeInstructions` runs, it is emptied once it finishes.
+        """
+
+
+    def getResults(self) -> dict[str, Any]:
+        """Returns copies of the results gathered so far which are not empty, keyed by the name of the attribute.
+
+        The results which reference instructions are returned as a list of the offsets of those instructions, so the returned value doesn't
+        reference any instruction nor the configuration, allowing it to be pickled cheaply. The changes log is not included.
+        """
+        results: dict[str, Any] = dict()
+        for name, value in vars(self).items():
+            if name in self.NonResults or len(value) == 0:
+                continue
+            if name in self.InstructionsResults:
+                results[name] = list(value.keys())
+            else:
+                results[name] = value.copy()
+        return results
+
+    def setResults(self, results: dict[str, Any], instructions: Sequence[rabbitizer.Instruction]) -> None:
+        "Sets copies of the results returned by `getResults`. `instructions` are the analyzed instructions"
+        for name, value in results.items():
+            if name in self.InstructionsResults:
+                setattr(self, name, {offset: instructions[offset//4] for offset in value})
+            else:
+                setattr(self, name, value.copy())
+
+    def _setResult(self, results: dict[int, int], key: int, value: int) -> None:
+        if results.get(key) != value:
+            results[key] = value
+            self.changesLog.append(key)
 
     def processBranch(self, instr: rabbitizer.Instruction, instrOffset: int, currentVram: int) -> None:
         if instrOffset in self.branchInstrOffsets:
@@ -125,13 +172,13 @@ class InstrAnalyzer:
 
         self.referencedConstants.add(constant)
 
-        self.constantHiInstrOffset[luiOffset] = constant
-        self.constantLoInstrOffset[lowerOffset] = constant
-        self.constantInstrOffset[luiOffset] = constant
-        self.constantInstrOffset[lowerOffset] = constant
+        self._setResult(self.constantHiInstrOffset, luiOffset, constant)
+        self._setResult(self.constantLoInstrOffset, lowerOffset, constant)
+        self._setResult(self.constantInstrOffset, luiOffset, constant)
+        self._setResult(self.constantInstrOffset, lowerOffset, constant)
 
-        self.hiToLowDict[luiOffset] = lowerOffset
-        self.lowToHiDict[lowerOffset] = luiOffset
+        self._setResult(self.hiToLowDict, luiOffset, lowerOffset)
+        self._setResult(self.lowToHiDict, lowerOffset, luiOffset)
 
         regsTracker.processConstant(lowerInstr, constant, lowerOffset)
 
@@ -156,11 +203,11 @@ class InstrAnalyzer:
                         if hiValue != otherLuiInstr.getImmediate() << 16:
                             return None
 
-            if common.GlobalConfig.COMPILER == common.Compiler.IDO:
+            if self.config.COMPILER == common.Compiler.IDO:
                 # IDO does not pair multiples %hi to the same %lo
                 return self.symbolLoInstrOffset[lowerOffset]
 
-            elif common.GlobalConfig.COMPILER in {common.Compiler.GCC, common.Compiler.SN64}:
+            elif self.config.COMPILER in {common.Compiler.GCC, common.Compiler.SN64}:
                 if luiOffset is None or hiValue is None:
                     return None
 
@@ -189,15 +236,15 @@ class InstrAnalyzer:
                     else:
                         return self.symbolLoInstrOffset[lowerOffset]
 
-        if hiValue is None and common.GlobalConfig.GP_VALUE is None:
+        if hiValue is None and self.config.GP_VALUE is None:
             # Trying to pair a gp relative offset, but we don't know the gp address
             return None
 
         if hiValue is not None:
             upperHalf = hiValue
         else:
-            assert common.GlobalConfig.GP_VALUE is not None
-            upperHalf = common.GlobalConfig.GP_VALUE
+            assert self.config.GP_VALUE is not None
+            upperHalf = self.config.GP_VALUE
 
             gotAddress = got.getAddress(upperHalf + lowerHalf)
             if gotAddress is not None:
@@ -212,22 +259,22 @@ class InstrAnalyzer:
             return None
 
         # filter out stuff that may not be a real symbol
-        filterOut = common.GlobalConfig.SYMBOL_FINDER_FILTER_LOW_ADDRESSES and address < 0x80000000
-        filterOut |= common.GlobalConfig.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES and address >= 0xC0000000
+        filterOut = self.config.SYMBOL_FINDER_FILTER_LOW_ADDRESSES and address < 0x80000000
+        filterOut |= self.config.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES and address >= 0xC0000000
         if filterOut and lowerInstr.uniqueId != rabbitizer.InstrId.cpu_addiu:
-            if common.GlobalConfig.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_CONSTANTS:
+            if self.config.SYMBOL_FINDER_FILTERED_ADDRESSES_AS_CONSTANTS:
                 # Let's pretend this value is a constant
                 constant = address
                 self.referencedConstants.add(constant)
 
-                self.constantLoInstrOffset[lowerOffset] = constant
-                self.constantInstrOffset[lowerOffset] = constant
+                self._setResult(self.constantLoInstrOffset, lowerOffset, constant)
+                self._setResult(self.constantInstrOffset, lowerOffset, constant)
                 if luiOffset is not None:
-                    self.constantHiInstrOffset[luiOffset] = constant
-                    self.constantInstrOffset[luiOffset] = constant
+                    self._setResult(self.constantHiInstrOffset, luiOffset, constant)
+                    self._setResult(self.constantInstrOffset, luiOffset, constant)
 
-                    self.hiToLowDict[luiOffset] = lowerOffset
-                    self.lowToHiDict[lowerOffset] = luiOffset
+                    self._setResult(self.hiToLowDict, luiOffset, lowerOffset)
+                    self._setResult(self.lowToHiDict, lowerOffset, luiOffset)
             return None
 
         self.referencedVrams.add(address)
@@ -236,18 +283,23 @@ class InstrAnalyzer:
             self.symbolLoInstrOffset[lowerOffset] = address
             self.symbolInstrOffset[lowerOffset] = address
             self.referencedVramsInstrOffset[lowerOffset] = address
+            self.changesLog.append(lowerOffset)
         if luiOffset is not None:
             if luiOffset not in self.symbolHiInstrOffset:
                 self.symbolHiInstrOffset[luiOffset] = address
                 self.symbolInstrOffset[luiOffset] = address
                 self.referencedVramsInstrOffset[luiOffset] = address
 
-            self.hiToLowDict[luiOffset] = lowerOffset
-            self.lowToHiDict[lowerOffset] = luiOffset
+            # Checked together since this is the most common path
+            if self.hiToLowDict.get(luiOffset) != lowerOffset or self.lowToHiDict.get(lowerOffset) != luiOffset:
+                self.hiToLowDict[luiOffset] = lowerOffset
+                self.lowToHiDict[lowerOffset] = luiOffset
+                self.changesLog.append(luiOffset)
+                self.changesLog.append(lowerOffset)
         else:
-            self.symbolGpInstrOffset[lowerOffset] = address
-            self.symbolInstrOffset[lowerOffset] = address
-            self.referencedVramsInstrOffset[lowerOffset] = address
+            self._setResult(self.symbolGpInstrOffset, lowerOffset, address)
+            self._setResult(self.symbolInstrOffset, lowerOffset, address)
+            self._setResult(self.referencedVramsInstrOffset, lowerOffset, address)
 
         self.processSymbolType(address, lowerInstr)
 
@@ -275,7 +327,9 @@ class InstrAnalyzer:
                 regsTracker.processLui(instr, instrOffset)
             else:
                 regsTracker.processLui(instr, instrOffset, prevInstr)
-            self.luiInstrs[instrOffset] = instr
+            if instrOffset not in self.luiInstrs:
+                self.luiInstrs[instrOffset] = instr
+                self.changesLog.append(instrOffset)
             return
 
         if instr.doesLoad() and instr.rs in {rabbitizer.RegGprO32.gp, rabbitizer.RegGprN32.gp}:
@@ -303,6 +357,7 @@ class InstrAnalyzer:
         if not pairingInfo.shouldProcess:
             if regsTracker.hasLoButNoHi(instr):
                 self.nonLoInstrOffsets.add(instrOffset)
+                self.changesLog.append(instrOffset)
             return
 
         upperHalf: int|None = pairingInfo.value
@@ -318,6 +373,7 @@ class InstrAnalyzer:
                     if instr.rs in {rabbitizer.RegGprO32.gp, rabbitizer.RegGprN32.gp} and instr.rt in {rabbitizer.RegGprO32.gp, rabbitizer.RegGprN32.gp}:
                         # cpload
                         self.unpairedCploads.append(CploadInfo(luiOffset, instrOffset))
+                        self.changesLog.append(-1)
                         # early return to avoid counting this pairing as a symbol
                         return
 
@@ -335,8 +391,8 @@ class InstrAnalyzer:
         if jrInfo is not None:
             offset, address = jrInfo
 
-            self.referencedJumpTableOffsets[offset] = address
-            self.jumpRegisterIntrOffset[instrOffset] = address
+            self._setResult(self.referencedJumpTableOffsets, offset, address)
+            self._setResult(self.jumpRegisterIntrOffset, instrOffset, address)
             self.referencedVrams.add(address)
 
 
@@ -365,6 +421,7 @@ class InstrAnalyzer:
                     self.cploadOffsets.add(cpload.loOffset)
                     self.cploadOffsets.add(instrOffset)
                     self.cploads[instrOffset] = cpload
+                    self.changesLog.append(-1)
 
         regsTracker.overwriteRegisters(instr, instrOffset)
 
@@ -375,7 +432,7 @@ class InstrAnalyzer:
 
 
     def printAnalisisDebugInfo_IterInfo(self, regsTracker: rabbitizer.RegistersTracker, instr: rabbitizer.Instruction, currentVram: int):
-        if not common.GlobalConfig.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO:
+        if not self.config.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO:
             return
 
         print("_printAnalisisDebugInfo_IterInfo")
@@ -392,7 +449,7 @@ class InstrAnalyzer:
         print()
 
     def printSymbolFinderDebugInfo_UnpairedLuis(self):
-        if not common.GlobalConfig.PRINT_UNPAIRED_LUIS_DEBUG_INFO:
+        if not self.config.PRINT_UNPAIRED_LUIS_DEBUG_INFO:
             return
 
         firstNotePrinted = False
@@ -405,9 +462,9 @@ class InstrAnalyzer:
                 # print(f"C  {self.constantsPerInstruction[instructionOffset]:8X}", luiInstr)
                 pass
             else:
-                if common.GlobalConfig.SYMBOL_FINDER_FILTER_LOW_ADDRESSES and luiInstr.getImmediate() < 0x8000: # filter out stuff that may not be a real symbol
+                if self.config.SYMBOL_FINDER_FILTER_LOW_ADDRESSES and luiInstr.getImmediate() < 0x8000: # filter out stuff that may not be a real symbol
                     continue
-                if common.GlobalConfig.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES and luiInstr.getImmediate() >= 0xC000: # filter out stuff that may not be a real symbol
+                if self.config.SYMBOL_FINDER_FILTER_HIGH_ADDRESSES and luiInstr.getImmediate() >= 0xC000: # filter out stuff that may not be a real symbol
                     continue
 
                 # print(f"{currentVram:06X} ", end="")
@@ -426,3 +483,18 @@ class InstrAnalyzer:
 
         if firstNotePrinted:
             print()
+
+
+@dataclasses.dataclass
+class InstrAnalysisResult:
+    """Everything gathered by running the `InstrAnalyzer` over a function, in a compact form which doesn't reference any instruction.
+
+    Since gathering it does not depend on the context it can be computed on a different process, or restored from the analysis cache, to be
+    used by `SymbolFunction.setInstrAnalysis`.
+    """
+
+    analyzerResults: dict[str, Any]
+    "The results returned by `InstrAnalyzer.getResults`"
+    branchesTaken: set[int]
+    isLikelyHandwritten: bool
+    hasUnimplementedIntrs: bool
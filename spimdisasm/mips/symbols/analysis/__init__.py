@@ -5,4 +5,5 @@
 
 from __future__ import annotations
 
-from .InstrAnalyzer import InstrAnalyzer
+from .InstrAnalyzer import InstrAnalyzer, InstrAnalysisResult
+from .ControlFlowGraph import ControlFlowGraph, BlockStates
@@ -25,6 +25,8 @@ def getArgsParser() -> argparse.ArgumentParser:
     parser.add_argument("--end", help="Offset end of the input binary file to start disassembling. Expects an hex value",  default="0xFFFFFF")
     parser.add_argument("--vram", help="Set the VRAM address. Expects an hex value", default="0x0")
 
+    parser.add_argument("--stats-json", help="Write a json report with the time spent on each stage and section, and the amount of instructions, functions, symbols and context lookups", metavar="PATH")
+
     common.Context.addParametersToArgParse(parser)
 
     common.GlobalConfig.addParametersToArgParse(parser)
@@ -66,8 +68,11 @@ def rspDisasmMain():
 
     applyGlobalConfigurations()
 
+    stats = mips.PipelineStats("rspDisasm")
+
     binaryPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(binaryPath)
+    with stats.stage("readInput"):
+        array_of_bytes = common.Utils.readFileAsMemoryView(binaryPath)
     inputName = binaryPath.stem
 
     start = int(args.start, 16)
@@ -76,17 +81,32 @@ def rspDisasmMain():
         end = len(array_of_bytes)
     fileVram = int(args.vram, 16)
 
-    context = initializeContext(args, len(array_of_bytes), fileVram)
+    with stats.stage("createSections"):
+        context = initializeContext(args, len(array_of_bytes), fileVram)
+        if args.stats_json is not None:
+            stats.countContextLookups(context)
 
-    f = mips.sections.SectionText(context, start, end, fileVram, inputName, array_of_bytes, 0, None)
-    f.instrCat = rabbitizer.InstrCategory.RSP
+        f = mips.sections.SectionText(context, start, end, fileVram, inputName, array_of_bytes, 0, None)
+        f.instrCat = rabbitizer.InstrCategory.RSP
 
-    f.analyze()
+    with stats.stage("analyze"), stats.sectionStage(f, "analyze"):
+        f.analyze()
     f.printAnalyzisResults()
 
-    mips.FilesHandlers.writeSection(Path(args.output), f)
+    with stats.stage("writeProcessedFiles"), stats.sectionStage(f, "write"):
+        mips.FilesHandlers.writeSection(Path(args.output), f)
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with stats.stage("saveContext"):
+            context.saveContextToFile(contextPath)
+
+    if args.save_context_snapshot is not None:
+        with stats.stage("saveContextSnapshot"):
+            context.saveSnapshot(Path(args.save_context_snapshot))
+
+    if args.stats_json is not None:
+        stats.countSections([f])
+        stats.countContext(context)
+        stats.writeJson(Path(args.stats_json))
@@ -6,7 +6,11 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
+import os
 from pathlib import Path
+import sys
+import traceback
 
 from .. import common
 from .. import mips
@@ -40,6 +44,11 @@ def getArgsParser() -> argparse.ArgumentParser:
 
     parser.add_argument("--write-binary", help=f"Produce a binary from the processed file. Defaults to {common.GlobalConfig.WRITE_BINARY}", action=common.Utils.BooleanOptionalAction)
 
+    parser.add_argument("-j", "--jobs", help="Amount of processes used to analyze the text sections, and threads used to write the output files. The output is the same regardless of this value. Defaults to 1", type=int, default=1)
+    parser.add_argument("--analysis-cache", help="Enables caching the analysis of the text sections. Expects a path to a directory where the cache will be stored. Sections which did not change since the previous run are not analyzed again", metavar="DIR")
+    parser.add_argument("--write-if-changed", help="Only write the output files whose contents changed since they were last written, keeping the modification time of the rest. Expects a path to a json manifest where the hash of each written file will be stored", metavar="MANIFEST")
+    parser.add_argument("--stats-json", help="Write a json report with the time spent on each stage and section, and the amount of instructions, functions, symbols and context lookups", metavar="PATH")
+
 
     common.Context.addParametersToArgParse(parser)
 
@@ -87,7 +96,7 @@ def getSplits(fileSplitsPath: Path|None, vromStart: int, vromEnd: int, fileVram:
 
     return splits
 
-def getProcessedSections(context: common.Context, splits: common.FileSplitFormat, array_of_bytes: bytearray, inputPath: Path, textOutput: Path, dataOutput: Path):
+def getProcessedSections(context: common.Context, splits: common.FileSplitFormat, array_of_bytes: bytes|bytearray|memoryview, inputPath: Path, textOutput: Path, dataOutput: Path):
     processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]] = {
         common.FileSectionType.Text: [],
         common.FileSectionType.Data: [],
@@ -147,9 +156,118 @@ def changeGlobalSegmentRanges(context: common.Context, processedFiles: dict[comm
     context.globalSegment.changeRanges(0, highestVromEnd, lowestVramStart, highestVramEnd)
     return
 
-def analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int):
+_sTextSectionsForWorkers: list[mips.sections.SectionText] = list()
+"Text sections inherited by the forked worker processes"
+_sCachedSectionsForWorkers: set[int] = set()
+"Indices of the text sections inherited by the workers which already have their analysis restored from the cache"
+
+def _addJumpTargetsOfSection(section: mips.sections.SectionText) -> None:
+    for instr in mips.sections.SectionText.wordListToInstructions(section.words, section.getVramOffset(0), section.instrCat):
+        if instr.isJType():
+            section.addFunction(instr.getInstrIndexAsVram(), isAutogenerated=True)
+
+def _analyzeTextSectionsWorker(chunk: range) -> list[tuple[dict[tuple[int, int, bool], mips.symbols.analysis.InstrAnalysisResult], str|None]]:
+    """Returns the analysis of each function of every section of the chunk, or the error raised while analyzing the section.
+
+    Only the compact `InstrAnalysisResult` of each function is sent back to the main process, which adds the symbols to its own context.
+    """
+    # Any message printed while analyzing will be printed again by the main process
+    sys.stdout = open(os.devnull, "w")
+    sys.stderr = sys.stdout
+
+    textSections = _sTextSectionsForWorkers
+
+    # The previous sections have not been analyzed by this process, so their jumps targets are added to the context, since those tell
+    # where the functions of the following sections start
+    for prevSection in textSections[:chunk.start]:
+        _addJumpTargetsOfSection(prevSection)
+
+    results: list[tuple[dict[tuple[int, int, bool], mips.symbols.analysis.InstrAnalysisResult], str|None]] = list()
+    for i in chunk:
+        if i in _sCachedSectionsForWorkers:
+            # The main process already has the analysis of this section, so it is treated like the previous sections
+            _addJumpTargetsOfSection(textSections[i])
+            results.append((dict(), None))
+            continue
+        try:
+            textSections[i].analyze()
+            results.append((textSections[i].getInstrAnalysisResults(), None))
+        except Exception as exception:
+            # The main process will analyze this section by itself
+            results.append((dict(), "".join(traceback.format_exception_only(type(exception), exception)).strip()))
+    return results
+
+def precomputeTextAnalysis(textSections: list[mips.sections.SectionText], jobs: int, cachedSections: set[int]|None=None) -> None:
+    """Analyzes the instructions of the functions of every text section using `jobs` processes, filling the `precomputedInstrAnalysis` of
+    each section.
+
+    The sections whose indices are in `cachedSections` already have their analysis restored from the analysis cache, so they are not
+    analyzed again.
+
+    Each process analyzes a contiguous chunk of sections with its own copy of the context, so it can only guess where each function starts.
+    The main process still finds the functions of every section by itself and only uses the results for functions which were found at the
+    same place, so the final analysis is the same as if every section was analyzed serially.
+    """
+    global _sTextSectionsForWorkers
+    global _sCachedSectionsForWorkers
+
+    if cachedSections is None:
+        cachedSections = set()
+
+    if jobs <= 1 or len(textSections) < 2:
+        return
+    if "fork" not in multiprocessing.get_all_start_methods():
+        # The worker processes need to inherit the context
+        return
+    if textSections[0].config.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO:
+        # The debug info is printed while analyzing the instructions, so it has to be done by the main process
+        return
+
+    # Split the sections in chunks of roughly the same amount of words to analyze
+    totalWords = sum(section.sizew for i, section in enumerate(textSections) if i not in cachedSections)
+    if totalWords == 0:
+        return
+    chunks: list[range] = list()
+    chunkStart = 0
+    wordsSoFar = 0
+    for i, section in enumerate(textSections):
+        if i not in cachedSections:
+            wordsSoFar += section.sizew
+        if wordsSoFar * jobs >= totalWords * (len(chunks) + 1):
+            chunks.append(range(chunkStart, i + 1))
+            chunkStart = i + 1
+    if chunkStart < len(textSections):
+        chunks.append(range(chunkStart, len(textSections)))
+    chunks = [chunk for chunk in chunks if any(i not in cachedSections for i in chunk)]
+
+    _sTextSectionsForWorkers = textSections
+    _sCachedSectionsForWorkers = cachedSections
+    with multiprocessing.get_context("fork").Pool(min(jobs, len(chunks)), maxtasksperchild=1) as pool:
+        chunksResults = pool.map(_analyzeTextSectionsWorker, chunks)
+    _sTextSectionsForWorkers = list()
+    _sCachedSectionsForWorkers = set()
+
+    for chunk, chunkResults in zip(chunks, chunksResults):
+        for i, (sectionResults, error) in zip(chunk, chunkResults):
+            if error is not None:
+                common.Utils.eprint(f"Warning: Analyzing '{textSections[i].name}' on a worker process failed, it will be analyzed serially. Error: {error}")
+            textSections[i].precomputedInstrAnalysis.update(sectionResults)
+
+def analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int, jobs: int=1, analysisCache: mips.AnalysisCache|None=None, stats: mips.PipelineStats|None=None):
     global sLenLastLine
 
+    if stats is None:
+        stats = mips.PipelineStats()
+
+    cachedSections: set[int] = set()
+    if analysisCache is not None:
+        for i, textSection in enumerate(processedFiles[common.FileSectionType.Text]):
+            if analysisCache.load(textSection):
+                cachedSections.add(i)
+        common.Utils.printVerbose(f"Analysis cache: {analysisCache.hits} hits, {analysisCache.misses} misses")
+
+    precomputeTextAnalysis(processedFiles[common.FileSectionType.Text], jobs, cachedSections)
+
     i = 0
     for section, filesInSection in processedFiles.items():
         pathLists = processedFilesOutputPaths[section]
@@ -161,15 +279,25 @@ def analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFi
             common.Utils.printQuietless(progressStr, end="", flush=True)
             common.Utils.printVerbose("")
 
-            f.analyze()
+            with stats.sectionStage(f, "analyze"):
+                f.analyze()
             f.printAnalyzisResults()
 
             i += 1
+
+    if analysisCache is not None:
+        for textSection in processedFiles[common.FileSectionType.Text]:
+            analysisCache.store(textSection)
+        stats.counts["analysisCacheHits"] = analysisCache.hits
+        stats.counts["analysisCacheMisses"] = analysisCache.misses
     return
 
-def nukePointers(processedFiles, processedFilesCount: int):
+def nukePointers(processedFiles, processedFilesCount: int, stats: mips.PipelineStats|None=None):
     global sLenLastLine
 
+    if stats is None:
+        stats = mips.PipelineStats()
+
     common.Utils.printVerbose("Nuking pointers...")
     i = 0
     for section, filesInSection in processedFiles.items():
@@ -180,13 +308,17 @@ def nukePointers(processedFiles, processedFilesCount: int):
             sLenLastLine = max(len(progressStr), sLenLastLine)
             common.Utils.printQuietless(progressStr, end="")
 
-            f.removePointers()
+            with stats.sectionStage(f, "nukePointers"):
+                f.removePointers()
             i += 1
     return
 
-def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int):
+def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount: int, writer: common.FileWriter|None=None, stats: mips.PipelineStats|None=None):
     global sLenLastLine
 
+    if stats is None:
+        stats = mips.PipelineStats()
+
     common.Utils.printVerbose("Writing files...")
     i = 0
     for section, filesInSection in processedFiles.items():
@@ -202,15 +334,20 @@ def writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFile
             if path == "-":
                 common.Utils.printQuietless()
 
-            mips.FilesHandlers.writeSection(Path(path), f)
+            with stats.sectionStage(f, "write"):
+                mips.FilesHandlers.writeSection(Path(path), f, writer)
             i += 1
     return
 
-def migrateFunctions(processedFiles, functionMigrationPath: Path):
+def migrateFunctions(processedFiles, functionMigrationPath: Path, writer: common.FileWriter|None=None, stats: mips.PipelineStats|None=None):
     global sLenLastLine
 
+    if stats is None:
+        stats = mips.PipelineStats()
+
     common.Utils.printVerbose("\nSpliting functions...")
     funcTotal = sum(len(x.symbolList) for x in processedFiles[common.FileSectionType.Text])
+    rodataIndex = mips.FilesHandlers.RodataSymbolsIndex(processedFiles[common.FileSectionType.Rodata])
     i = 0
     for f in processedFiles[common.FileSectionType.Text]:
         for func in f.symbolList:
@@ -222,11 +359,14 @@ def migrateFunctions(processedFiles, functionMigrationPath: Path):
             common.Utils.printQuietless(progressStr, end="")
 
             assert isinstance(func, mips.symbols.SymbolFunction)
+            # This is the last time the function is rendered, so the memoized overrides are released after it
+            func.memoizeImmOverrides = False
             functionPath = functionMigrationPath / f.name
-            mips.FilesHandlers.writeSplitedFunction(functionPath, func, processedFiles[common.FileSectionType.Rodata])
+            with stats.sectionStage(f, "migrateFunctions"):
+                mips.FilesHandlers.writeSplitedFunction(functionPath, func, processedFiles[common.FileSectionType.Rodata], writer, rodataIndex)
 
             i += 1
-    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, processedFiles[common.FileSectionType.Rodata])
+    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, processedFiles[common.FileSectionType.Rodata], writer)
 
 
 def disassemblerMain():
@@ -235,11 +375,16 @@ def disassemblerMain():
 
     applyGlobalConfigurations()
 
+    stats = mips.PipelineStats("singleFileDisasm")
+
     context = common.Context()
     context.parseArgs(args)
+    if args.stats_json is not None:
+        stats.countContextLookups(context)
 
     inputPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
+    with stats.stage("readInput"):
+        array_of_bytes = common.Utils.readFileAsMemoryView(inputPath)
 
     fileSplitsPath = None
     if args.file_splits is not None:
@@ -249,7 +394,8 @@ def disassemblerMain():
     if vromEnd == 0xFFFFFF:
         vromEnd = len(array_of_bytes)
     fileVram = int(args.vram, 16)
-    splits = getSplits(fileSplitsPath, vromStart, vromEnd, fileVram, args.disasm_rsp)
+    with stats.stage("parseSplits"):
+        splits = getSplits(fileSplitsPath, vromStart, vromEnd, fileVram, args.disasm_rsp)
 
     textOutput = Path(args.output)
     if args.data_output is None:
@@ -257,27 +403,69 @@ def disassemblerMain():
     else:
         dataOutput = Path(args.data_output)
 
-    processedFiles, processedFilesOutputPaths = getProcessedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
-    changeGlobalSegmentRanges(context, processedFiles, len(array_of_bytes), int(args.vram, 16))
+    with stats.stage("createSections"):
+        processedFiles, processedFilesOutputPaths = getProcessedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
+        changeGlobalSegmentRanges(context, processedFiles, len(array_of_bytes), int(args.vram, 16))
 
     processedFilesCount = 0
     for sect in processedFiles.values():
         processedFilesCount += len(sect)
 
-    analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount)
-
-    if args.nuke_pointers:
-        nukePointers(processedFiles, processedFilesCount)
+    analysisCache = mips.AnalysisCache(Path(args.analysis_cache)) if args.analysis_cache is not None else None
 
-    writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount)
+    with stats.stage("analyze"):
+        analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, args.jobs, analysisCache, stats)
 
+    if args.nuke_pointers:
+        with stats.stage("nukePointers"):
+            nukePointers(processedFiles, processedFilesCount, stats)
+
+    # Rendering modifies the context, so it is always done serially to produce the same output. Only writing the files is done in parallel
+    outputManifest = common.OutputManifest(Path(args.write_if_changed)) if args.write_if_changed is not None else None
+    writer = None
+    if args.jobs > 1:
+        writer = common.ParallelFileWriter(args.jobs, manifest=outputManifest)
+    elif outputManifest is not None:
+        writer = common.FileWriter(outputManifest)
     if args.split_functions is not None:
-        migrateFunctions(processedFiles, Path(args.split_functions))
+        # The functions are rendered again when splitting them, so the first render keeps the overrides of the instructions for that one
+        for textSection in processedFiles[common.FileSectionType.Text]:
+            for func in textSection.symbolList:
+                if isinstance(func, mips.symbols.SymbolFunction):
+                    func.memoizeImmOverrides = True
+
+    try:
+        with stats.stage("writeProcessedFiles"):
+            writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, writer, stats)
+
+        if args.split_functions is not None:
+            with stats.stage("migrateFunctions"):
+                migrateFunctions(processedFiles, Path(args.split_functions), writer, stats)
+    finally:
+        if writer is not None:
+            with stats.stage("waitForWriter"):
+                writer.close()
+
+    if outputManifest is not None:
+        with stats.stage("saveOutputManifest"):
+            outputManifest.save()
+        stats.counts["filesWritten"] = outputManifest.written
+        stats.counts["filesUnchanged"] = outputManifest.unchanged
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with stats.stage("saveContext"):
+            context.saveContextToFile(contextPath)
+
+    if args.save_context_snapshot is not None:
+        with stats.stage("saveContextSnapshot"):
+            context.saveSnapshot(Path(args.save_context_snapshot))
+
+    if args.stats_json is not None:
+        stats.countSections(f for filesInSection in processedFiles.values() for f in filesInSection)
+        stats.countContext(context)
+        stats.writeJson(Path(args.stats_json))
 
     common.Utils.printQuietless(sLenLastLine*" " + "\r", end="")
     common.Utils.printQuietless(f"Done: {args.binary}")